@@ -1,19 +1,36 @@
 from fastapi import FastAPI, File, UploadFile, Form , Depends, HTTPException , Request , APIRouter
-from config import users_collection , interviews_collection
+from fastapi import WebSocket, WebSocketDisconnect, Query, status, BackgroundTasks
+from config import users_collection , interviews_collection, llm, hedged_llm, code_llm
 from datetime import datetime
 from pydantic import BaseModel
-from auth import hash_password, verify_password, create_access_token, get_current_user
+from auth import hash_password, verify_password, create_access_token, get_current_user, decode_access_token
+from jose import JWTError
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from services.interview_session import InterviewSession
 from services.coding_session import CodingSession
-from services.feedback_service import generate_hr_feedback, generate_sales_feedback, generate_coding_feedback
+from services.feedback_service import agenerate_hr_feedback, agenerate_sales_feedback, agenerate_coding_feedback
 from services.hr_session import HRInterviewSession
 from services.sales_session import SalesInterviewSession
-from utils import transcribe, get_confidence_score, sanitize_for_json
+from utils import sanitize_for_json, speech_pipeline, PipelineBusyError
+from utils.whisper_pool import whisper_pool, STT_WORKERS
+from utils.vad import StreamingSegmenter
+from utils.warmup import warm_up, model_status, WARMUP_ON_STARTUP
+from utils.followup_gate import followup_gate
+from utils.turn_prestage import prestage_reply, prestage_stats
+from utils.chat_history import prompt_sizes
+from utils.resume_context import resume_to_text
+from utils.llm_client import LLMUnavailableError
+from utils.audio import AudioTooLongError, StreamingDecoder, STREAM_FORMATS, SAMPLE_RATE
+from utils.uploads import (
+    iter_upload, read_upload, UploadLimitMiddleware, UploadTooLargeError,
+    MAX_AUDIO_UPLOAD_BYTES, MAX_AUDIO_SECONDS, MAX_RESUME_UPLOAD_BYTES
+)
 from uuid import uuid4
-from typing import Optional, Dict, Any
+from typing import AsyncIterator, Awaitable, Callable, Optional, Dict, Any, Tuple
 from bson import ObjectId
 
+import asyncio
 import json
 import numpy as np
 from routes.user import router as user_router
@@ -24,6 +41,14 @@ import uvicorn
 app = FastAPI()
 user_sessions = {}
 
+# One structured LLM call per turn decides follow-up vs next question
+STRUCTURED_TURNS = os.getenv("STRUCTURED_TURNS", "1") == "1"
+# Generate the follow-up and the next main question concurrently each turn
+SPECULATIVE_TURNS = os.getenv("SPECULATIVE_TURNS", "0") == "1"
+
+# Receives interviewer text as it is generated (see /api/audio/stream)
+TokenSink = Callable[[str], Awaitable[None]]
+
 router = APIRouter()
 app.include_router(user_router)
 
@@ -33,6 +58,59 @@ def _response(data: Dict[str, Any]) -> Dict[str, Any]:
     return sanitize_for_json(data)
 
 
+async def _analyze_audio(upload: UploadFile, with_confidence: bool = True):
+    """
+    Decode an uploaded answer in chunks and run it through the speech pipeline.
+
+    The multipart parser has already spooled the upload (to a temporary
+    file once it is large), so only the decode is streamed: the file is
+    piped to ffmpeg chunk by chunk rather than read into memory whole.
+    Oversized or over-long uploads are rejected with 413 before any model
+    work, undecodable ones with 400, and a full queue with 503 + Retry-After.
+    """
+    try:
+        return await speech_pipeline.analyze_stream(
+            iter_upload(upload, MAX_AUDIO_UPLOAD_BYTES),
+            with_confidence=with_confidence,
+            max_seconds=MAX_AUDIO_SECONDS
+        )
+    except (UploadTooLargeError, AudioTooLongError) as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except RuntimeError as e:
+        print(f"[Audio Decode Error] {e}")
+        raise HTTPException(status_code=400, detail="Could not decode the audio upload.")
+    except PipelineBusyError as e:
+        raise HTTPException(
+            status_code=503,
+            detail="Server is busy processing other answers. Please retry shortly.",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+
+# Byte limits per upload endpoint, enforced while the body is received (and
+# up front when Content-Length is declared), with slack for the other
+# multipart fields
+_UPLOAD_LIMITS = {
+    "/api/audio": MAX_AUDIO_UPLOAD_BYTES,
+    "/api/audio/stream": MAX_AUDIO_UPLOAD_BYTES,
+    "/api/code-explanation": MAX_AUDIO_UPLOAD_BYTES,
+    "/api/parse-resume": MAX_RESUME_UPLOAD_BYTES,
+}
+_MULTIPART_SLACK = 64 * 1024
+
+app.add_middleware(UploadLimitMiddleware, limits=_UPLOAD_LIMITS, slack=_MULTIPART_SLACK)
+
+
+@app.exception_handler(LLMUnavailableError)
+async def llm_unavailable(request: Request, exc: LLMUnavailableError):
+    """The LLM is throttled, failing or circuit-broken: ask the client to retry later."""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "The interviewer is busy, please try again shortly"},
+        headers={"Retry-After": str(max(1, round(exc.retry_after)))}
+    )
+
+
 # CORS setup so frontend can call backend
 app.add_middleware(
     CORSMiddleware,
@@ -42,6 +120,51 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+async def start_stt_workers():
+    """Spawn the Whisper worker farm when configured, then warm models in the background."""
+    if STT_WORKERS > 0:
+        whisper_pool.start()
+    if WARMUP_ON_STARTUP:
+        asyncio.get_running_loop().run_in_executor(None, warm_up)
+
+
+@app.on_event("shutdown")
+def stop_stt_workers():
+    whisper_pool.shutdown()
+
+
+@app.get("/api/ready")
+def readiness():
+    """Readiness probe: 200 once models are warm, 503 while loading."""
+    status_info = _response(model_status())
+    if not status_info["ready"]:
+        return JSONResponse(status_code=503, content=status_info)
+    return status_info
+
+
+@app.get("/api/turn/stats")
+def get_turn_stats():
+    """Report turns answered locally, skipped follow-ups, and estimated prompt sizes per chain."""
+    return _response({
+        "prestage": prestage_stats(),
+        "followup_gate": followup_gate.stats(),
+        "prompts": prompt_sizes.stats(),
+    })
+
+
+@app.get("/api/llm/stats")
+def get_llm_stats():
+    """Report LLM call outcomes, retries, rejections and quota wait time per client."""
+    return _response({"llm": llm.guard.stats(), "code_llm": code_llm.guard.stats()})
+
+
+@app.get("/api/speech/stats")
+def get_speech_stats():
+    """Report speech pipeline load and STT worker utilisation."""
+    return _response(speech_pipeline.stats())
+
+
 class UserAuth(BaseModel):
     email: str
     password: str
@@ -57,6 +180,7 @@ class CodeSubmission(BaseModel):
 
 @app.post("/api/setup")
 def setup_session(
+    background_tasks: BackgroundTasks,
     role: str = Form(...),
     interview_type: str = Form(...),
     custom_round: str = Form(''),
@@ -78,15 +202,8 @@ def setup_session(
         "experience": user_data.get("experience", [])
     }
 
-    # Convert to structured text
-    resume_text = "\n".join([
-    f"Name: {resume.get('name')}",
-    f"Email: {resume.get('email')}",
-    f"Phone: {resume.get('phone')}",
-    "Skills: " + ", ".join(resume.get('skills', [])),
-    "Projects: " + ", ".join(resume.get("projects", [])),  # no .get() here
-    "Experience: " + ", ".join(resume.get("experience", []))  # no .get() here
-])
+    # Convert to structured text (one line per job / project)
+    resume_text = resume_to_text(resume)
 
 
 
@@ -128,6 +245,12 @@ def setup_session(
         user_sessions[user] = SalesInterviewSession(role=role, session_id=session_id, round_type="hiring_manager", rounds=3)
     else:
         raise HTTPException(status_code=400, detail="Invalid round type")
+
+    # Sales questions don't depend on answers: generate them after responding
+    created = user_sessions[user]
+    for session in (created.values() if isinstance(created, dict) else [created]):
+        if isinstance(session, SalesInterviewSession):
+            background_tasks.add_task(session.aprefetch_questions)
     
     return {"session_id": session_id}
 
@@ -167,23 +290,16 @@ async def parse_resume_endpoint(
     user: str = Depends(get_current_user)
 ):
     
-    import tempfile
-    import os
     from utils import parse_resume_with_llm
     print("🔄 Received resume for parsing:")
-    # 1. Save uploaded file to temp path
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-        contents = await resume.read()
-        tmp.write(contents)
-        tmp_path = tmp.name
+    # 1. Read the upload in chunks (bounded; PyMuPDF opens it from memory)
+    try:
+        contents = await read_upload(resume, MAX_RESUME_UPLOAD_BYTES)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
 
     # 2. Parse the resume using LLM
-    try:
-        result = parse_resume_with_llm(tmp_path)
-    finally:
-        # Clean up temp file
-        if os.path.exists(tmp_path):
-            os.remove(tmp_path)
+    result = await asyncio.to_thread(parse_resume_with_llm, contents)
 
     # 3. Handle Parsing Errors
     if "error" in result:
@@ -223,15 +339,215 @@ async def handle_audio(audio: UploadFile = File(...), focus_score: Optional[floa
     if not session_info:
         raise HTTPException(status_code=404, detail="No active session")
 
-    # Save audio
-    contents = await audio.read()
-    tmp_path = f"temp_{uuid4().hex}.wav"
-    with open(tmp_path, "wb") as f:
-        f.write(contents)
+    # Decode while the upload is read, then transcribe and score off the event loop
+    answer, confidence = await _analyze_audio(audio)
+    return await _locked_turn(user, session_info, answer, confidence, focus_score)
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(_response(data))}\n\n"
+
+
+@app.post("/api/audio/stream")
+async def handle_audio_stream(audio: UploadFile = File(...), focus_score: Optional[float] = Form(1.0), user: str = Depends(get_current_user)):
+    """
+    Streaming variant of /api/audio over Server-Sent Events.
+
+    Emits a "transcript" event as soon as the answer is transcribed, then
+    the interviewer's reply as "token" events while it is generated, then
+    a "done" event with the same body /api/audio returns (confidence,
+    starting_qa, interview_ended, ...). Failures during the turn are sent
+    as an "error" event.
+    """
+    session_info = user_sessions.get(user)
+
+    if not session_info:
+        raise HTTPException(status_code=404, detail="No active session")
+
+    # Upload and transcription errors still return a normal HTTP error
+    answer, confidence = await _analyze_audio(audio)
+
+    async def events() -> AsyncIterator[str]:
+        yield _sse("transcript", {"answer": answer, "confidence": confidence})
+
+        tokens: asyncio.Queue = asyncio.Queue()
+        # The turn runs to completion even if the client disconnects, so
+        # the session never holds a recorded answer without its question
+        turn = asyncio.ensure_future(
+            _locked_turn(user, session_info, answer, confidence, focus_score, emit=tokens.put)
+        )
+        turn.add_done_callback(lambda _: tokens.put_nowait(None))
+
+        streamed = False
+        while (token := await tokens.get()) is not None:
+            if token:
+                streamed = True
+                yield _sse("token", {"text": token})
+
+        try:
+            result = turn.result()
+        except Exception as e:
+            print(f"[Stream Turn Error] {e}")
+            yield _sse("error", {"detail": "Failed to generate the interviewer's reply"})
+            return
+
+        if not streamed:
+            # Canned transitions and guidance arrive in one piece
+            yield _sse("token", {"text": result.get("text") or ""})
+        yield _sse("done", result)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+async def _collect(tokens: AsyncIterator[str], emit: Optional[TokenSink]) -> Optional[str]:
+    """Forward streamed text to emit and return it joined (None if empty)."""
+    parts = []
+    async for token in tokens:
+        parts.append(token)
+        if emit is not None:
+            await emit(token)
+    return "".join(parts) or None
+
+
+async def _ask_question(session: Any, emit: Optional[TokenSink] = None) -> Optional[str]:
+    """Ask the session's next main question, streaming it when emit is given."""
+    if emit is not None and hasattr(session, "astream_question"):
+        return await _collect(session.astream_question(), emit)
+    return await session.aask_question()
+
+
+async def _complete(messages: list, emit: Optional[TokenSink] = None) -> str:
+    """Run a one-off idempotent LLM prompt (may be hedged), streaming the reply when emit is given."""
+    if emit is not None:
+        return await _collect((chunk.content async for chunk in hedged_llm.astream(messages)), emit) or ""
+    return (await hedged_llm.ainvoke(messages)).content
+
+
+async def _stream_next_question(session: Any, answer: str, emit: TokenSink) -> Optional[str]:
+    """
+    Streamed counterpart of _next_question.
+
+    Structured output can't be streamed token by token, so this uses the
+    gated two-call flow: a follow-up when the follow-up gate asks for one,
+    otherwise the next main question. Only one of them is generated.
+    """
+    if session.meta.get("last_followup_asked"):
+        session.meta["last_followup_asked"] = False
+        return await _ask_question(session, emit)
+
+    followup_q = await _collect(session.astream_followup_question(answer), emit)
+    if followup_q:
+        session.meta["last_followup_asked"] = True
+        return followup_q
+
+    return await _ask_question(session, emit)
+
+
+async def _next_question(session: Any, answer: str, emit: Optional[TokenSink] = None) -> Optional[str]:
+    """
+    Pick the follow-up or next main question after an answer.
+
+    With STRUCTURED_TURNS one structured LLM call decides and writes the
+    turn. Otherwise, or if that call fails, a follow-up is generated first
+    and the next main question asked when there is none. With
+    SPECULATIVE_TURNS the two are generated concurrently; the draft is
+    committed to the session only if no follow-up comes back, and is
+    cancelled otherwise. With emit the turn is streamed instead (see
+    _stream_next_question).
+    """
+    if emit is not None and hasattr(session, "astream_followup_question"):
+        return await _stream_next_question(session, answer, emit)
+
+    if STRUCTURED_TURNS and hasattr(session, "aplan_turn"):
+        try:
+            return await session.aplan_turn(answer)
+        except LLMUnavailableError:
+            # The fallback would hit the same throttled provider
+            raise
+        except Exception as e:
+            # Malformed structured output: fall back to the two-call flow
+            print(f"[Turn Planner Error] {e}")
+
+    # Check if we should ask a follow-up question
+    if session.meta.get("last_followup_asked"):
+        # We already asked follow-up for this answer, move to next main question
+        session.meta["last_followup_asked"] = False
+        return await session.aask_question()
+
+    draft = None
+    if SPECULATIVE_TURNS and hasattr(session, "adraft_question") and session._can_follow_up():
+        draft = asyncio.ensure_future(session.adraft_question())
+        # A discarded draft's error must not surface as an unretrieved exception
+        draft.add_done_callback(lambda task: task.cancelled() or task.exception())
 
-    answer = transcribe(tmp_path)
-    confidence = get_confidence_score(tmp_path)
-    os.remove(tmp_path)
+    try:
+        # Try to generate a follow-up question first
+        followup_q = await session.agenerate_followup_question(answer)
+    except BaseException:
+        if draft is not None:
+            draft.cancel()
+        raise
+
+    if followup_q:
+        if draft is not None:
+            draft.cancel()
+        # Mark that we asked a follow-up for this answer
+        session.meta["last_followup_asked"] = True
+        return followup_q
+
+    # No follow-up generated, get next main question
+    if draft is not None:
+        question = await draft
+        return session.commit_question(question) if question else None
+    return await session.aask_question()
+
+
+# Per-user (session, lock): one turn at a time for the user's current session
+_turn_locks: Dict[str, Tuple[Any, asyncio.Lock]] = {}
+
+
+async def _locked_turn(
+    user: str,
+    session_info: Any,
+    answer: str,
+    confidence: float,
+    focus_score: Optional[float],
+    emit: Optional[TokenSink] = None
+) -> Dict[str, Any]:
+    """
+    Run _run_turn while holding the session's turn lock.
+
+    A turn awaits LLM calls between recording the answer and asking the
+    next question, so a concurrent or retried request for the same session
+    would otherwise interleave its history and round updates with it.
+    """
+    owner, lock = _turn_locks.get(user, (None, None))
+    if owner is not session_info:
+        # First turn of a new session (setup replaces the session object)
+        lock = asyncio.Lock()
+        _turn_locks[user] = (session_info, lock)
+    async with lock:
+        return await _run_turn(session_info, answer, confidence, focus_score, emit)
+
+
+async def _run_turn(
+    session_info: Any,
+    answer: str,
+    confidence: float,
+    focus_score: Optional[float],
+    emit: Optional[TokenSink] = None
+) -> Dict[str, Any]:
+    """
+    Advance the interview with a transcribed answer and build the reply.
+
+    When emit is given, LLM-generated reply text is also passed to it as
+    it streams in; the returned reply is the same either way.
+    """
     # Get the current session object
     if isinstance(session_info, dict):
         session = session_info.get(session_info.get("current"))
@@ -267,7 +583,6 @@ async def handle_audio(audio: UploadFile = File(...), focus_score: Optional[floa
             # User has a question - guide them as interviewer
             if answer.strip():
                 # Use LLM to guide user's questions professionally
-                from config import llm
                 from langchain_core.messages import SystemMessage, HumanMessage
                 
                 guidance_system = f"""You are a professional interviewer responding to a candidate's question during the closing Q&A stage.
@@ -288,10 +603,10 @@ Candidate's question: "{answer}"
 
 Respond naturally as an interviewer would."""
                 
-                response = llm.invoke([
+                response = await _complete([
                     SystemMessage(content=guidance_system),
                     HumanMessage(content=f"Answer this question and ask if they have more or want to wrap up.")
-                ]).content
+                ], emit)
                 
                 return _response({
                     "text": response,
@@ -317,31 +632,23 @@ Respond naturally as an interviewer would."""
             # If user already spoke something (i.e., this is not just ping for first question)
             if answer.strip():
                 session.provide_answer(answer)
-                next_q = session.ask_question()
+                next_q = await _ask_question(session, emit)
                 return _response({"text": next_q, "answer": answer, "confidence": confidence})
             
             # Otherwise, greet first
-            first_question = session.ask_question()
+            first_question = await _ask_question(session, emit)
             return _response({"text": first_question, "answer": "", "confidence": confidence})
 
+        # Off-topic or confused answers get canned guidance with no LLM call;
+        # the question stays open for another attempt
+        guidance = prestage_reply(session, answer)
+        if guidance:
+            return _response({"text": guidance, "answer": answer, "confidence": confidence, "redirected": True})
+
         # Process answer
         session.provide_answer(answer)
         
-        # Check if we should ask a follow-up question
-        if session.meta.get("last_followup_asked"):
-            # We already asked follow-up for this answer, move to next main question
-            session.meta["last_followup_asked"] = False
-            next_q = session.ask_question()
-        else:
-            # Try to generate a follow-up question first
-            followup_q = session.generate_followup_question(answer)
-            if followup_q:
-                # Mark that we asked a follow-up for this answer
-                session.meta["last_followup_asked"] = True
-                next_q = followup_q
-            else:
-                # No follow-up generated, get next main question
-                next_q = session.ask_question()
+        next_q = await _next_question(session, answer, emit)
 
         if next_q:
             return _response({"text": next_q, "answer": answer, "confidence": confidence})
@@ -415,7 +722,6 @@ Respond naturally as an interviewer would."""
             
             # User has a question - guide them as interviewer
             if answer.strip():
-                from config import llm
                 from langchain_core.messages import SystemMessage, HumanMessage
                 
                 guidance_system = f"""You are a professional interviewer responding to a candidate's question.
@@ -429,10 +735,10 @@ Note: Never say solution or logic or hint, dont say ever about them , behave as
 Candidate's question: "{answer}"
 """
                 
-                response = llm.invoke([
+                response = await _complete([
                     SystemMessage(content=guidance_system),
                     HumanMessage(content="Answer and ask if they have more questions or want to end.")
-                ]).content
+                ], emit)
                 
                 return _response({
                     "text": response,
@@ -455,31 +761,23 @@ Candidate's question: "{answer}"
             # If user already spoke something (i.e., this is not just ping for first question)
             if answer.strip():
                 session.provide_answer(answer)
-                next_q = session.ask_question()
+                next_q = await _ask_question(session, emit)
                 return _response({"text": next_q, "answer": answer, "confidence": confidence})
             
             # Otherwise, greet first
-            first_question = session.ask_question()
+            first_question = await _ask_question(session, emit)
             return _response({"text": first_question, "answer": "", "confidence": confidence})
 
+        # Off-topic or confused answers get canned guidance with no LLM call;
+        # the question stays open for another attempt
+        guidance = prestage_reply(session, answer)
+        if guidance:
+            return _response({"text": guidance, "answer": answer, "confidence": confidence, "redirected": True})
+
         # Process answer
         session.provide_answer(answer)
         
-        # Check if we should ask a follow-up question
-        if session.meta.get("last_followup_asked"):
-            # We already asked follow-up for this answer, move to next main question
-            session.meta["last_followup_asked"] = False
-            next_q = session.ask_question()
-        else:
-            # Try to generate a follow-up question first
-            followup_q = session.generate_followup_question(answer)
-            if followup_q:
-                # Mark that we asked a follow-up for this answer
-                session.meta["last_followup_asked"] = True
-                next_q = followup_q
-            else:
-                # No follow-up generated, get next main question
-                next_q = session.ask_question()
+        next_q = await _next_question(session, answer, emit)
 
         if next_q:
             return _response({"text": next_q, "answer": answer, "confidence": confidence})
@@ -498,6 +796,151 @@ Candidate's question: "{answer}"
             })
 
 
+@app.websocket("/ws/audio")
+async def stream_audio(websocket: WebSocket, token: str = Query(...), format: str = Query("pcm16")):
+    """
+    Stream an answer while the candidate speaks.
+
+    Protocol:
+    - Binary frames: 16 kHz mono signed 16-bit PCM chunks, or with
+      ?format=webm|ogg|opus the MediaRecorder chunks of one recording per
+      answer (decoded by a streaming ffmpeg pipe as they arrive)
+    - {"type": "end", "focus_score": 0.9}: the candidate finished the answer
+    - Server sends {"type": "partial"} per VAD segment, then {"type": "final"}
+      with the assembled answer, then {"type": "response"} with the same
+      payload /api/audio returns
+    - An answer longer than MAX_AUDIO_SECONDS is dropped with
+      {"type": "error", "status": 413}, and one sent after the session was
+      ended or replaced elsewhere with {"type": "error", "status": 404}
+    - Malformed frames get {"type": "error", "status": 400} and are
+      ignored; a failed turn gets {"type": "error", "status": 503 or 500}.
+      The connection stays open in both cases
+    """
+    try:
+        user = decode_access_token(token)
+    except JWTError:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    if user not in user_sessions or (format != "pcm16" and format not in STREAM_FORMATS):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+
+    async def transcribe_segment(index: int, segment: np.ndarray) -> str:
+        text, _ = await speech_pipeline.analyze_waveform(segment, with_confidence=False)
+        await websocket.send_json({"type": "partial", "segment": index, "text": text.strip()})
+        return text.strip()
+
+    segmenter = StreamingSegmenter()
+    chunks: list = []
+    segment_tasks: list = []
+    received = 0
+    decoder: Optional[StreamingDecoder] = None
+
+    def handle_samples(samples: np.ndarray) -> None:
+        nonlocal received
+        if received >= MAX_AUDIO_SECONDS * SAMPLE_RATE:
+            return  # over the limit; reported when the answer ends
+        received += len(samples)
+        chunks.append(samples)
+        # Transcribe each finished segment while the candidate keeps talking
+        for segment in segmenter.feed(samples):
+            segment_tasks.append(asyncio.create_task(transcribe_segment(len(segment_tasks), segment)))
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+
+            if message.get("bytes"):
+                if format == "pcm16":
+                    if len(message["bytes"]) % 2:
+                        await websocket.send_json({"type": "error", "status": 400, "detail": "PCM16 frames must hold whole 16-bit samples."})
+                        continue
+                    handle_samples(np.frombuffer(message["bytes"], np.int16).astype(np.float32) / 32768.0)
+                elif received < MAX_AUDIO_SECONDS * SAMPLE_RATE:
+                    if decoder is None:
+                        decoder = StreamingDecoder(handle_samples, format)
+                    await decoder.feed(message["bytes"])
+                continue
+
+            try:
+                control = json.loads(message.get("text") or "{}")
+                if not isinstance(control, dict):
+                    raise ValueError("not an object")
+                focus_score = float(control.get("focus_score", 1.0))
+            except (ValueError, TypeError):
+                await websocket.send_json({"type": "error", "status": 400, "detail": "Control frames must be JSON objects like {\"type\": \"end\"}."})
+                continue
+            if control.get("type") != "end":
+                continue
+
+            error_frame = None
+            if decoder is not None:
+                try:
+                    # Delivers the audio still buffered in ffmpeg
+                    await decoder.close()
+                except RuntimeError as e:
+                    print(f"[Audio Decode Error] {e}")
+                    error_frame = {"type": "error", "status": 400, "detail": "Could not decode the audio stream."}
+                decoder = None
+
+            if received >= MAX_AUDIO_SECONDS * SAMPLE_RATE:
+                error_frame = {"type": "error", "status": 413, "detail": str(AudioTooLongError(MAX_AUDIO_SECONDS))}
+            # Looked up per answer, like /api/audio: the session may have been ended or restarted meanwhile
+            session_info = user_sessions.get(user)
+            if session_info is None:
+                error_frame = {"type": "error", "status": 404, "detail": "No active session"}
+            if error_frame is not None:
+                await websocket.send_json(error_frame)
+                for task in segment_tasks:
+                    task.cancel()
+                segmenter = StreamingSegmenter()
+                chunks, segment_tasks, received = [], [], 0
+                continue
+
+            last = segmenter.flush()
+            if last is not None:
+                segment_tasks.append(asyncio.create_task(transcribe_segment(len(segment_tasks), last)))
+
+            waveform = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.float32)
+            try:
+                texts = await asyncio.gather(*segment_tasks)
+                confidence = await speech_pipeline.score(waveform)
+                answer = " ".join(t for t in texts if t)
+                await websocket.send_json({"type": "final", "text": answer})
+                reply = await _locked_turn(user, session_info, answer, confidence, focus_score)
+                await websocket.send_json({"type": "response", **reply})
+            except PipelineBusyError as e:
+                await websocket.send_json({"type": "error", "status": 503, "retry_after": e.retry_after})
+            except LLMUnavailableError as e:
+                await websocket.send_json({
+                    "type": "error", "status": 503, "retry_after": max(1, round(e.retry_after)),
+                    "detail": "The interviewer is busy, please try again shortly"
+                })
+            except WebSocketDisconnect:
+                raise
+            except Exception as e:
+                print(f"[Stream Turn Error] {e}")
+                await websocket.send_json({"type": "error", "status": 500, "detail": "Failed to process the answer."})
+
+            # Ready for the next answer on the same connection
+            for task in segment_tasks:
+                task.cancel()  # segments still running after a failure
+            segmenter = StreamingSegmenter()
+            chunks, segment_tasks, received = [], [], 0
+    except WebSocketDisconnect:
+        pass
+    finally:
+        if decoder is not None:
+            decoder.abort()
+        for task in segment_tasks:
+            task.cancel()
+
+
 @app.post("/api/end-interview")
 def end_interview(user: str = Depends(get_current_user)):
     """End the interview gracefully and prepare for feedback"""
@@ -515,7 +958,7 @@ def end_interview(user: str = Depends(get_current_user)):
 
 
 @app.get("/api/feedback")
-def get_feedback(user: str = Depends(get_current_user)):
+async def get_feedback(user: str = Depends(get_current_user)):
     session_info = user_sessions.get(user)
 
     if not session_info:
@@ -532,9 +975,11 @@ def get_feedback(user: str = Depends(get_current_user)):
     if isinstance(session_info, dict) and session_info.get("mode") == "full":
         # Check if it's a Sales interview or Regular interview
         if "sales_round_1" in session_info:
-            # Sales Interview Feedback using feedback_utils
-            sales_r1_fb = generate_sales_feedback(session_info["sales_round_1"].history, "hiring_manager")
-            sales_r2_fb = generate_sales_feedback(session_info["sales_round_2"].history, "senior_leadership")
+            # Sales Interview Feedback using feedback_utils (both rounds concurrently)
+            sales_r1_fb, sales_r2_fb = await asyncio.gather(
+                agenerate_sales_feedback(session_info["sales_round_1"].history, "hiring_manager"),
+                agenerate_sales_feedback(session_info["sales_round_2"].history, "senior_leadership")
+            )
 
             feedback_data = {
                 "hiring_manager": sales_r1_fb,
@@ -547,18 +992,22 @@ def get_feedback(user: str = Depends(get_current_user)):
                 if q.get("answer")
             ])
         else:
-            # Regular Interview Feedback (Tech, Code, HR)
-            tech_fb = generate_hr_feedback(session_info["tech"].history)
-            hr_fb = generate_hr_feedback(session_info["hr"].history)
+            # Regular Interview Feedback (Tech, Code, HR), generated concurrently
+            rounds = [
+                agenerate_hr_feedback(session_info["tech"].history),
+                agenerate_hr_feedback(session_info["hr"].history)
+            ]
+            if "code" in session_info:
+                rounds.append(agenerate_coding_feedback(session_info["code"].history))
+            tech_fb, hr_fb, *code_fb = await asyncio.gather(*rounds)
 
             feedback_data = {
                 "technical": tech_fb,
                 "behavioral": hr_fb
             }
 
-            if "code" in session_info:
-                code_fb = generate_coding_feedback(session_info["code"].history)
-                feedback_data["coding"] = code_fb
+            if code_fb:
+                feedback_data["coding"] = code_fb[0]
 
             transcript_data = "\n".join([
                 f"Q: {q['question']}\nA: {q['answer']}"
@@ -569,7 +1018,7 @@ def get_feedback(user: str = Depends(get_current_user)):
     else:
         # Single round custom interview
         if hasattr(session, "history"):
-            summary = generate_hr_feedback(session.history)
+            summary = await agenerate_hr_feedback(session.history)
         else:
             summary = {"overall": 0, "summary": "No session history found"}
         
@@ -621,7 +1070,8 @@ def get_feedback(user: str = Depends(get_current_user)):
         else:
             role = session.role
         
-        interviews_collection.insert_one({
+        # pymongo is blocking; keep it off the event loop
+        await asyncio.to_thread(interviews_collection.insert_one, {
             "userId": user,
             "role": role,
             "date": datetime.now().isoformat(),
@@ -736,14 +1186,8 @@ async def handle_code_explanation(audio: UploadFile = File(...), user: str = Dep
     else:
         raise HTTPException(status_code=400, detail="Not in coding session")
 
-    # 🎤 Save and transcribe audio
-    contents = await audio.read()
-    tmp_path = f"temp_explain_{uuid4().hex}.wav"
-    with open(tmp_path, "wb") as f:
-        f.write(contents)
-
-    user_text = transcribe(tmp_path)
-    os.remove(tmp_path)
+    # 🎤 Decode and transcribe audio
+    user_text, _ = await _analyze_audio(audio, with_confidence=False)
 
     # 🧠 Use LLM to respond to explanation
     session.explanation_history.append({"user": user_text})
@@ -765,7 +1209,7 @@ async def handle_code_explanation(audio: UploadFile = File(...), user: str = Dep
         elif "ai" in msg:
             messages.append(AIMessage(content=msg["ai"]))
 
-    raw_response = code_llm.invoke(messages).content
+    raw_response = (await code_llm.ainvoke(messages)).content
     
     # ✅ SANITIZE to ensure no hints/solutions slipped through
     response, has_violation = sanitize_coding_response(raw_response)
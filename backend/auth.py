@@ -36,11 +36,15 @@ def create_access_token(data: dict) -> str:
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
+def decode_access_token(token: str) -> str:
+    """Decode a JWT access token and return the user email (raises JWTError)"""
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    return payload.get("sub")  # user email
+
 def get_current_user(authorization: str = Header(...)) -> str:
     """Extract user email from JWT token"""
     try:
         token = authorization.split(" ")[1]  # Strip "Bearer "
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload.get("sub")  # user email
+        return decode_access_token(token)
     except (JWTError, IndexError):
         raise HTTPException(status_code=401, detail="Invalid or missing token")
@@ -0,0 +1,86 @@
+"""
+Benchmark: STT throughput versus micro-batching window on CPU.
+
+Fires a burst of concurrent transcription requests and reports answers
+per second for unbatched calls (window 0) and each batching window. Every
+row decodes the same clips with the same backend and decoding options;
+window 0 sends each clip as a batch of one.
+
+Usage (from backend/):
+    python benchmarks/bench_batch_transcriber.py --wav sample.wav --requests 32
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.audio import SAMPLE_RATE, decode_audio  # noqa: E402
+from utils.speech_to_text import transcribe_batch  # noqa: E402
+from utils.batch_transcriber import MAX_BATCH_SECONDS, BatchingTranscriber  # noqa: E402
+
+
+def load_clip(path: str, seconds: float) -> np.ndarray:
+    """Load a benchmark clip, or synthesize a voiced tone burst if no file is given."""
+    if path:
+        with open(path, "rb") as f:
+            return decode_audio(f.read())
+
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    envelope = (np.sin(2 * np.pi * 4 * t) > 0).astype(np.float32)
+    return (0.1 * envelope * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def transcribe_one(clip: np.ndarray) -> str:
+    """Unbatched baseline: the batched decode path with a batch of one."""
+    return transcribe_batch([clip])[0]
+
+
+def run(clips: List[np.ndarray], window_ms: float, max_batch: int) -> float:
+    """Run one burst and return throughput in clips per second."""
+    if window_ms > 0:
+        batcher = BatchingTranscriber(window_ms=window_ms, max_batch=max_batch)
+        call = batcher.transcribe
+    else:
+        call = transcribe_one
+
+    with ThreadPoolExecutor(max_workers=len(clips)) as pool:
+        start = time.perf_counter()
+        list(pool.map(call, clips))
+        elapsed = time.perf_counter() - start
+    return len(clips) / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--wav", default="", help="audio file to transcribe (default: synthetic clip)")
+    parser.add_argument("--seconds", type=float, default=8.0, help="length of the synthetic clip")
+    parser.add_argument("--requests", type=int, default=16, help="concurrent requests per burst")
+    parser.add_argument("--max-batch", type=int, default=8)
+    parser.add_argument("--windows", default="0,5,10,25,50", help="comma-separated batch windows in ms")
+    args = parser.parse_args()
+
+    # Trimmed to one Whisper window so the batcher never falls back to transcribe()
+    clip = load_clip(args.wav, args.seconds)[:int(MAX_BATCH_SECONDS * SAMPLE_RATE)]
+    clips = [clip] * args.requests  # decoded once, shared by every row
+    windows = [float(w) for w in args.windows.split(",")]
+
+    # Warm up the model so the first row doesn't pay one-off costs
+    transcribe_one(clip)
+
+    print(f"clip={len(clip) / SAMPLE_RATE:.1f}s requests={args.requests} max_batch={args.max_batch}")
+    print(f"{'window_ms':>10} {'clips/s':>10} {'speedup':>10}")
+    baseline = None
+    for window in windows:
+        throughput = run(clips, window, args.max_batch)
+        baseline = baseline or throughput
+        print(f"{window:>10.0f} {throughput:>10.2f} {throughput / baseline:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Micro-benchmark: framed confidence engine versus the librosa implementation.
+
+Scores the same clips with the previous librosa-based function (silence
+split + concatenated RMS + beat tracking) and with utils.confidence,
+reporting per-clip time, speed-up and score differences.
+
+Usage (from backend/):
+    python benchmarks/bench_confidence.py [--wav a.wav --wav b.wav] [--seconds 60]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.audio import SAMPLE_RATE, decode_audio  # noqa: E402
+from utils.confidence import get_confidence_score, score_batch  # noqa: E402
+
+
+def legacy_confidence_score(y: np.ndarray, sr: int) -> float:
+    """The librosa-based scorer this engine replaces (kept here as the baseline)."""
+    import librosa
+
+    duration = librosa.get_duration(y=y, sr=sr)
+    if duration < 1.0:
+        return 0.2
+    intervals = librosa.effects.split(y, top_db=25)
+    if len(intervals) == 0:
+        return 0.1
+    active_time = sum([end - start for start, end in intervals]) / sr
+    fluency_score = np.clip((active_time / duration - 0.4) / 0.4, 0.0, 1.0)
+    y_active = np.concatenate([y[start:end] for start, end in intervals])
+    rms = np.mean(librosa.feature.rms(y=y_active))
+    volume_score = np.clip((rms - 0.01) / 0.04, 0.0, 1.0)
+    try:
+        tempo, _ = librosa.beat.beat_track(y=y, sr=sr)
+        tempo = float(np.atleast_1d(tempo)[0])
+    except Exception:
+        tempo = 120.0
+    pace_score = 0.6 if tempo < 90 else 0.7 if tempo > 160 else 1.0
+    return round(float(np.clip(0.4 * fluency_score + 0.4 * volume_score + 0.2 * pace_score, 0.0, 1.0)), 2)
+
+
+def synthetic_answer(seconds: float, seed: int) -> np.ndarray:
+    """Speech-like test signal: ~4 Hz syllable bursts of a voiced tone with pauses."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    syllables = np.clip(np.sin(2 * np.pi * rng.uniform(3.5, 4.5) * t), 0, None) ** 2
+    pauses = (np.sin(2 * np.pi * 0.15 * t + rng.uniform(0, np.pi)) > -0.6).astype(np.float32)
+    voice = np.sin(2 * np.pi * 140 * t) + 0.5 * np.sin(2 * np.pi * 280 * t)
+    noise = 0.002 * rng.standard_normal(len(t))
+    return (rng.uniform(0.03, 0.12) * syllables * pauses * voice + noise).astype(np.float32)
+
+
+def timed(fn, clips, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        scores = [fn(c) for c in clips]
+    return (time.perf_counter() - start) / (repeat * len(clips)), scores
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--wav", action="append", default=[], help="audio file(s) to score")
+    parser.add_argument("--seconds", type=float, default=60.0, help="length of synthetic clips")
+    parser.add_argument("--clips", type=int, default=8, help="number of synthetic clips")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.wav:
+        clips = []
+        for path in args.wav:
+            with open(path, "rb") as f:
+                clips.append(decode_audio(f.read()))
+    else:
+        clips = [synthetic_answer(args.seconds, seed) for seed in range(args.clips)]
+
+    # Warm up JIT/caches on both paths
+    legacy_confidence_score(clips[0], SAMPLE_RATE)
+    get_confidence_score(clips[0])
+
+    legacy_t, legacy_scores = timed(lambda c: legacy_confidence_score(c, SAMPLE_RATE), clips, args.repeat)
+    new_t, new_scores = timed(get_confidence_score, clips, args.repeat)
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        batch_scores = score_batch(clips)
+    batch_t = (time.perf_counter() - start) / (args.repeat * len(clips))
+
+    diffs = np.abs(np.array(legacy_scores) - np.array(new_scores))
+    print(f"clips={len(clips)} avg_len={np.mean([len(c) for c in clips]) / SAMPLE_RATE:.1f}s")
+    print(f"{'scorer':>18} {'ms/clip':>10} {'speedup':>10}")
+    print(f"{'librosa (legacy)':>18} {legacy_t * 1000:>10.2f} {1.0:>9.1f}x")
+    print(f"{'framed engine':>18} {new_t * 1000:>10.2f} {legacy_t / new_t:>9.1f}x")
+    print(f"{'score_batch':>18} {batch_t * 1000:>10.2f} {legacy_t / batch_t:>9.1f}x")
+    print(f"score diff vs legacy: mean={diffs.mean():.3f} max={diffs.max():.3f}")
+    assert new_scores == batch_scores, "batch API must match per-clip scores"
+
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,13 @@
 
 from chains.hr_interview_chain import hr_memory_chain, get_hr_session_history
 from chains.memory_interview_chain import memory_chain, get_session_history
+from chains.turn_chain import TurnPlan, plan_next_turn
 
 __all__ = [
     'hr_memory_chain',
     'get_hr_session_history',
     'memory_chain',
     'get_session_history',
+    'TurnPlan',
+    'plan_next_turn',
 ]
@@ -1,9 +1,9 @@
 """HR interview chain for behavioral interviews."""
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.runnables.history import RunnableWithMessageHistory
-from langchain_community.chat_message_histories import ChatMessageHistory
 
-from config import llm
+from config import hedged_llm
+from utils.chat_history import BoundedChatHistory, track_prompt_size
 
 
 # HR-style prompt
@@ -35,15 +35,15 @@ Use the chat history to avoid repeating areas already covered.
 hr_session_store = {}
 
 
-def get_hr_session_history(session_id: str) -> ChatMessageHistory:
+def get_hr_session_history(session_id: str) -> BoundedChatHistory:
     """Get or create chat history for HR session."""
     if session_id not in hr_session_store:
-        hr_session_store[session_id] = ChatMessageHistory()
+        hr_session_store[session_id] = BoundedChatHistory()
     return hr_session_store[session_id]
 
 
 # Memory-based chain
-hr_chain = hr_prompt | llm
+hr_chain = hr_prompt | track_prompt_size("hr") | hedged_llm
 
 hr_memory_chain = RunnableWithMessageHistory(
     hr_chain,
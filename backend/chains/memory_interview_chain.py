@@ -1,9 +1,9 @@
 """Technical interview chain with memory and adaptive questioning."""
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.runnables.history import RunnableWithMessageHistory
-from langchain_community.chat_message_histories import ChatMessageHistory
 
-from config import llm
+from config import hedged_llm
+from utils.chat_history import BoundedChatHistory, track_prompt_size
 
 
 # Prompt with memory context
@@ -41,29 +41,36 @@ If the answer was weak or unclear:
 - Do **not** repeat previously covered topics in the history.
 
 Respond only with the **next question or follow-up**, optionally preceded by a short compliment if warranted.
+
+Candidate's resume (digest):
+{resume}
 """),
     MessagesPlaceholder("chat_history"),
-    ("human", "Ask the next technical interview question for the role of {role} based on the resume:\n{resume}")
+    ("human", "{request}")
 ])
 
+# Per-turn human message. The system message above only varies per
+# session, so every turn's prompt starts with the same cacheable prefix.
+NEXT_QUESTION_REQUEST = "Ask the next technical interview question."
+
 
 # Memory session store
 session_store = {}
 
 
-def get_session_history(session_id: str) -> ChatMessageHistory:
+def get_session_history(session_id: str) -> BoundedChatHistory:
     """Get or create chat history for interview session."""
     if session_id not in session_store:
-        session_store[session_id] = ChatMessageHistory()
+        session_store[session_id] = BoundedChatHistory()
     return session_store[session_id]
 
 
 # Chain with memory
-interview_chain = question_prompt | llm
+interview_chain = question_prompt | track_prompt_size("technical") | hedged_llm
 
 memory_chain = RunnableWithMessageHistory(
     interview_chain,
     get_session_history,
-    input_messages_key="resume",
+    input_messages_key="request",
     history_messages_key="chat_history"
 )
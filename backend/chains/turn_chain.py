@@ -0,0 +1,128 @@
+"""Single structured call that decides and writes the interviewer's next turn."""
+from typing import Any, List, Literal, Optional
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from pydantic import BaseModel, Field
+
+from config import llm
+from utils.chat_history import CHAT_HISTORY_TOKEN_BUDGET, recent_within_budget, track_prompt_size
+
+
+class TurnPlan(BaseModel):
+    """The interviewer's decision for the next turn."""
+
+    action: Literal["followup", "next", "advance_round"] = Field(
+        description="followup: dig deeper into the last answer; next: ask a new main question; "
+                    "advance_round: this round is finished"
+    )
+    question: str = Field(default="", description="The question to ask (empty for advance_round)")
+    praise: Optional[str] = Field(default=None, description="Short positive remark if the answer was strong")
+
+
+turn_prompt = ChatPromptTemplate.from_messages([
+    ("system",
+"""{persona}
+
+After each candidate answer you decide the next turn and write it:
+
+- "followup": the last answer was vague, weak or lacked a concrete example; ask ONE follow-up that digs into what they said.
+- "next": the answer was adequate; move to a new question on an area not yet covered.
+- "advance_round": only when no questions remain in this round.
+
+📌 Rules:
+- Ask only **one question**, short, clear and specific (1-2 sentences).
+- Never give the answer, a hint or the logic to the candidate.
+- Do not repeat topics already covered in the conversation.
+- Only set "praise" (one short sentence) when the last answer was strong; otherwise leave it empty.
+- Never use "followup" when follow-ups are not allowed.
+"""),
+    MessagesPlaceholder("chat_history"),
+    ("human",
+"""Last question: {question}
+Candidate's answer: {answer}
+
+Follow-ups allowed: {followup_allowed}
+Main questions remaining in this round: {remaining}""")
+])
+
+turn_chain = turn_prompt | track_prompt_size("turn_planner") | llm.with_structured_output(TurnPlan)
+
+
+def qa_messages(history: List[dict], token_budget: int = CHAT_HISTORY_TOKEN_BUDGET) -> List[BaseMessage]:
+    """Turn answered Q&A history entries into chat messages for the planner, newest within token_budget."""
+    messages: List[BaseMessage] = []
+    for qa in history:
+        if qa.get("answer"):
+            messages += [AIMessage(content=qa["question"]), HumanMessage(content=qa["answer"])]
+    return recent_within_budget(messages, token_budget) if token_budget > 0 else messages
+
+
+async def aplan_turn(
+    persona: str,
+    history: List[dict],
+    answer: str,
+    followup_allowed: bool,
+    remaining: int
+) -> TurnPlan:
+    """
+    Decide the next turn with one LLM call.
+
+    Args:
+        persona: Interviewer description (role, round focus, context)
+        history: Session Q&A history; the last entry is the question just answered
+        answer: The candidate's answer to it
+        followup_allowed: Whether a follow-up may be asked
+        remaining: Main questions left in the round
+
+    Returns:
+        The planned turn
+    """
+    return await turn_chain.ainvoke({
+        "persona": persona,
+        "chat_history": qa_messages(history[:-1]),
+        "question": history[-1]["question"] if history else "",
+        "answer": answer,
+        "followup_allowed": "yes" if followup_allowed else "no",
+        "remaining": remaining,
+    })
+
+
+async def plan_next_turn(session: Any, persona: str, answer: str, can_follow_up: bool) -> Optional[str]:
+    """
+    Run one planned turn for a session and record its outcome.
+
+    A follow-up sets session.meta["last_followup_asked"] (so the next turn
+    must move on), a new question goes through session.commit_question,
+    and advancing the round returns None.
+
+    Args:
+        session: Interview, HR or Sales session whose answer was just recorded
+        persona: Interviewer description for the prompt
+        answer: The candidate's answer
+        can_follow_up: Whether the session's own rules permit a follow-up
+
+    Returns:
+        Text to send the candidate, or None when the round is complete
+    """
+    followup_allowed = can_follow_up and not session.meta.get("last_followup_asked")
+    remaining = session.rounds - session.current_round
+    if remaining <= 0 and not followup_allowed:
+        session.meta["last_followup_asked"] = False
+        return None
+
+    plan = await aplan_turn(persona, session.history, answer, followup_allowed, remaining)
+    question = plan.question.strip()
+    session.meta["last_followup_asked"] = False
+
+    if plan.action == "followup" and followup_allowed and question:
+        session.meta["last_followup_asked"] = True
+    elif remaining > 0 and question and plan.action != "advance_round":
+        session.commit_question(question)
+    elif remaining > 0:
+        # The round still has questions; don't let the model end it early
+        return await session.aask_question()
+    else:
+        return None
+
+    return f"{plan.praise.strip()} {question}" if plan.praise and plan.praise.strip() else question
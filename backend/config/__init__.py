@@ -1,6 +1,6 @@
 """Configuration module."""
 from .database import users_collection, interviews_collection, db, client
-from .llm import llm, code_llm
+from .llm import llm, hedged_llm, code_llm
 
 __all__ = [
     "users_collection",
@@ -8,5 +8,6 @@ __all__ = [
     "db",
     "client",
     "llm",
+    "hedged_llm",
     "code_llm",
 ]
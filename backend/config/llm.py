@@ -1,19 +1,101 @@
 """LLM configuration for Groq API."""
 import os
+from typing import Any, AsyncIterator, Iterator, List, Optional
+
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
 from langchain_groq import ChatGroq
 from dotenv import load_dotenv
+from pydantic import Field
+
+from utils.llm_client import CircuitBreaker, LLMGuard, QuotaLimiter, estimate_prompt_tokens, open_stream, LLM_TIMEOUT
 
 load_dotenv()
 
 GROQ_API_KEY = os.getenv("DEFAULT_GROQ_API_KEY")
 
-# Initialize LLM instances
-llm = ChatGroq(
+
+class ResilientChatGroq(ChatGroq):
+    """
+    ChatGroq whose requests run through an LLMGuard.
+
+    Every way of calling the model (invoke, ainvoke, stream, astream,
+    structured output, use inside chains) gets the guard's deadline,
+    jittered retries, circuit breaker and shared quota. A stream is
+    retried only until its first chunk arrives.
+
+    Async calls bound with hedge=True (see hedged_llm) may also be hedged
+    when LLM_HEDGING is on; the flag is ignored by blocking calls.
+    """
+
+    guard: Any = Field(default=None, exclude=True)
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        kwargs.pop("hedge", None)
+        return self.guard.call(
+            lambda timeout: super(ResilientChatGroq, self)._generate(messages, stop, run_manager, timeout=timeout, **kwargs),
+            estimate_prompt_tokens(messages)
+        )
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        call = self.guard.ahedged if kwargs.pop("hedge", False) else self.guard.acall
+        return await call(
+            lambda timeout: super(ResilientChatGroq, self)._agenerate(messages, stop, run_manager, timeout=timeout, **kwargs),
+            estimate_prompt_tokens(messages)
+        )
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        kwargs.pop("hedge", None)
+
+        def first_chunk(timeout: float):
+            stream = super(ResilientChatGroq, self)._stream(messages, stop, run_manager, timeout=timeout, **kwargs)
+            return next(stream, None), stream
+
+        chunk, stream = self.guard.call(first_chunk, estimate_prompt_tokens(messages))
+        if chunk is not None:
+            yield chunk
+            yield from stream
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        hedge = kwargs.pop("hedge", False)
+
+        async def first_chunk(timeout: float):
+            return await open_stream(super(ResilientChatGroq, self)._astream(messages, stop, run_manager, timeout=timeout, **kwargs))
+
+        async def close(result) -> None:
+            await result[1].aclose()
+
+        # Hedging races time to first chunk; a losing stream is cancelled or closed
+        if hedge:
+            chunk, stream = await self.guard.ahedged(first_chunk, estimate_prompt_tokens(messages), kind="stream", discard=close)
+        else:
+            chunk, stream = await self.guard.acall(first_chunk, estimate_prompt_tokens(messages))
+        if chunk is not None:
+            yield chunk
+            async for chunk in stream:
+                yield chunk
+
+
+# One quota and breaker per API key: both clients share them
+groq_quota = QuotaLimiter()
+groq_breaker = CircuitBreaker()
+
+# Initialize LLM instances (retries are done by the guard, not the SDK)
+llm = ResilientChatGroq(
     groq_api_key=GROQ_API_KEY,
-    model="llama-3.3-70b-versatile"
+    model="llama-3.3-70b-versatile",
+    timeout=LLM_TIMEOUT,
+    max_retries=0,
+    guard=LLMGuard("llm", groq_quota, groq_breaker)
 )
 
-code_llm = ChatGroq(
+# For idempotent prompts (questions, follow-ups, closing Q&A) that may be hedged
+hedged_llm = llm.bind(hedge=True)
+
+code_llm = ResilientChatGroq(
     groq_api_key=GROQ_API_KEY,
-    model="llama-3.3-70b-versatile"
+    model="llama-3.3-70b-versatile",
+    timeout=LLM_TIMEOUT,
+    max_retries=0,
+    guard=LLMGuard("code_llm", groq_quota, groq_breaker)
 )
@@ -3,7 +3,14 @@ from .interview_session import InterviewSession
 from .coding_session import CodingSession
 from .hr_session import HRInterviewSession
 from .sales_session import SalesInterviewSession
-from .feedback_service import generate_hr_feedback, generate_sales_feedback, generate_coding_feedback
+from .feedback_service import (
+    generate_hr_feedback,
+    generate_sales_feedback,
+    generate_coding_feedback,
+    agenerate_hr_feedback,
+    agenerate_sales_feedback,
+    agenerate_coding_feedback,
+)
 
 __all__ = [
     "InterviewSession",
@@ -13,4 +20,7 @@ __all__ = [
     "generate_hr_feedback",
     "generate_sales_feedback",
     "generate_coding_feedback",
+    "agenerate_hr_feedback",
+    "agenerate_sales_feedback",
+    "agenerate_coding_feedback",
 ]
@@ -1,9 +1,10 @@
 """Feedback generation service for interviews."""
 import json
 import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 
 from langchain_core.prompts import PromptTemplate
+from langchain_core.runnables import Runnable
 from config import llm, code_llm
 
 # 🔥 HELPER: Robust JSON Cleaner
@@ -39,6 +40,18 @@ def generate_hr_feedback(history: List[Dict[str, Any]]) -> Dict[str, Any]:
     Returns:
         Dictionary with feedback scores and summary
     """
+    chain, inputs = _hr_feedback_request(history)
+    return _parse_hr_feedback(chain.invoke(inputs).content)
+
+
+async def agenerate_hr_feedback(history: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Async version of generate_hr_feedback."""
+    chain, inputs = _hr_feedback_request(history)
+    return _parse_hr_feedback((await chain.ainvoke(inputs)).content)
+
+
+def _hr_feedback_request(history: List[Dict[str, Any]]) -> Tuple[Runnable, Dict[str, Any]]:
+    """Build the HR feedback chain and its inputs."""
     transcript = "\n".join(
         [f"Q: {item['question']}\nA: {item['answer']}" for item in history if item.get('answer')]
     )
@@ -73,9 +86,10 @@ Respond **only** with a well-formatted JSON object like this:
 """
     )
 
-    chain = prompt | llm
-    raw_output = chain.invoke({"transcript": transcript}).content
+    return prompt | llm, {"transcript": transcript}
+
 
+def _parse_hr_feedback(raw_output: str) -> Dict[str, Any]:
     try:
         # 🔥 FIX: Clean before parsing
         cleaned_output = clean_json_text(raw_output)
@@ -109,6 +123,21 @@ def generate_sales_feedback(
     Returns:
         Dictionary with sales-specific feedback scores
     """
+    chain, inputs = _sales_feedback_request(history, round_type)
+    return _parse_sales_feedback(chain.invoke(inputs).content)
+
+
+async def agenerate_sales_feedback(
+    history: List[Dict[str, Any]],
+    round_type: str = "hiring_manager"
+) -> Dict[str, Any]:
+    """Async version of generate_sales_feedback."""
+    chain, inputs = _sales_feedback_request(history, round_type)
+    return _parse_sales_feedback((await chain.ainvoke(inputs)).content)
+
+
+def _sales_feedback_request(history: List[Dict[str, Any]], round_type: str) -> Tuple[Runnable, Dict[str, Any]]:
+    """Build the sales feedback chain and its inputs."""
     transcript = "\n".join(
         [f"Q: {item['question']}\nA: {item['answer']}" for item in history if item.get('answer')]
     )
@@ -143,9 +172,10 @@ Respond **only** with a well-formatted JSON object like this:
 """
     )
 
-    chain = prompt | llm
-    raw_output = chain.invoke({"transcript": transcript, "round_label": round_label}).content
+    return prompt | llm, {"transcript": transcript, "round_label": round_label}
+
 
+def _parse_sales_feedback(raw_output: str) -> Dict[str, Any]:
     try:
         # 🔥 FIX: Clean before parsing
         cleaned_output = clean_json_text(raw_output)
@@ -174,6 +204,39 @@ def generate_coding_feedback(history: List[Dict[str, Any]]) -> Dict[str, Any]:
     Returns:
         Dictionary with code quality feedback
     """
+    request = _coding_feedback_request(history)
+    if request is None:
+        return _NO_CODE_FEEDBACK
+    chain, inputs = request
+    try:
+        raw_output = chain.invoke(inputs).content
+    except Exception as e:
+        return _coding_feedback_error(e)
+    return _parse_coding_feedback(raw_output)
+
+
+async def agenerate_coding_feedback(history: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Async version of generate_coding_feedback."""
+    request = _coding_feedback_request(history)
+    if request is None:
+        return _NO_CODE_FEEDBACK
+    chain, inputs = request
+    try:
+        raw_output = (await chain.ainvoke(inputs)).content
+    except Exception as e:
+        return _coding_feedback_error(e)
+    return _parse_coding_feedback(raw_output)
+
+
+_NO_CODE_FEEDBACK = {
+    "correctness": 0, "clarity": 0, "edge_cases": 0, 
+    "efficiency": 0, "overall": 0, 
+    "summary": "No code submitted."
+}
+
+
+def _coding_feedback_request(history: List[Dict[str, Any]]) -> Optional[Tuple[Runnable, Dict[str, Any]]]:
+    """Build the coding feedback chain and its inputs, or None when no code was submitted."""
     latest = history[-1] if history else {}
 
     problem = latest.get("problem", {})
@@ -182,11 +245,7 @@ def generate_coding_feedback(history: List[Dict[str, Any]]) -> Dict[str, Any]:
     # Fallback if no code
     if not code or code.strip() == "":
         print("⚠️ No code submitted")
-        return {
-            "correctness": 0, "clarity": 0, "edge_cases": 0, 
-            "efficiency": 0, "overall": 0, 
-            "summary": "No code submitted."
-        }
+        return None
 
     # Debug logging
     print(f"📝 Generating feedback for: {problem.get('title', 'Unknown')}")
@@ -228,14 +287,15 @@ Respond only with a JSON object like:
 """
     )
 
-    chain = prompt | code_llm
+    return prompt | code_llm, {
+        "description": problem.get("description", ""),
+        "function_signature": problem.get("function_signature", ""),
+        "code": code
+    }
+
+
+def _parse_coding_feedback(raw_output: str) -> Dict[str, Any]:
     try:
-        raw_output = chain.invoke({
-            "description": problem.get("description", ""),
-            "function_signature": problem.get("function_signature", ""),
-            "code": code
-        }).content
-        
         print(f"🤖 LLM Response: {raw_output[:200]}...")
         
         # 🔥 FIX: Clean before parsing
@@ -256,14 +316,18 @@ Respond only with a JSON object like:
             "summary": f"Feedback generation failed: Invalid JSON response from LLM."
         }
     except Exception as e:
-        print(f"❌ Coding Feedback Error: {e}")
-        import traceback
-        traceback.print_exc()
-        return {
-            "correctness": 0,
-            "clarity": 0,
-            "edge_cases": 0,
-            "efficiency": 0,
-            "overall": 0,
-            "summary": f"Feedback generation failed. Please retry or check the submitted code."
-        }
\ No newline at end of file
+        return _coding_feedback_error(e)
+
+
+def _coding_feedback_error(e: Exception) -> Dict[str, Any]:
+    print(f"❌ Coding Feedback Error: {e}")
+    import traceback
+    traceback.print_exc()
+    return {
+        "correctness": 0,
+        "clarity": 0,
+        "edge_cases": 0,
+        "efficiency": 0,
+        "overall": 0,
+        "summary": f"Feedback generation failed. Please retry or check the submitted code."
+    }
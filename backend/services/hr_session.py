@@ -1,10 +1,12 @@
 """HR interview session service."""
-from typing import Dict, Any, List, Optional
+from typing import AsyncIterator, Dict, Any, List, Optional
 
-from chains.hr_interview_chain import hr_memory_chain
-from services.feedback_service import generate_hr_feedback
-from config import llm
-from langchain_core.messages import SystemMessage, HumanMessage
+from chains.hr_interview_chain import hr_memory_chain, hr_chain, get_hr_session_history
+from chains.turn_chain import plan_next_turn
+from utils.followup_gate import followup_gate
+from services.feedback_service import generate_hr_feedback, agenerate_hr_feedback
+from config import hedged_llm
+from langchain_core.messages import AIMessage, BaseMessage, SystemMessage, HumanMessage
 
 
 class HRInterviewSession:
@@ -46,6 +48,67 @@ class HRInterviewSession:
             config={"configurable": {"session_id": self.session_id}}
         ).content
 
+        return self._record_question(question)
+
+    async def aask_question(self) -> Optional[str]:
+        """Async version of ask_question; awaits the LLM without holding a thread."""
+        if self.current_round >= self.rounds:
+            return None
+
+        question = (await hr_memory_chain.ainvoke(
+            {"role": self.role},
+            config={"configurable": {"session_id": self.session_id}}
+        )).content
+
+        return self._record_question(question)
+
+    async def astream_question(self) -> AsyncIterator[str]:
+        """
+        Stream the next HR question token by token.
+
+        The question is recorded once the stream completes. Nothing is
+        yielded when rounds are complete.
+        """
+        if self.current_round >= self.rounds:
+            return
+
+        parts = []
+        async for chunk in hr_memory_chain.astream(
+            {"role": self.role},
+            config={"configurable": {"session_id": self.session_id}}
+        ):
+            parts.append(chunk.content)
+            yield chunk.content
+
+        self._record_question("".join(parts))
+
+    async def adraft_question(self) -> Optional[str]:
+        """
+        Generate the next question without recording it.
+
+        The chain runs on a snapshot of the chat history, so the draft can
+        be thrown away; commit_question records a draft that is used.
+
+        Returns:
+            Draft question or None if rounds complete
+        """
+        if self.current_round >= self.rounds:
+            return None
+
+        return (await hr_chain.ainvoke({
+            "role": self.role,
+            "chat_history": get_hr_session_history(self.session_id).messages
+        })).content
+
+    def commit_question(self, question: str) -> str:
+        """Record a drafted question exactly as ask_question would have."""
+        get_hr_session_history(self.session_id).add_messages([
+            HumanMessage(content=self.role),
+            AIMessage(content=question)
+        ])
+        return self._record_question(question)
+
+    def _record_question(self, question: str) -> str:
         self.history.append({"question": question, "answer": None})
         self.current_round += 1
         return question
@@ -70,12 +133,67 @@ class HRInterviewSession:
         Returns:
             Follow-up question or None
         """
-        if len(self.history) < 2:
+        messages = self._followup_messages(previous_answer)
+        if messages is None:
             return None
         
-        last_qa = self.history[-1] if self.history else None
-        if not last_qa or not last_qa.get('answer'):
+        followup_question = hedged_llm.invoke(messages).content
+        
+        return followup_question
+
+    async def agenerate_followup_question(self, previous_answer: str) -> Optional[str]:
+        """Async version of generate_followup_question."""
+        messages = self._followup_messages(previous_answer)
+        if messages is None:
             return None
+
+        return (await hedged_llm.ainvoke(messages)).content
+
+    async def astream_followup_question(self, previous_answer: str) -> AsyncIterator[str]:
+        """Stream a follow-up question token by token; nothing is yielded when none applies."""
+        messages = self._followup_messages(previous_answer)
+        if messages is None:
+            return
+
+        async for chunk in hedged_llm.astream(messages):
+            yield chunk.content
+
+    async def aplan_turn(self, answer: str) -> Optional[str]:
+        """
+        Decide between a follow-up and the next question in one LLM call.
+
+        Replaces agenerate_followup_question followed by aask_question.
+
+        Args:
+            answer: The candidate's answer (already recorded with provide_answer)
+
+        Returns:
+            Text to send the candidate, or None when the round is complete
+        """
+        return await plan_next_turn(self, self._persona(), answer, self._wants_follow_up(answer))
+
+    def _can_follow_up(self) -> bool:
+        """Follow-ups need an answered question beyond the greeting."""
+        return len(self.history) >= 2 and bool(self.history[-1].get("answer"))
+
+    def _wants_follow_up(self, answer: str) -> bool:
+        """Session rules plus the local answer-quality gate (utils.followup_gate)."""
+        if not self._can_follow_up():
+            return False
+        return followup_gate.evaluate(answer, self.history[-1]["question"], "hr")[0]
+
+    def _persona(self) -> str:
+        return (
+            f"You are a human resources interviewer conducting a behavioral interview for the role of {self.role}. "
+            "Focus on communication, self-awareness, teamwork, leadership and emotional intelligence. "
+            "Ask only the question, in a professional but natural tone."
+        )
+
+    def _followup_messages(self, previous_answer: str) -> Optional[List[BaseMessage]]:
+        """Build the follow-up prompt, or None when no follow-up applies."""
+        if not self._wants_follow_up(previous_answer):
+            return None
+        last_qa = self.history[-1]
         
         followup_prompt = f"""Based on the candidate's response to the HR/behavioral interview question, generate ONE relevant follow-up question.
 
@@ -91,12 +209,10 @@ Generate a natural follow-up question that:
 
 Respond with ONLY the follow-up question, nothing else."""
         
-        followup_question = llm.invoke([
+        return [
             SystemMessage(content="You are an experienced HR interviewer generating follow-up questions to understand candidate behavior and soft skills better."),
             HumanMessage(content=followup_prompt)
-        ]).content
-        
-        return followup_question
+        ]
 
     def skip_question(self) -> Dict[str, Any]:
         """
@@ -142,3 +258,7 @@ Respond with ONLY the follow-up question, nothing else."""
     def generate_feedback(self) -> Dict[str, Any]:
         """Generate HR interview feedback."""
         return generate_hr_feedback(self.history)
+
+    async def agenerate_feedback(self) -> Dict[str, Any]:
+        """Async version of generate_feedback."""
+        return await agenerate_hr_feedback(self.history)
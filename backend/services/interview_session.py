@@ -1,15 +1,19 @@
 """Interview session management service."""
 import json 
 import re
-from typing import Optional, Dict, Any, List, Tuple
+from typing import AsyncIterator, Optional, Dict, Any, List, Tuple, Union
 
 from utils.vector_memory import VectorMemory
 from utils.off_topic_detector import detect_and_respond_to_offtopic
 from utils.confusion_detector import ConfusionDetector
-from chains.memory_interview_chain import memory_chain
-from config import llm
+from chains.memory_interview_chain import memory_chain, interview_chain, get_session_history, NEXT_QUESTION_REQUEST
+from chains.turn_chain import plan_next_turn
+from utils.followup_gate import followup_gate
+from utils.resume_context import build_resume_digest
+from config import llm, hedged_llm
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.runnables import Runnable
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
 
 
 class InterviewSession:
@@ -18,7 +22,7 @@ class InterviewSession:
     def __init__(
         self,
         resume_path: Optional[str] = None,
-        resume_obj: Optional[Dict[str, Any]] = None,
+        resume_obj: Optional[Union[str, Dict[str, Any]]] = None,
         role: str = '',
         rounds: int = 3,
         session_id: str = 'default_user'
@@ -28,7 +32,7 @@ class InterviewSession:
         
         Args:
             resume_path: Path to resume JSON file
-            resume_obj: Resume as dictionary object
+            resume_obj: Resume as dictionary object or "Section: value" text
             role: Interview role/position
             rounds: Number of interview rounds
             session_id: Unique session identifier
@@ -42,7 +46,8 @@ class InterviewSession:
             raise ValueError("Either resume_path or resume_obj must be provided.")
         
         self.role = role
-        self.resume_str = json.dumps(self.resume)
+        # Built once and sent in every prompt; the resume text is not re-encoded
+        self.resume_context = build_resume_digest(self.resume) or "No resume details provided."
         self.rounds = rounds
         self.current_round = 0
         self.meta = {} 
@@ -69,13 +74,77 @@ class InterviewSession:
             return None
         
         question = memory_chain.invoke(
-            {
-                'resume': self.resume_str,
-                'role': self.role
-            },
+            self._question_inputs(),
             config={'configurable': {'session_id': self.session_id}}
         ).content
         
+        return self._record_question(question)
+
+    async def aask_question(self) -> Optional[str]:
+        """Async version of ask_question; awaits the LLM without holding a thread."""
+        if self.current_round >= self.rounds:
+            return None
+
+        question = (await memory_chain.ainvoke(
+            self._question_inputs(),
+            config={'configurable': {'session_id': self.session_id}}
+        )).content
+
+        return self._record_question(question)
+
+    async def astream_question(self) -> AsyncIterator[str]:
+        """
+        Stream the next interview question token by token.
+
+        The question is recorded, in the chat memory and the history, once
+        the stream completes. Nothing is yielded when rounds are complete.
+        """
+        if self.current_round >= self.rounds:
+            return
+
+        parts = []
+        async for chunk in memory_chain.astream(
+            self._question_inputs(),
+            config={'configurable': {'session_id': self.session_id}}
+        ):
+            parts.append(chunk.content)
+            yield chunk.content
+
+        self._record_question("".join(parts))
+
+    async def adraft_question(self) -> Optional[str]:
+        """
+        Generate the next question without recording it.
+
+        The chain runs on a snapshot of the chat history, so the draft can
+        be thrown away; commit_question records a draft that is used.
+
+        Returns:
+            Draft question or None if rounds complete
+        """
+        if self.current_round >= self.rounds:
+            return None
+
+        inputs = self._question_inputs()
+        inputs['chat_history'] = get_session_history(self.session_id).messages
+        return (await interview_chain.ainvoke(inputs)).content
+
+    def commit_question(self, question: str) -> str:
+        """Record a drafted question exactly as ask_question would have."""
+        get_session_history(self.session_id).add_messages([
+            HumanMessage(content=NEXT_QUESTION_REQUEST),
+            AIMessage(content=question)
+        ])
+        return self._record_question(question)
+
+    def _question_inputs(self) -> Dict[str, str]:
+        return {
+            'resume': self.resume_context,
+            'role': self.role,
+            'request': NEXT_QUESTION_REQUEST
+        }
+
+    def _record_question(self, question: str) -> str:
         self.history.append({'question': question, 'answer': None})
         return question
 
@@ -89,12 +158,68 @@ class InterviewSession:
         Returns:
             Follow-up question or None if not applicable
         """
-        if self.current_round < 2:
+        messages = self._followup_messages(previous_answer)
+        if messages is None:
             return None
         
-        last_qa = self.history[-1] if self.history else None
-        if not last_qa or not last_qa.get('answer'):
+        followup_question = hedged_llm.invoke(messages).content
+        
+        return followup_question
+
+    async def agenerate_followup_question(self, previous_answer: str) -> Optional[str]:
+        """Async version of generate_followup_question."""
+        messages = self._followup_messages(previous_answer)
+        if messages is None:
+            return None
+
+        return (await hedged_llm.ainvoke(messages)).content
+
+    async def astream_followup_question(self, previous_answer: str) -> AsyncIterator[str]:
+        """Stream a follow-up question token by token; nothing is yielded when none applies."""
+        messages = self._followup_messages(previous_answer)
+        if messages is None:
+            return
+
+        async for chunk in hedged_llm.astream(messages):
+            yield chunk.content
+
+    async def aplan_turn(self, answer: str) -> Optional[str]:
+        """
+        Decide between a follow-up and the next question in one LLM call.
+
+        Replaces agenerate_followup_question followed by aask_question.
+
+        Args:
+            answer: The candidate's answer (already recorded with provide_answer)
+
+        Returns:
+            Text to send the candidate, or None when the round is complete
+        """
+        return await plan_next_turn(self, self._persona(), answer, self._wants_follow_up(answer))
+
+    def _can_follow_up(self) -> bool:
+        """Follow-ups start from the third question, once the last one is answered."""
+        return self.current_round >= 2 and bool(self.history) and bool(self.history[-1].get('answer'))
+
+    def _wants_follow_up(self, answer: str) -> bool:
+        """Session rules plus the local answer-quality gate (utils.followup_gate)."""
+        if not self._can_follow_up():
+            return False
+        return followup_gate.evaluate(answer, self.history[-1]['question'], "technical")[0]
+
+    def _persona(self) -> str:
+        return (
+            f"You are a smart and adaptive technical interviewer for the role of {self.role}. "
+            "Base your questions on the candidate's resume and the conversation so far; vary areas "
+            "like resume content, DSA, system design, debugging and logical reasoning. "
+            f"Never mention any issue with the resume's formatting.\n\nResume:\n{self.resume_context}"
+        )
+
+    def _followup_messages(self, previous_answer: str) -> Optional[List[BaseMessage]]:
+        """Build the follow-up prompt, or None when no follow-up applies."""
+        if not self._wants_follow_up(previous_answer):
             return None
+        last_qa = self.history[-1]
         
         followup_prompt = f"""Based on the candidate's response to the interview question, generate ONE relevant follow-up question to dig deeper.
 
@@ -110,12 +235,10 @@ Generate a natural, insightful follow-up question that:
 Note: never say an answer and never say a hint or logic
 Respond with ONLY the follow-up question, nothing else."""
         
-        followup_question = llm.invoke([
+        return [
             SystemMessage(content="You are an expert technical interviewer generating follow-up questions."),
             HumanMessage(content=followup_prompt)
-        ]).content
-        
-        return followup_question
+        ]
 
     def provide_answer(self, answer: str) -> None:
         """
@@ -254,6 +377,16 @@ Respond with ONLY the follow-up question, nothing else."""
         Returns:
             Dictionary with scores and summary feedback
         """
+        chain, inputs = self._feedback_request()
+        return self._parse_feedback(chain.invoke(inputs))
+
+    async def agenerate_feedback(self) -> Dict[str, Any]:
+        """Async version of generate_feedback."""
+        chain, inputs = self._feedback_request()
+        return self._parse_feedback(await chain.ainvoke(inputs))
+
+    def _feedback_request(self) -> Tuple[Runnable, Dict[str, str]]:
+        """Build the feedback chain and its inputs."""
         qa_summary = ""
         for i, qa in enumerate(self.history, 1):
             qa_summary += f"Q{i} : {qa['question']}\nA{i} : {qa['answer']}\n\n"
@@ -284,8 +417,10 @@ Return a JSON object like this:
             ("human", "{qa_summary}")
         ])
 
-        chain = feedback_prompt | llm
-        raw = chain.invoke({"qa_summary": qa_summary})
+        return feedback_prompt | llm, {"qa_summary": qa_summary}
+
+    @staticmethod
+    def _parse_feedback(raw: Any) -> Dict[str, Any]:
         raw_text = getattr(raw, "content", str(raw))
 
         # Replace invalid JSON literals
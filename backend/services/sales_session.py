@@ -1,10 +1,26 @@
 """Sales interview session service."""
-from typing import Dict, Any, List, Optional
+import os
+from collections import deque
+from typing import AsyncIterator, Deque, Dict, Any, List, Optional
+
+from pydantic import BaseModel, Field
 
 from utils.vector_memory import VectorMemory
-from services.feedback_service import generate_sales_feedback
-from config import llm
-from langchain_core.messages import SystemMessage, HumanMessage
+from services.feedback_service import generate_sales_feedback, agenerate_sales_feedback
+from chains.turn_chain import plan_next_turn
+from utils.followup_gate import followup_gate
+from config import llm, hedged_llm
+from langchain_core.messages import BaseMessage, SystemMessage, HumanMessage
+
+# Question queue configuration
+SALES_QUESTION_QUEUE = os.getenv("SALES_QUESTION_QUEUE", "1") == "1"
+SALES_QUEUE_SPARE = int(os.getenv("SALES_QUEUE_SPARE", "2"))  # extra questions to survive dedupe
+
+
+class SalesQuestionSet(BaseModel):
+    """A round's worth of sales interview questions."""
+
+    questions: List[str] = Field(description="Distinct interview questions, in the order to ask them")
 
 
 class SalesInterviewSession:
@@ -29,6 +45,7 @@ class SalesInterviewSession:
         self.vector_memory = VectorMemory()
         self.skipped_questions: List[str] = []  # Track skipped questions
         self.skip_count = 0  # Track number of skips
+        self.question_queue: Deque[str] = deque()  # Pre-generated questions (see aprefetch_questions)
         
         # Set initial greeting based on round type
         if round_type == "hiring_manager":
@@ -48,6 +65,119 @@ class SalesInterviewSession:
         if self.current_round >= self.rounds:
             return None
         
+        question = self._dequeue_question() or hedged_llm.invoke(self._question_messages()).content
+        
+        return self._record_question(question)
+
+    async def aask_question(self) -> Optional[str]:
+        """Async version of ask_question; awaits the LLM without holding a thread."""
+        if self.current_round >= self.rounds:
+            return None
+
+        question = self._dequeue_question() or (await hedged_llm.ainvoke(self._question_messages())).content
+
+        return self._record_question(question)
+
+    async def astream_question(self) -> AsyncIterator[str]:
+        """
+        Stream the next sales question token by token.
+
+        A queued question is yielded whole. The question is recorded once
+        the stream completes; nothing is yielded when rounds are complete.
+        """
+        if self.current_round >= self.rounds:
+            return
+
+        question = self._dequeue_question()
+        if question:
+            yield question
+        else:
+            parts = []
+            async for chunk in hedged_llm.astream(self._question_messages()):
+                parts.append(chunk.content)
+                yield chunk.content
+            question = "".join(parts)
+
+        self._record_question(question)
+
+    async def adraft_question(self) -> Optional[str]:
+        """
+        Generate the next question without recording it.
+
+        Returns:
+            Draft question or None if rounds complete
+        """
+        if self.current_round >= self.rounds:
+            return None
+
+        question = self._dequeue_question()
+        if question:
+            # Keep it queued: the draft may be discarded for a follow-up
+            self.question_queue.appendleft(question)
+            return question
+        return (await hedged_llm.ainvoke(self._question_messages())).content
+
+    async def aprefetch_questions(self) -> int:
+        """
+        Generate the round's questions in one LLM call and queue them.
+
+        Questions don't depend on the candidate's answers, so they can be
+        prepared before the interview starts. Near-duplicate topics are
+        dropped using VectorMemory.is_duplicate_topic. Failures are logged
+        and leave the queue empty; ask_question then generates live.
+
+        Returns:
+            Number of questions queued
+        """
+        if not SALES_QUESTION_QUEUE or self.question_queue:
+            return len(self.question_queue)
+
+        count = self.rounds + SALES_QUEUE_SPARE
+        messages = [
+            SystemMessage(content=self._question_system_prompt()),
+            HumanMessage(content=f"Generate {count} different sales interview questions for {self.role} role, "
+                                 f"each on a different topic, in the order they should be asked.")
+        ]
+        try:
+            question_set = await llm.with_structured_output(SalesQuestionSet).ainvoke(messages)
+        except Exception as e:
+            print(f"[Sales Question Queue Error] {e}")
+            return 0
+
+        seen = VectorMemory()
+        for question in question_set.questions:
+            question = question.strip()
+            if question and not seen.is_duplicate_topic(question):
+                seen.add_qa(question, "")
+                self.question_queue.append(question)
+        return len(self.question_queue)
+
+    def _dequeue_question(self) -> Optional[str]:
+        """Pop the next queued question whose topic hasn't been asked yet, or None."""
+        asked = VectorMemory()
+        for qa in self.history[1:]:
+            asked.add_qa(qa["question"], qa.get("answer") or "")
+
+        while self.question_queue:
+            question = self.question_queue.popleft()
+            if not asked.is_duplicate_topic(question):
+                return question
+        return None
+
+    def commit_question(self, question: str) -> str:
+        """Record a drafted question exactly as ask_question would have."""
+        if self.question_queue and self.question_queue[0] == question:
+            self.question_queue.popleft()
+        return self._record_question(question)
+
+    def _question_messages(self) -> List[BaseMessage]:
+        """Build the question prompt for the current round type."""
+        return [
+            SystemMessage(content=self._question_system_prompt()),
+            HumanMessage(content=f"Generate a sales interview question for {self.role} role. This is question {self.current_round + 1} of {self.rounds}.")
+        ]
+
+    def _question_system_prompt(self) -> str:
         # Different prompts for each round type
         if self.round_type == "hiring_manager":
             system_prompt = """You are an experienced sales hiring manager conducting a behavioral interview. 
@@ -79,11 +209,9 @@ NOTE:
 Ask ONE strategic question that helps assess their fit at a senior level.
 Keep it conversational and forward-looking."""
         
-        question = llm.invoke([
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=f"Generate a sales interview question for {self.role} role. This is question {self.current_round + 1} of {self.rounds}.")
-        ]).content
-        
+        return system_prompt
+
+    def _record_question(self, question: str) -> str:
         self.history.append({"question": question, "answer": None})
         self.current_round += 1
         return question
@@ -112,12 +240,77 @@ Keep it conversational and forward-looking."""
         Returns:
             Follow-up question or None
         """
-        if len(self.history) < 2:
+        messages = self._followup_messages(previous_answer)
+        if messages is None:
             return None
         
-        last_qa = self.history[-1] if self.history else None
-        if not last_qa or not last_qa.get("answer"):
+        followup_question = hedged_llm.invoke(messages).content
+        
+        return followup_question
+
+    async def agenerate_followup_question(self, previous_answer: str) -> Optional[str]:
+        """Async version of generate_followup_question."""
+        messages = self._followup_messages(previous_answer)
+        if messages is None:
+            return None
+
+        return (await hedged_llm.ainvoke(messages)).content
+
+    async def astream_followup_question(self, previous_answer: str) -> AsyncIterator[str]:
+        """Stream a follow-up question token by token; nothing is yielded when none applies."""
+        messages = self._followup_messages(previous_answer)
+        if messages is None:
+            return
+
+        async for chunk in hedged_llm.astream(messages):
+            yield chunk.content
+
+    async def aplan_turn(self, answer: str) -> Optional[str]:
+        """
+        Decide between a follow-up and the next question in one LLM call.
+
+        Replaces agenerate_followup_question followed by aask_question.
+        When no follow-up is wanted and a pre-generated question is queued,
+        it is served without any LLM call.
+
+        Args:
+            answer: The candidate's answer (already recorded with provide_answer)
+
+        Returns:
+            Text to send the candidate, or None when the round is complete
+        """
+        wants_follow_up = self._wants_follow_up(answer)
+        if (not wants_follow_up or self.meta.get("last_followup_asked")) and self.current_round < self.rounds:
+            question = self._dequeue_question()
+            if question:
+                self.meta["last_followup_asked"] = False
+                return self._record_question(question)
+        return await plan_next_turn(self, self._persona(), answer, wants_follow_up)
+
+    def _can_follow_up(self) -> bool:
+        """Follow-ups need an answered question beyond the greeting."""
+        return len(self.history) >= 2 and bool(self.history[-1].get("answer"))
+
+    def _wants_follow_up(self, answer: str) -> bool:
+        """Session rules plus the local answer-quality gate (utils.followup_gate)."""
+        if not self._can_follow_up():
+            return False
+        return followup_gate.evaluate(answer, self.history[-1]["question"], "sales")[0]
+
+    def _persona(self) -> str:
+        if self.round_type == "hiring_manager":
+            focus = ("an experienced sales hiring manager. Evaluate sales process, past results, handling "
+                     "objections and rejection, customer relationships and closing; probe for concrete numbers")
+        else:
+            focus = ("a VP/Senior Leader running the final sales round. Evaluate leadership, vision alignment, "
+                     "career goals, mentoring and strategic thinking about market and competition")
+        return f"You are {focus}. The candidate is interviewing for {self.role}. Keep questions short and conversational."
+
+    def _followup_messages(self, previous_answer: str) -> Optional[List[BaseMessage]]:
+        """Build the follow-up prompt, or None when no follow-up applies."""
+        if not self._wants_follow_up(previous_answer):
             return None
+        last_qa = self.history[-1]
         
         if self.round_type == "hiring_manager":
             followup_prompt = f"""Based on the candidate's response about their sales experience, generate ONE deep-dive follow-up question.
@@ -146,12 +339,10 @@ Generate a follow-up that:
 
 Keep it conversational (1-2 sentences)."""
         
-        followup_question = llm.invoke([
+        return [
             SystemMessage(content="You are an expert sales interviewer generating follow-up questions."),
             HumanMessage(content=followup_prompt)
-        ]).content
-        
-        return followup_question
+        ]
 
     def skip_question(self) -> Dict[str, Any]:
         """
@@ -202,3 +393,7 @@ Keep it conversational (1-2 sentences)."""
     def generate_feedback(self) -> Dict[str, Any]:
         """Generate sales interview feedback."""
         return generate_sales_feedback(self.history)
+
+    async def agenerate_feedback(self) -> Dict[str, Any]:
+        """Async version of generate_feedback."""
+        return await agenerate_sales_feedback(self.history)
@@ -0,0 +1,110 @@
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from utils.chat_history import BoundedChatHistory, message_tokens, recent_within_budget
+
+
+class FakeSummarizer:
+    """Stands in for the LLM: records each summary request and answers with a fixed text."""
+
+    def __init__(self, reply="Covered: caching, queues."):
+        self.reply = reply
+        self.prompts = []
+
+    def invoke(self, messages):
+        self.prompts.append(messages)
+        return AIMessage(content=self.reply)
+
+
+def turn(i):
+    return [HumanMessage(content=f"question {i} " + "word " * 20), AIMessage(content=f"answer {i} " + "word " * 20)]
+
+
+def wait_for_summary(history, count=1):
+    deadline = time.monotonic() + 5
+    while history.summaries < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert history.summaries == count
+
+
+def test_recent_within_budget_keeps_newest_and_at_least_one():
+    messages = turn(1) + turn(2)
+    kept = recent_within_budget(messages, message_tokens(messages[-2:]))
+    assert kept == messages[-2:]
+    assert recent_within_budget(messages, 1) == messages[-1:]
+
+
+def test_history_under_budget_is_replayed_verbatim():
+    summarizer = FakeSummarizer()
+    history = BoundedChatHistory(token_budget=1000, summarizer=summarizer)
+    history.add_messages(turn(1))
+
+    assert history.messages == turn(1)
+    assert summarizer.prompts == []
+
+
+def test_old_turns_are_folded_into_a_summary():
+    summarizer = FakeSummarizer()
+    budget = message_tokens(turn(0)) * 2
+    history = BoundedChatHistory(token_budget=budget, summarizer=summarizer)
+
+    for i in range(3):
+        history.add_messages(turn(i))
+    wait_for_summary(history)
+
+    view = history.messages
+    assert isinstance(view[0], SystemMessage)
+    assert "Covered: caching, queues." in view[0].content
+    assert message_tokens(view[1:]) <= budget
+    assert view[-1] == turn(2)[1]
+    # The oldest turn went to the summarizer; the full record is kept
+    assert "question 0" in summarizer.prompts[0][1].content
+    assert len(history.all_messages) == 6
+    assert history.stats()["summarized"] > 0
+
+
+def test_failed_summary_leaves_history_unfolded():
+    class Failing:
+        def invoke(self, messages):
+            raise RuntimeError("provider down")
+
+    budget = message_tokens(turn(0)) * 2
+    history = BoundedChatHistory(token_budget=budget, summarizer=Failing())
+    for i in range(3):
+        history.add_messages(turn(i))
+
+    deadline = time.monotonic() + 5
+    while history._folding and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert history.summary == ""
+    assert history.stats()["summarized"] == 0
+    # Prompts still stay within budget by dropping the oldest turns
+    assert message_tokens(history.messages) <= budget
+
+
+def test_clear_drops_a_fold_still_in_flight():
+    summarizer = FakeSummarizer()
+    budget = message_tokens(turn(0)) * 2
+    history = BoundedChatHistory(token_budget=budget, summarizer=summarizer)
+    generation = history._generation
+
+    history.add_messages(turn(0) + turn(1) + turn(2))
+    history.clear()
+    # A fold claimed before clear() lands afterwards and must be ignored
+    history._fold(generation, 2, turn(0), "")
+
+    assert history.summary == ""
+    assert history.messages == []
+
+
+def test_summaries_can_be_disabled():
+    summarizer = FakeSummarizer()
+    history = BoundedChatHistory(
+        token_budget=message_tokens(turn(0)), summarize=False, summarizer=summarizer
+    )
+    for i in range(3):
+        history.add_messages(turn(i))
+
+    assert summarizer.prompts == []
+    assert history.messages == turn(2)
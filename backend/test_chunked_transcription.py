@@ -0,0 +1,26 @@
+from utils.chunked_transcription import stitch_transcripts
+
+
+def test_chunks_without_overlap_are_joined():
+    assert stitch_transcripts(["first part", "second part"], [False, False]) == "first part second part"
+
+
+def test_words_repeated_across_an_overlap_are_dropped_once():
+    texts = ["we cache the results by hash", "by hash and expire them", "them after ten minutes"]
+    assert stitch_transcripts(texts, [False, True, True]) == (
+        "we cache the results by hash and expire them after ten minutes"
+    )
+
+
+def test_overlap_matching_ignores_case_and_punctuation():
+    texts = ["then we scale the workers.", "Workers, then the queue drains"]
+    assert stitch_transcripts(texts, [False, True]) == "then we scale the workers. then the queue drains"
+
+
+def test_overlap_without_shared_words_keeps_everything():
+    assert stitch_transcripts(["alpha beta", "gamma delta"], [False, True]) == "alpha beta gamma delta"
+
+
+def test_runs_longer_than_the_limit_are_not_searched():
+    texts = ["one two three four", "two three four five"]
+    assert stitch_transcripts(texts, [False, True], max_overlap_words=2) == "one two three four two three four five"
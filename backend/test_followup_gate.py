@@ -0,0 +1,65 @@
+from utils.followup_gate import FollowupGate, keyword_coverage
+
+QUESTION = "How would you design a caching layer for a read-heavy REST API?"
+STRONG_ANSWER = (
+    "I would put a Redis cache in front of the database and cache the REST API responses by request key, "
+    "with a TTL per endpoint. For a read-heavy workload I would use cache-aside, invalidate entries when "
+    "writes happen, and add request coalescing so a cache miss on a hot key does not stampede the database layer."
+)
+
+
+def test_keyword_coverage_matches_inflections():
+    assert keyword_coverage("We kept optimizing the query plans", "Explain how you optimize queries") == 0.5
+    assert keyword_coverage("anything", "How did you do it?") == 1.0
+
+
+def test_strong_answer_skips_the_followup():
+    gate = FollowupGate(min_words=30)
+    assert gate.evaluate(STRONG_ANSWER, QUESTION) == (False, "strong_answer")
+
+
+def test_short_answer_gets_a_followup():
+    gate = FollowupGate(min_words=30)
+    assert gate.evaluate("Use Redis.", QUESTION) == (True, "short_answer")
+
+
+def test_confused_answer_gets_a_followup():
+    gate = FollowupGate(min_words=10)
+    answer = (
+        "I don't know, I'm not sure what you mean by caching layer, can you repeat the question please? "
+        "I am confused about what a layer would be here honestly sorry."
+    )
+    assert gate.evaluate(answer, QUESTION) == (True, "confused")
+
+
+def test_off_topic_answer_gets_a_followup():
+    gate = FollowupGate(min_words=10)
+    answer = (
+        "I enjoy cooking pasta on weekends and watching football matches with friends, and last summer I "
+        "travelled to Spain and Italy to see the beaches and eat lots of gelato every single day of the trip."
+    )
+    assert gate.evaluate(answer, QUESTION) == (True, "off_topic")
+
+
+def test_low_keyword_coverage_gets_a_followup():
+    gate = FollowupGate(min_words=5, min_coverage=0.9)
+    answer = "I would put Redis in front of the database with a short expiry on every entry we store."
+    assert gate.evaluate(answer, QUESTION) == (True, "low_coverage")
+
+
+def test_disabled_gate_always_allows_a_followup():
+    gate = FollowupGate(enabled=False)
+    assert gate.evaluate(STRONG_ANSWER, QUESTION) == (True, "gate_disabled")
+    assert gate.stats()["checked"] == 0
+
+
+def test_stats_count_decisions():
+    gate = FollowupGate(min_words=30)
+    gate.evaluate(STRONG_ANSWER, QUESTION)
+    gate.evaluate("Use Redis.", QUESTION)
+
+    stats = gate.stats()
+    assert stats["checked"] == 2
+    assert stats["skipped"] == 1
+    assert stats["skip_rate"] == 0.5
+    assert stats["reasons"] == {"strong_answer": 1, "short_answer": 1}
@@ -0,0 +1,242 @@
+import asyncio
+import time
+
+import pytest
+
+from utils import llm_client
+from utils.llm_client import (
+    CircuitBreaker, CircuitOpenError, LLMGuard, LLMUnavailableError, QuotaExceededError, QuotaLimiter, open_stream
+)
+
+
+class FakeClock:
+    """Stands in for the time module: sleeping just moves the clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(llm_client, "time", fake)
+    return fake
+
+
+def flaky(failures, error=TimeoutError):
+    """Attempt that fails the first `failures` times, then returns "ok"."""
+    calls = []
+
+    def attempt(timeout):
+        calls.append(timeout)
+        if len(calls) <= failures:
+            raise error("boom")
+        return "ok"
+
+    return attempt, calls
+
+
+def roomy_quota():
+    return QuotaLimiter(requests_per_minute=1000, tokens_per_minute=10 ** 6, workers=1, completion_tokens=0)
+
+
+def test_breaker_opens_after_threshold_and_recovers_through_one_trial(clock):
+    breaker = CircuitBreaker(threshold=3, cooldown=30)
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    assert breaker.retry_after() == 30
+
+    clock.now += 30
+    assert breaker.state == "half_open"
+    assert breaker.allow()       # the trial call
+    assert not breaker.allow()   # only one at a time
+
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
+
+
+def test_failed_trial_reopens_the_breaker(clock):
+    breaker = CircuitBreaker(threshold=1, cooldown=10)
+    breaker.record_failure()
+    clock.now += 10
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+def test_quota_admits_up_to_the_per_process_share(clock):
+    quota = QuotaLimiter(requests_per_minute=4, tokens_per_minute=10 ** 6, workers=2, completion_tokens=0)
+    assert quota.reserve(10, max_wait=0) == 0
+    assert quota.reserve(10, max_wait=0) == 0
+    assert quota.reserve(10, max_wait=0) is None  # 2 requests per minute in this process
+
+    wait = quota.reserve(10, max_wait=60)
+    assert wait == pytest.approx(30)  # refills at one request per 30 s
+
+    clock.now += 60
+    assert quota.reserve(10, max_wait=0) == 0
+
+
+def test_quota_reserves_completion_tokens(clock):
+    quota = QuotaLimiter(requests_per_minute=100, tokens_per_minute=1000, workers=1, completion_tokens=300)
+    assert quota.reserve(300, max_wait=0) == 0
+    assert quota.reserve(300, max_wait=0) is None  # the prompts alone would fit
+    assert quota.tokens.tokens == pytest.approx(400)
+
+
+def test_guard_retries_transient_errors_with_backoff(clock, monkeypatch):
+    monkeypatch.setattr(llm_client, "backoff_delay", lambda attempt: 2 ** attempt)
+    guard = LLMGuard("test", roomy_quota(), CircuitBreaker(threshold=10), timeout=5, deadline=60, max_retries=3)
+    attempt, calls = flaky(2)
+
+    assert guard.call(attempt, prompt_tokens=10) == "ok"
+    assert len(calls) == 3
+    assert [s for s in clock.slept if s] == [1, 2]
+    stats = guard.stats()
+    assert stats["retries"] == 2 and stats["succeeded"] == 1 and stats["failed"] == 0
+    assert stats["breaker"] == "closed"
+
+
+def test_guard_gives_up_after_max_retries(clock, monkeypatch):
+    monkeypatch.setattr(llm_client, "backoff_delay", lambda attempt: 0.1)
+    guard = LLMGuard("test", roomy_quota(), CircuitBreaker(threshold=10), timeout=5, deadline=60, max_retries=2)
+    attempt, calls = flaky(10)
+
+    with pytest.raises(LLMUnavailableError) as raised:
+        guard.call(attempt, prompt_tokens=10)
+    assert len(calls) == 3
+    assert raised.value.retry_after >= 1
+    assert guard.stats()["failed"] == 1
+
+
+def test_guard_does_not_retry_bad_requests(clock):
+    breaker = CircuitBreaker(threshold=1)
+    guard = LLMGuard("test", roomy_quota(), breaker, timeout=5, deadline=60, max_retries=3)
+    attempt, calls = flaky(10, error=ValueError)
+
+    with pytest.raises(ValueError):
+        guard.call(attempt, prompt_tokens=10)
+    assert len(calls) == 1
+    assert breaker.state == "closed"
+
+
+def test_guard_stops_retrying_at_the_deadline(clock, monkeypatch):
+    monkeypatch.setattr(llm_client, "backoff_delay", lambda attempt: 4.0)
+    guard = LLMGuard("test", roomy_quota(), CircuitBreaker(threshold=10), timeout=5, deadline=10, max_retries=10)
+    calls = []
+
+    def times_out(timeout):
+        calls.append(timeout)
+        clock.now += timeout
+        raise TimeoutError()
+
+    with pytest.raises(LLMUnavailableError):
+        guard.call(times_out, prompt_tokens=10)
+    # t=0-5, backoff to 9, then only the 1 s left; another backoff would pass the deadline
+    assert calls == [5, 1]
+
+
+def test_guard_fails_fast_while_the_breaker_is_open(clock):
+    breaker = CircuitBreaker(threshold=1, cooldown=30)
+    breaker.record_failure()
+    guard = LLMGuard("test", roomy_quota(), breaker)
+    attempt, calls = flaky(0)
+
+    with pytest.raises(CircuitOpenError) as raised:
+        guard.call(attempt, prompt_tokens=10)
+    assert calls == []
+    assert raised.value.retry_after == 30
+
+
+def test_guard_rejects_calls_the_quota_cannot_admit_in_time(clock):
+    quota = QuotaLimiter(requests_per_minute=1, tokens_per_minute=10 ** 6, workers=1, completion_tokens=0)
+    guard = LLMGuard("test", quota, CircuitBreaker(), deadline=10)
+    attempt, calls = flaky(0)
+
+    assert guard.call(attempt, prompt_tokens=10) == "ok"
+    with pytest.raises(QuotaExceededError):
+        guard.call(attempt, prompt_tokens=10)
+    assert len(calls) == 1
+
+
+def test_async_attempts_are_cancelled_at_the_deadline(monkeypatch):
+    monkeypatch.setattr(llm_client, "backoff_delay", lambda attempt: 0.01)
+    guard = LLMGuard("test", roomy_quota(), CircuitBreaker(threshold=100), timeout=0.2, deadline=0.5, max_retries=100)
+    started = []
+
+    async def hangs(timeout):
+        started.append(timeout)
+        await asyncio.sleep(10)
+
+    begin = time.monotonic()
+    with pytest.raises(LLMUnavailableError):
+        asyncio.run(guard.acall(hangs, prompt_tokens=10))
+    assert time.monotonic() - begin < 1.5
+    assert len(started) >= 2
+    assert all(timeout <= 0.2 for timeout in started)
+
+
+def fake_stream(name, first_after, closed):
+    """Stream that yields its first chunk after `first_after` seconds and records when it is closed."""
+    async def stream():
+        try:
+            await asyncio.sleep(first_after)
+            yield f"{name}-1"
+            yield f"{name}-2"
+        finally:
+            closed.append(name)
+
+    return stream()
+
+
+def test_hedged_stream_closes_the_losing_stream(monkeypatch):
+    monkeypatch.setattr(llm_client, "LLM_HEDGE_DELAY", 0.01)
+    guard = LLMGuard("test", roomy_quota(), CircuitBreaker(), timeout=5, deadline=5, hedging=True)
+    delays = iter([1.0, 0.0])  # slow primary, fast hedge
+    closed = []
+
+    async def attempt(timeout):
+        delay = next(delays)
+        return await open_stream(fake_stream("primary" if delay else "hedge", delay, closed))
+
+    async def discard(result):
+        await result[1].aclose()
+
+    async def run():
+        first, stream = await guard.ahedged(attempt, prompt_tokens=10, kind="stream", discard=discard)
+        # The loser is closed by the time ahedged returns
+        assert closed == ["primary"]
+        return [first] + [chunk async for chunk in stream]
+
+    assert asyncio.run(run()) == ["hedge-1", "hedge-2"]
+    assert closed == ["primary", "hedge"]
+    assert guard.stats()["hedge_wins"] == 1
+
+
+def test_open_stream_closes_the_stream_when_cancelled():
+    closed = []
+
+    async def run():
+        task = asyncio.ensure_future(open_stream(fake_stream("slow", 1.0, closed)))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert closed == ["slow"]
@@ -0,0 +1,39 @@
+from utils.resume_context import build_resume_digest, resume_to_text, RESUME_ITEM_CHARS
+
+
+def _stored_resume():
+    # Shape of a resume as setup_session loads it from the user document
+    return {
+        "name": "Asha Rao",
+        "email": "asha@example.com",
+        "phone": "555-0100",
+        "skills": ["Python", "FastAPI", "MongoDB"],
+        "projects": [
+            {"title": "Interview bot", "tech": ["FastAPI", "Whisper"], "description": "Voice interview practice " * 5},
+            {"title": "Trip planner", "tech": ["React"], "description": "Itinerary builder"},
+        ],
+        "experience": [
+            {"title": "Backend Engineer", "company": "Acme", "duration": "2022-2024", "description": "Built APIs " * 30},
+            {"title": "Intern", "company": "Globex", "duration": "2021", "description": "Data pipelines " * 30},
+            {"title": "Teaching Assistant", "company": "State University", "duration": "2020", "description": "Ran labs"},
+        ],
+    }
+
+
+def test_every_job_and_project_gets_its_own_entry():
+    digest = build_resume_digest(resume_to_text(_stored_resume()), token_budget=1000)
+
+    assert "Asha" not in digest and "555-0100" not in digest
+    assert digest.startswith("Skills: Python, FastAPI, MongoDB")
+    for entry in ("Backend Engineer", "Intern", "Teaching Assistant", "Interview bot", "Trip planner"):
+        assert entry in digest
+    # The item cap applies per entry, so a long job does not swallow the others
+    for line in digest.splitlines():
+        assert len(line) <= RESUME_ITEM_CHARS + 3
+
+
+def test_digest_stays_within_budget():
+    digest = build_resume_digest(resume_to_text(_stored_resume()), token_budget=60)
+
+    assert len(digest) / 4 <= 60 + 10  # titles and bullets are estimated, not exact
+    assert "Skills:" in digest
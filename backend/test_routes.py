@@ -8,6 +8,29 @@ client = TestClient(app)
 # Global token for authenticated endpoints
 auth_token = None
 
+def test_readiness_reports_models(monkeypatch):
+    from utils import warmup
+    from utils.speech_to_text import routed_backends
+
+    # Warm-up has started but not finished (no worker farm in tests)
+    monkeypatch.setattr(warmup, "WARMUP_ON_STARTUP", True)
+    monkeypatch.setattr(warmup, "_state", {"started": True, "done": False, "error": None, "seconds": None})
+
+    response = client.get("/api/ready")
+    assert response.status_code == 503
+    assert response.json()["ready"] is False
+
+    monkeypatch.setitem(warmup._state, "done", True)
+    monkeypatch.setitem(warmup._state, "seconds", 1.5)
+
+    response = client.get("/api/ready")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["ready"] is True
+    assert body["warmup"]["done"] is True
+    assert sorted(body["stt_backends"]) == sorted(routed_backends())
+
+
 def test_signup_and_login():
     global auth_token
     signup_data = {
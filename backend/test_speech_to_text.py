@@ -0,0 +1,45 @@
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from utils.speech_to_text import quantize_int8
+
+
+class SubclassedLinear(torch.nn.Linear):
+    """Like whisper.model.Linear: an nn.Linear subclass with its own forward."""
+
+    def forward(self, x):
+        return torch.nn.functional.linear(x, self.weight.to(x.dtype), self.bias)
+
+
+def _count_quantized(model):
+    return sum(isinstance(m, torch.ao.nn.quantized.dynamic.Linear) for m in model.modules())
+
+
+def test_subclassed_linear_layers_are_quantized():
+    torch.manual_seed(0)
+    model = torch.nn.Sequential(SubclassedLinear(16, 32), torch.nn.ReLU(), SubclassedLinear(32, 4)).eval()
+    x = torch.randn(8, 16)
+    with torch.no_grad():
+        expected = model(x)
+
+    quantized = quantize_int8(model)
+
+    assert _count_quantized(quantized) == 2
+    with torch.no_grad():
+        assert torch.allclose(quantized(x), expected, atol=0.05)
+
+
+def test_whisper_layers_are_quantized():
+    whisper_model = pytest.importorskip("whisper.model")
+    # Tiny's shape with random weights, so no checkpoint download is needed
+    dims = whisper_model.ModelDimensions(80, 1500, 384, 6, 4, 51865, 448, 384, 6, 4)
+    model = whisper_model.Whisper(dims).eval()
+    linears = sum(isinstance(m, torch.nn.Linear) for m in model.modules())
+
+    assert _count_quantized(quantize_int8(model)) == linears
+
+
+def test_model_without_linear_layers_is_rejected():
+    with pytest.raises(RuntimeError):
+        quantize_int8(torch.nn.Sequential(torch.nn.ReLU()))
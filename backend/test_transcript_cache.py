@@ -0,0 +1,128 @@
+import asyncio
+
+import numpy as np
+
+from utils import transcript_cache
+from utils.transcript_cache import TranscriptCache, audio_key, new_audio_hash
+from utils.speech_pipeline import SpeechPipeline
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+def test_incremental_hash_matches_audio_key():
+    digest = new_audio_hash()
+    digest.update(b"abc")
+    digest.update(b"def")
+    assert digest.hexdigest() == audio_key(b"abcdef")
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(transcript_cache, "time", clock)
+    cache = TranscriptCache(max_entries=4, ttl=10)
+
+    cache.put("a", "hello", 0.8)
+    clock.now += 9
+    assert cache.get("a") == ("hello", 0.8)
+
+    clock.now += 2
+    assert cache.get("a") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TranscriptCache(max_entries=2, ttl=60)
+    cache.put("a", "first", 0.5)
+    cache.put("b", "second", 0.6)
+    cache.get("a")  # "b" is now the least recently used
+    cache.put("c", "third", 0.7)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == ("first", 0.5)
+    assert cache.get("c") == ("third", 0.7)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entry_without_confidence_only_serves_transcript_requests():
+    cache = TranscriptCache(max_entries=2, ttl=60)
+    cache.put("a", "text only", None)
+
+    assert cache.get("a", with_confidence=True) is None
+    assert cache.get("a", with_confidence=False) == ("text only", None)
+
+    # A later scored result fills in the confidence
+    cache.put("a", "text only", 0.9)
+    assert cache.get("a") == ("text only", 0.9)
+
+
+def test_disabled_cache_stores_nothing():
+    cache = TranscriptCache(max_entries=0, ttl=60)
+    cache.put("a", "hello", 0.8)
+    assert cache.get("a") is None
+
+
+def test_identical_in_flight_analyses_are_coalesced(monkeypatch):
+    pipeline = SpeechPipeline(workers=1, queue_depth=4)
+    calls = []
+
+    async def fake_analyze(loop, waveform, with_confidence):
+        calls.append(with_confidence)
+        await asyncio.sleep(0.05)
+        return "an answer", 0.75
+
+    monkeypatch.setattr(pipeline, "_analyze_waveform", fake_analyze)
+    waveform = np.zeros(16000, dtype=np.float32)
+
+    async def run():
+        return await asyncio.gather(
+            pipeline._analyze_cached("key", waveform, True),
+            pipeline._analyze_cached("key", waveform, True),
+            pipeline._analyze_cached("key", waveform, False),
+        )
+
+    results = asyncio.run(run())
+
+    assert calls == [True]
+    assert results == [("an answer", 0.75), ("an answer", 0.75), ("an answer", None)]
+    assert pipeline.stats()["transcript_cache"]["coalesced"] == 2
+
+    # Later requests are answered from the cache
+    assert asyncio.run(pipeline._analyze_cached("key", waveform, True)) == ("an answer", 0.75)
+    assert calls == [True]
+
+
+def test_cancelling_the_first_caller_does_not_fail_coalesced_waiters(monkeypatch):
+    pipeline = SpeechPipeline(workers=1, queue_depth=4)
+    calls = []
+
+    async def fake_analyze(loop, waveform, with_confidence):
+        calls.append(with_confidence)
+        await asyncio.sleep(0.05)
+        return "an answer", 0.75
+
+    monkeypatch.setattr(pipeline, "_analyze_waveform", fake_analyze)
+    waveform = np.zeros(16000, dtype=np.float32)
+
+    async def run():
+        first = asyncio.ensure_future(pipeline._analyze_cached("key", waveform, True))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(pipeline._analyze_cached("key", waveform, True))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        result = await waiter
+        return first, result
+
+    first, result = asyncio.run(run())
+
+    assert first.cancelled()
+    assert result == ("an answer", 0.75)
+    assert calls == [True]
+    assert pipeline._pending == {}
+    assert asyncio.run(pipeline._analyze_cached("key", waveform, True)) == ("an answer", 0.75)
+    assert calls == [True]
@@ -1,21 +1,35 @@
-"""Utility modules."""
-from .speech_to_text import transcribe
-from .resume_parser import parse_resume_with_llm, extract_text_from_pdf
-from .confidence import get_confidence_score
-from .vector_memory import VectorMemory
-from .sanitize import sanitize_for_json, safe_json_dumps
-from .off_topic_detector import detect_and_respond_to_offtopic, OffTopicDetector
-from .confusion_detector import ConfusionDetector
+"""Utility modules.
 
-__all__ = [
-    "transcribe",
-    "parse_resume_with_llm",
-    "extract_text_from_pdf",
-    "get_confidence_score",
-    "VectorMemory",
-    "sanitize_for_json",
-    "safe_json_dumps",
-    "detect_and_respond_to_offtopic",
-    "OffTopicDetector",
-    "ConfusionDetector",
-]
+Submodules are imported on first attribute access so that importing
+``utils`` does not pull in Whisper, librosa, PyMuPDF or LangChain.
+"""
+import importlib
+
+# Public name -> submodule that defines it
+_EXPORTS = {
+    "decode_audio": "audio",
+    "SAMPLE_RATE": "audio",
+    "transcribe": "speech_to_text",
+    "parse_resume_with_llm": "resume_parser",
+    "extract_text_from_pdf": "resume_parser",
+    "get_confidence_score": "confidence",
+    "speech_pipeline": "speech_pipeline",
+    "SpeechPipeline": "speech_pipeline",
+    "PipelineBusyError": "speech_pipeline",
+    "VectorMemory": "vector_memory",
+    "sanitize_for_json": "sanitize",
+    "safe_json_dumps": "sanitize",
+    "detect_and_respond_to_offtopic": "off_topic_detector",
+    "OffTopicDetector": "off_topic_detector",
+    "ConfusionDetector": "confusion_detector",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,221 @@
+"""Audio ingestion utilities."""
+import asyncio
+import subprocess
+from typing import AsyncIterator, Callable, List, Optional
+
+import numpy as np
+
+# Whisper models operate on 16 kHz mono audio
+SAMPLE_RATE = 16000
+
+
+class AudioTooLongError(ValueError):
+    """Raised when decoded audio exceeds the allowed duration."""
+
+    def __init__(self, max_seconds: float):
+        super().__init__(f"Audio is longer than {max_seconds:g} seconds")
+        self.max_seconds = max_seconds
+
+
+# ffmpeg demuxers for the compressed formats browsers record (MediaRecorder)
+STREAM_FORMATS = {"webm": "matroska", "ogg": "ogg", "opus": "ogg"}
+
+
+def _ffmpeg_command(sr: int, input_format: Optional[str] = None) -> List[str]:
+    """
+    ffmpeg invocation that decodes stdin to 16-bit mono PCM on stdout.
+
+    Args:
+        sr: Target sample rate
+        input_format: Key of STREAM_FORMATS for live streams; the
+            container is then not probed, so decoded audio starts
+            flowing as soon as the first packets arrive
+    """
+    cmd = ["ffmpeg", "-loglevel", "error", "-threads", "0"]
+    if input_format is not None:
+        cmd += ["-f", STREAM_FORMATS[input_format], "-probesize", "32", "-analyzeduration", "0", "-fflags", "nobuffer"]
+    return cmd + [
+        "-i", "pipe:0",
+        "-f", "s16le",
+        "-ac", "1",
+        "-acodec", "pcm_s16le",
+        "-ar", str(sr),
+        "pipe:1",
+    ]
+
+
+def decode_audio(data: bytes, sr: int = SAMPLE_RATE) -> np.ndarray:
+    """
+    Decode uploaded audio bytes into a mono float32 waveform.
+
+    The bytes are piped through ffmpeg so any container the browser sends
+    (wav, webm/opus, ogg, ...) is decoded once, without touching the disk.
+
+    Args:
+        data: Raw bytes of the uploaded audio file
+        sr: Target sample rate
+
+    Returns:
+        Waveform as a float32 array in the range [-1.0, 1.0]
+    """
+    cmd = _ffmpeg_command(sr)
+    try:
+        out = subprocess.run(cmd, input=data, capture_output=True, check=True).stdout
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Failed to decode audio: {e.stderr.decode(errors='ignore')}") from e
+
+    return np.frombuffer(out, np.int16).flatten().astype(np.float32) / 32768.0
+
+
+async def decode_audio_stream(
+    chunks: AsyncIterator[bytes],
+    sr: int = SAMPLE_RATE,
+    max_seconds: Optional[float] = None
+) -> np.ndarray:
+    """
+    Decode audio while it is still arriving.
+
+    Chunks are written to ffmpeg's stdin as they are read, and decoded
+    PCM is collected from stdout at the same time, so the compressed
+    upload is never held in full and an over-long recording is rejected
+    as soon as it passes the limit.
+
+    Args:
+        chunks: Async iterator over the raw bytes of the audio file
+        sr: Target sample rate
+        max_seconds: Longest decoded duration accepted (None = no limit)
+
+    Returns:
+        Waveform as a float32 array in the range [-1.0, 1.0]
+
+    Raises:
+        AudioTooLongError: If the audio exceeds max_seconds
+        RuntimeError: If ffmpeg cannot decode the stream
+    """
+    proc = await asyncio.create_subprocess_exec(
+        *_ffmpeg_command(sr),
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    max_bytes = int(max_seconds * sr) * 2 if max_seconds else None
+
+    async def feed() -> None:
+        try:
+            async for chunk in chunks:
+                proc.stdin.write(chunk)
+                await proc.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # ffmpeg stopped reading; its exit code reports why
+        finally:
+            proc.stdin.close()
+
+    feeder = asyncio.create_task(feed())
+    errors = asyncio.create_task(proc.stderr.read())
+    try:
+        out = bytearray()
+        while True:
+            block = await proc.stdout.read(1 << 16)
+            if not block:
+                break
+            out += block
+            if max_bytes is not None and len(out) > max_bytes:
+                raise AudioTooLongError(max_seconds)
+        # Surfaces upload errors raised while reading the chunks
+        await feeder
+        if await proc.wait() != 0:
+            raise RuntimeError(f"Failed to decode audio: {(await errors).decode(errors='ignore')}")
+    except BaseException:
+        feeder.cancel()
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+        raise
+    finally:
+        errors.cancel()
+
+    return np.frombuffer(bytes(out), np.int16).astype(np.float32) / 32768.0
+
+
+class StreamingDecoder:
+    """
+    Long-running ffmpeg process decoding a compressed live stream.
+
+    Used for WebSocket answers recorded with MediaRecorder: each chunk is
+    written to ffmpeg as it arrives and decoded PCM is handed to a
+    callback as soon as ffmpeg emits it.
+    """
+
+    def __init__(self, on_samples: Callable[[np.ndarray], None], input_format: str, sr: int = SAMPLE_RATE):
+        """
+        Initialize the decoder (ffmpeg is started by start()).
+
+        Args:
+            on_samples: Called on the event loop with each decoded float32 block
+            input_format: Key of STREAM_FORMATS
+            sr: Target sample rate
+        """
+        if input_format not in STREAM_FORMATS:
+            raise ValueError(f"Unsupported stream format: {input_format}")
+        self.on_samples = on_samples
+        self.input_format = input_format
+        self.sr = sr
+        self._proc: Optional[asyncio.subprocess.Process] = None
+        self._reader: Optional[asyncio.Task] = None
+        self._errors: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Start ffmpeg and the task that forwards its output."""
+        self._proc = await asyncio.create_subprocess_exec(
+            *_ffmpeg_command(self.sr, self.input_format),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        self._reader = asyncio.create_task(self._forward())
+        self._errors = asyncio.create_task(self._proc.stderr.read())
+
+    async def feed(self, chunk: bytes) -> None:
+        """Write the next chunk of the compressed stream."""
+        if self._proc is None:
+            await self.start()
+        try:
+            self._proc.stdin.write(chunk)
+            await self._proc.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # ffmpeg exited; close() reports the error
+
+    async def close(self) -> None:
+        """
+        End the stream and wait until every decoded sample is delivered.
+
+        Raises:
+            RuntimeError: If ffmpeg could not decode the stream
+        """
+        if self._proc is None:
+            return
+        self._proc.stdin.close()
+        await self._reader
+        if await self._proc.wait() != 0:
+            raise RuntimeError(f"Failed to decode audio stream: {(await self._errors).decode(errors='ignore')}")
+
+    def abort(self) -> None:
+        """Stop decoding immediately, discarding pending output."""
+        if self._reader is not None:
+            self._reader.cancel()
+        if self._errors is not None:
+            self._errors.cancel()
+        if self._proc is not None and self._proc.returncode is None:
+            self._proc.kill()
+
+    async def _forward(self) -> None:
+        remainder = b""
+        while True:
+            block = await self._proc.stdout.read(1 << 14)
+            if not block:
+                return
+            block = remainder + block
+            usable = len(block) - len(block) % 2
+            remainder = block[usable:]
+            if usable:
+                self.on_samples(np.frombuffer(block[:usable], np.int16).astype(np.float32) / 32768.0)
@@ -0,0 +1,122 @@
+"""Dynamic micro-batching in front of the Whisper model."""
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from utils.audio import SAMPLE_RATE
+from utils.speech_to_text import transcribe, transcribe_batch
+
+# Batching configuration (a 0 ms window disables batching)
+STT_BATCH_WINDOW_MS = float(os.getenv("STT_BATCH_WINDOW_MS", "0"))
+STT_MAX_BATCH = int(os.getenv("STT_MAX_BATCH", "8"))
+
+# Whisper's fixed input window; longer clips are transcribed on their own
+MAX_BATCH_SECONDS = 30
+
+
+class BatchingTranscriber:
+    """Collects concurrent transcription requests into batched Whisper passes."""
+
+    def __init__(self, window_ms: float = STT_BATCH_WINDOW_MS, max_batch: int = STT_MAX_BATCH):
+        """
+        Initialize the transcriber (the batching thread starts lazily).
+
+        Args:
+            window_ms: How long to wait for more requests after the first one
+            max_batch: Maximum number of clips per batched pass
+        """
+        self.window = window_ms / 1000.0
+        self.max_batch = max(1, max_batch)
+        self._queue: "queue.Queue[Tuple[np.ndarray, Future]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._batches = 0
+        self._batched_clips = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Whether requests should be routed through the batcher."""
+        return self.window > 0
+
+    def submit(self, waveform: np.ndarray) -> Future:
+        """
+        Queue a waveform for the next batch.
+
+        Args:
+            waveform: 16 kHz mono float32 audio
+
+        Returns:
+            Future resolving to the transcript text
+        """
+        self._ensure_started()
+        future: Future = Future()
+        self._queue.put((waveform, future))
+        return future
+
+    def transcribe(self, waveform: np.ndarray) -> str:
+        """Blocking helper: submit a waveform and wait for its transcript."""
+        return self.submit(waveform).result()
+
+    def stats(self) -> dict:
+        """Get batching counters."""
+        return {
+            "window_ms": self.window * 1000,
+            "max_batch": self.max_batch,
+            "batches": self._batches,
+            "avg_batch_size": round(self._batched_clips / self._batches, 2) if self._batches else 0.0,
+            "queued": self._queue.qsize(),
+        }
+
+    def _ensure_started(self) -> None:
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="stt-batcher", daemon=True)
+                self._thread.start()
+
+    def _collect(self) -> List[Tuple[np.ndarray, Future]]:
+        """Block for one request, then gather more until the window closes or the batch is full."""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _loop(self) -> None:
+        while True:
+            # Skip clips whose caller gave up (e.g. timed out) while queued
+            batch = [(w, f) for w, f in self._collect() if f.set_running_or_notify_cancel()]
+            short = [(w, f) for w, f in batch if len(w) <= MAX_BATCH_SECONDS * SAMPLE_RATE]
+            long = [(w, f) for w, f in batch if len(w) > MAX_BATCH_SECONDS * SAMPLE_RATE]
+
+            if short:
+                self._batches += 1
+                self._batched_clips += len(short)
+                try:
+                    texts = transcribe_batch([w for w, _ in short])
+                    for (_, future), text in zip(short, texts):
+                        future.set_result(text)
+                except Exception as e:
+                    for _, future in short:
+                        future.set_exception(e)
+
+            # Clips beyond one window need Whisper's sliding-window decode
+            for waveform, future in long:
+                try:
+                    future.set_result(transcribe(waveform))
+                except Exception as e:
+                    future.set_exception(e)
+
+
+# Shared batching transcriber
+batch_transcriber = BatchingTranscriber()
@@ -0,0 +1,208 @@
+"""Token-bounded chat history that folds older turns into a rolling summary."""
+import os
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.chat_history import BaseChatMessageHistory
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage, get_buffer_string
+from langchain_core.prompt_values import PromptValue
+from langchain_core.runnables import RunnableLambda
+
+from utils.tokens import message_tokens
+
+# History configuration (a budget of 0 replays the full history, as before)
+CHAT_HISTORY_TOKEN_BUDGET = int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", "1500"))  # recent messages kept verbatim
+CHAT_HISTORY_SUMMARY = os.getenv("CHAT_HISTORY_SUMMARY", "1") == "1"
+CHAT_HISTORY_SUMMARY_WORDS = int(os.getenv("CHAT_HISTORY_SUMMARY_WORDS", "150"))
+
+_RECENT_PROMPTS = 20  # per-call sizes kept for each chain
+
+
+def recent_within_budget(messages: List[BaseMessage], budget: int) -> List[BaseMessage]:
+    """Keep the newest messages that fit in budget (always at least the last one)."""
+    kept: List[BaseMessage] = []
+    used = 0
+    for message in reversed(messages):
+        used += message_tokens([message])
+        if kept and used > budget:
+            break
+        kept.append(message)
+    return kept[::-1]
+
+
+class BoundedChatHistory(BaseChatMessageHistory):
+    """
+    Chat history whose prompt view stays within a token budget.
+
+    All messages are kept, but prompts only see a rolling summary of older
+    turns plus the recent turns verbatim. Once the unsummarised messages
+    pass the budget, the oldest are folded into the summary by a background
+    LLM call, so no request waits on it. Until that call lands, the
+    oldest messages are simply left out of the prompt.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = CHAT_HISTORY_TOKEN_BUDGET,
+        summarize: bool = CHAT_HISTORY_SUMMARY,
+        summarizer: Optional[Any] = None
+    ):
+        """
+        Initialize the history.
+
+        Args:
+            token_budget: Estimated tokens of recent messages replayed verbatim (0 = unbounded)
+            summarize: Whether to fold messages over the budget into a summary
+            summarizer: Chat model with invoke(messages) used for summaries
+                (defaults to the shared llm, imported on the first fold)
+        """
+        self.token_budget = token_budget
+        self.summarize = summarize
+        self.summarizer = summarizer
+        self.all_messages: List[BaseMessage] = []
+        self.summary = ""
+        self.summaries = 0  # Completed summary updates
+        self._folded = 0  # Leading messages covered by the summary
+        self._folding = False
+        self._generation = 0  # Bumped by clear() so stale folds are dropped
+        self._lock = threading.Lock()
+
+    @property
+    def messages(self) -> List[BaseMessage]:
+        """Messages to replay into the prompt: summary first, then recent turns."""
+        with self._lock:
+            recent = self.all_messages[self._folded:]
+            summary = self.summary
+
+        if self.token_budget > 0:
+            recent = recent_within_budget(recent, self.token_budget)
+        if summary:
+            return [SystemMessage(content=f"Summary of the interview so far: {summary}")] + recent
+        return recent
+
+    def add_messages(self, messages: Sequence[BaseMessage]) -> None:
+        """Append messages and start a background fold if the budget is exceeded."""
+        with self._lock:
+            self.all_messages.extend(messages)
+            fold = self._claim_fold()
+
+        if fold is not None:
+            threading.Thread(target=self._fold, args=fold, daemon=True).start()
+
+    def clear(self) -> None:
+        """Remove all messages and the summary."""
+        with self._lock:
+            self.all_messages = []
+            self.summary = ""
+            self._folded = 0
+            self._generation += 1
+
+    def _claim_fold(self) -> Optional[Tuple[int, int, List[BaseMessage], str]]:
+        """Pick the oldest messages to summarise; called with the lock held."""
+        if not self.summarize or self.token_budget <= 0 or self._folding:
+            return None
+
+        recent = self.all_messages[self._folded:]
+        if message_tokens(recent) <= self.token_budget:
+            return None
+
+        # Fold down to half the budget so a summary isn't needed every turn
+        keep = len(recent_within_budget(recent, self.token_budget // 2))
+        count = max(len(recent) - keep, 1)
+        self._folding = True
+        return self._generation, self._folded + count, recent[:count], self.summary
+
+    def _fold(self, generation: int, upto: int, messages: List[BaseMessage], summary: str) -> None:
+        summarizer = self.summarizer
+        if summarizer is None:
+            # Importing config builds the DB and LLM clients; only folds need it
+            from config import llm as summarizer
+
+        try:
+            new_summary = summarizer.invoke([
+                SystemMessage(content=(
+                    "You condense interview transcripts. In at most "
+                    f"{CHAT_HISTORY_SUMMARY_WORDS} words, list the topics and questions already "
+                    "covered and anything notable about the candidate, so the interviewer "
+                    "does not repeat them. Reply with the summary only."
+                )),
+                HumanMessage(content=f"Summary so far:\n{summary or 'None'}\n\n"
+                                     f"Conversation to add:\n{get_buffer_string(messages)}")
+            ]).content.strip()
+        except Exception as e:
+            print(f"[Chat History Summary Error] {e}")
+            new_summary = ""
+
+        with self._lock:
+            self._folding = False
+            if new_summary and generation == self._generation:
+                self.summary = new_summary
+                self._folded = upto
+                self.summaries += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Get message counts and the size of the prompt view."""
+        view = self.messages
+        with self._lock:
+            return {
+                "messages": len(self.all_messages),
+                "summarized": self._folded,
+                "summaries": self.summaries,
+                "prompt_messages": len(view),
+                "prompt_tokens": message_tokens(view),
+            }
+
+
+class PromptSizeStats:
+    """Thread-safe per-chain record of estimated prompt sizes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._chains: Dict[str, Dict[str, int]] = {}
+        self._recent: Dict[str, Deque[int]] = {}
+
+    def record(self, chain: str, tokens: int) -> None:
+        """Record the estimated size of one prompt sent by chain."""
+        with self._lock:
+            entry = self._chains.setdefault(chain, {"calls": 0, "total": 0, "max": 0, "last": 0})
+            entry["calls"] += 1
+            entry["total"] += tokens
+            entry["max"] = max(entry["max"], tokens)
+            entry["last"] = tokens
+            self._recent.setdefault(chain, deque(maxlen=_RECENT_PROMPTS)).append(tokens)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get calls, mean/max and the most recent per-call estimated prompt tokens per chain."""
+        with self._lock:
+            return {
+                chain: {
+                    "calls": entry["calls"],
+                    "last_tokens": entry["last"],
+                    "mean_tokens": round(entry["total"] / entry["calls"], 1),
+                    "max_tokens": entry["max"],
+                    "recent_tokens": list(self._recent[chain]),
+                }
+                for chain, entry in self._chains.items()
+            }
+
+
+# Shared prompt size record
+prompt_sizes = PromptSizeStats()
+
+
+def track_prompt_size(chain: str) -> RunnableLambda:
+    """
+    Runnable that records the size of each prompt passing through it.
+
+    Place it between a prompt template and the model; the prompt is passed
+    on unchanged.
+
+    Args:
+        chain: Name the sizes are reported under
+    """
+    def record(prompt: PromptValue) -> PromptValue:
+        prompt_sizes.record(chain, message_tokens(prompt.to_messages()))
+        return prompt
+
+    return RunnableLambda(record)
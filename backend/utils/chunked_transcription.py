@@ -0,0 +1,112 @@
+"""Split long answers into independent chunks and stitch their transcripts."""
+import os
+import re
+from typing import List, Tuple
+
+import numpy as np
+
+from utils.audio import SAMPLE_RATE
+from utils.vad import compact_speech
+
+# Long-audio configuration
+STT_LONG_AUDIO_SECONDS = float(os.getenv("STT_LONG_AUDIO_SECONDS", "30"))
+STT_CHUNK_SECONDS = float(os.getenv("STT_CHUNK_SECONDS", "25"))
+STT_CHUNK_OVERLAP_SECONDS = float(os.getenv("STT_CHUNK_OVERLAP_SECONDS", "1"))
+
+
+def plan_chunks(
+    intervals: np.ndarray,
+    sr: int = SAMPLE_RATE,
+    max_seconds: float = STT_CHUNK_SECONDS,
+    overlap_seconds: float = STT_CHUNK_OVERLAP_SECONDS
+) -> List[Tuple[np.ndarray, bool]]:
+    """
+    Group speech intervals into chunks that each fit one Whisper window.
+
+    Chunks are cut in the silence between intervals. A single interval
+    longer than max_seconds is hard-cut with overlap_seconds of shared
+    audio so words at the cut are not lost.
+
+    Args:
+        intervals: Non-silent intervals from utils.vad.speech_intervals
+        sr: Sample rate
+        max_seconds: Longest span a chunk may cover
+        overlap_seconds: Shared audio at hard cuts
+
+    Returns:
+        List of (interval group, overlaps_previous) in playback order
+    """
+    max_len = int(max_seconds * sr)
+    overlap = int(overlap_seconds * sr)
+
+    # Break over-long intervals into overlapping pieces first
+    pieces: List[Tuple[int, int, bool]] = []
+    for start, end in intervals:
+        overlapped = False
+        while end - start > max_len:
+            pieces.append((start, start + max_len, overlapped))
+            start += max_len - overlap
+            overlapped = True
+        pieces.append((start, end, overlapped))
+
+    chunks: List[Tuple[np.ndarray, bool]] = []
+    group: List[Tuple[int, int]] = []
+    group_overlaps = False
+    for start, end, overlapped in pieces:
+        if group and (overlapped or end - group[0][0] > max_len):
+            chunks.append((np.array(group), group_overlaps))
+            group = []
+        if not group:
+            group_overlaps = overlapped
+        group.append((start, end))
+    if group:
+        chunks.append((np.array(group), group_overlaps))
+
+    return chunks
+
+
+def chunk_audio(y: np.ndarray, intervals: np.ndarray, sr: int = SAMPLE_RATE) -> List[Tuple[np.ndarray, bool]]:
+    """
+    Cut a long recording into compacted, independently transcribable chunks.
+
+    Returns:
+        List of (waveform, overlaps_previous) in playback order
+    """
+    return [
+        (compact_speech(y, group, sr=sr), overlaps)
+        for group, overlaps in plan_chunks(intervals, sr=sr)
+    ]
+
+
+def _normalize(word: str) -> str:
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+def stitch_transcripts(texts: List[str], overlaps: List[bool], max_overlap_words: int = 8) -> str:
+    """
+    Join chunk transcripts in order.
+
+    Where a chunk overlaps the previous one, the longest run of words
+    that ends the previous text and starts the next is dropped from the
+    next text.
+
+    Args:
+        texts: Transcript of each chunk
+        overlaps: Whether each chunk shares audio with the previous one
+        max_overlap_words: Longest duplicated run to look for
+
+    Returns:
+        Combined transcript
+    """
+    words: List[str] = []
+    for text, overlapped in zip(texts, overlaps):
+        chunk_words = text.split()
+        if overlapped and words:
+            tail = [_normalize(w) for w in words[-max_overlap_words:]]
+            head = [_normalize(w) for w in chunk_words[:max_overlap_words]]
+            for n in range(min(len(tail), len(head)), 0, -1):
+                if tail[-n:] == head[:n]:
+                    chunk_words = chunk_words[n:]
+                    break
+        words.extend(chunk_words)
+    return " ".join(words)
@@ -1,85 +1,342 @@
-"""Confidence scoring utilities."""
-import librosa
+"""Confidence scoring utilities.
+
+Fluency and loudness come from one pass over the signal: a cumulative
+sum of squares from which frame energies at any framing are read off in
+O(1) per frame. Pace comes from Whisper's word timings when the
+transcription stage provides them, else from the energy envelope.
+Several clips can be scored together by stacking them as rows, so the
+framing and peak-picking steps run once for the whole batch.
+"""
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
 import numpy as np
 
+from utils.audio import SAMPLE_RATE
+
+# Activity/loudness framing in samples (librosa's split/rms defaults,
+# so fluency and volume match what the silence split always measured)
+FRAME_LENGTH = 2048
+HOP_LENGTH = 512
+
+# Syllable framing (speech-style 25 ms frames with a 10 ms hop)
+FINE_FRAME_MS = 25
+FINE_HOP_MS = 10
+
+# Frames within this many dB of the loudest frame count as speech
+TOP_DB = 25
+
+# Syllable-rate bounds for a confident conversational pace (syllables/sec)
+SLOW_RATE = 2.5
+FAST_RATE = 6.5
+
+# Words-per-minute bounds for a confident conversational pace
+SLOW_WPM = 100
+FAST_WPM = 190
 
-def get_confidence_score(audio_path: str) -> float:
+# A silence between words longer than this counts as a long pause (seconds)
+LONG_PAUSE_SECONDS = 1.5
+
+FILLER_WORDS = {"um", "umm", "uh", "uhh", "uhm", "er", "erm", "ah", "hmm", "hm", "mm", "mhm"}
+
+
+def _cumulative_energy(y: np.ndarray) -> np.ndarray:
+    """Running sum of squares along the last axis, zero-padded by half a frame on each side."""
+    y = np.asarray(y, dtype=np.float64)
+    padded = np.pad(y, [(0, 0)] * (y.ndim - 1) + [(FRAME_LENGTH // 2, FRAME_LENGTH // 2)])
+    energy = np.cumsum(np.square(padded), axis=-1)
+    return np.concatenate([np.zeros(energy.shape[:-1] + (1,)), energy], axis=-1)
+
+
+def _frame_features(energy: np.ndarray, n: int, sr: int) -> Tuple[np.ndarray, np.ndarray]:
     """
-    Calculate confidence score based on audio characteristics.
-    
+    Read centred frame RMS values off a cumulative energy array.
+
     Args:
-        audio_path: Path to audio file
-        
+        energy: Output of _cumulative_energy (one clip, or clips as rows)
+        n: Clip length in samples (the longest clip for a batch)
+        sr: Sample rate
+
     Returns:
-        Confidence score between 0.0 and 1.0
+        Tuple of (coarse RMS for activity/loudness, fine RMS for syllables)
     """
-    try:
-        # Load audio
-        y, sr = librosa.load(audio_path)
-
-        # 1. Duration Check
-        # If audio is too short (< 1s), it's likely a one-word answer or noise.
-        duration = librosa.get_duration(y=y, sr=sr)
-        if duration < 1.0:
-            return 0.2
-
-        # --- METRIC 1: FLUENCY (Silence Detection) ---
-        # Split audio into non-silent intervals (top_db=25 is standard for voice)
-        non_silent_intervals = librosa.effects.split(y, top_db=25)
-        
-        if len(non_silent_intervals) == 0:
-            return 0.1 # Pure silence = Low confidence
-
-        # Calculate total duration of actual speech
-        active_time = sum([end - start for start, end in non_silent_intervals]) / sr
-        
-        # Fluency Ratio: active_time / total_duration
-        # If you pause a lot (say "um..."), this ratio drops.
-        # Perfect continuous speech = 1.0. Frequent pausing < 0.5.
-        fluency_ratio = active_time / duration
-        
-        # Normalize Fluency: < 0.4 is bad (0 score), > 0.8 is good (1.0 score)
-        fluency_score = np.clip((fluency_ratio - 0.4) / (0.8 - 0.4), 0.0, 1.0)
-
-
-        # --- METRIC 2: VOLUME (RMS Energy) ---
-        # Analyze only the non-silent parts to avoid silence dragging down the score
-        y_active = np.concatenate([y[start:end] for start, end in non_silent_intervals])
-        rms_feature = librosa.feature.rms(y=y_active)
-        rms = np.mean(rms_feature) if len(rms_feature) > 0 else 0.0
-        
-        # Normal conversational RMS is usually around 0.02 to 0.05
-        # If rms < 0.01, it's whispering/mumbling (Score -> 0).
-        # If rms > 0.05, it's loud and clear (Score -> 1).
-        volume_score = np.clip((rms - 0.01) / (0.05 - 0.01), 0.0, 1.0)
-
-
-        # --- METRIC 3: PACE (Tempo) ---
-        try:
-            tempo, _ = librosa.beat.beat_track(y=y, sr=sr)
-        except Exception:
-            tempo = 120.0 # Fallback average
-
-        # Ideal conversational pace is ~110-130 BPM. 
-        # Penalize if too slow (< 90) or too fast (> 160)
-        if tempo < 90:
+    def rms(frame: int, hop: int) -> np.ndarray:
+        starts = FRAME_LENGTH // 2 - frame // 2 + np.arange(n // hop + 1) * hop
+        frame_energy = energy[..., starts + frame] - energy[..., starts]
+        return np.sqrt(np.maximum(frame_energy, 0.0) / frame)
+
+    fine_frame = int(sr * FINE_FRAME_MS / 1000)
+    fine_hop = int(sr * FINE_HOP_MS / 1000)
+    return rms(FRAME_LENGTH, HOP_LENGTH), rms(fine_frame, fine_hop)
+
+
+def _active_mask(rms: np.ndarray, intervals: Optional[np.ndarray]) -> np.ndarray:
+    """Coarse frames that belong to speech, from VAD intervals if given, else by level."""
+    if intervals is None:
+        db = 20 * np.log10(rms + 1e-10)
+        return db > db.max() - TOP_DB
+
+    mask = np.zeros(len(rms), dtype=bool)
+    for start, end in intervals:
+        mask[start // HOP_LENGTH:max(end // HOP_LENGTH, start // HOP_LENGTH + 1)] = True
+    return mask
+
+
+def _syllable_peaks(rms: np.ndarray, lengths: Sequence[int], hop_seconds: float) -> np.ndarray:
+    """
+    Count syllable nuclei in the energy envelope of each clip.
+
+    Each syllable nucleus shows up as a local loudness peak that stands a
+    few dB above the surrounding dip.
+
+    Args:
+        rms: Fine frame RMS values, one clip per row
+        lengths: Number of valid frames in each row; later frames are ignored
+        hop_seconds: Time between fine frames
+
+    Returns:
+        Peak count per row
+    """
+    rms = np.atleast_2d(rms)
+    lengths = np.asarray(lengths)
+    valid = np.arange(rms.shape[1]) < lengths[:, None]
+    windows = np.lib.stride_tricks.sliding_window_view
+
+    # Smooth over ~50 ms so pitch ripple doesn't create extra peaks
+    # (a moving average with zeros past each clip's ends)
+    smooth = max(1, int(0.05 / hop_seconds))
+    padded = np.pad(np.where(valid, rms, 0.0), ((0, 0), (smooth // 2, (smooth - 1) // 2)))
+    db = 20 * np.log10(windows(padded, smooth, axis=1).mean(axis=2) + 1e-10)
+
+    # Past its last frame each row repeats that frame, so the windows below
+    # see the same edge as they would for the clip on its own
+    last = db[np.arange(len(db)), np.maximum(lengths - 1, 0)]
+    db = np.where(valid, db, last[:, None])
+
+    # Peaks must be the loudest frame within +/-80 ms (syllables are ~150 ms+ apart),
+    # rise 3 dB above the quietest frame within +/-150 ms and be within TOP_DB of the max
+    peak_radius = max(1, int(0.08 / hop_seconds))
+    dip_radius = max(1, int(0.15 / hop_seconds))
+    pad = ((0, 0), (peak_radius, peak_radius))
+    local_max = windows(np.pad(db, pad, mode="edge"), 2 * peak_radius + 1, axis=1).max(axis=2)
+    pad = ((0, 0), (dip_radius, dip_radius))
+    local_min = windows(np.pad(db, pad, mode="edge"), 2 * dip_radius + 1, axis=1).min(axis=2)
+    loudest = np.where(valid, db, -np.inf).max(axis=1, keepdims=True)
+
+    peaks = valid & (db >= local_max) & (db - local_min > 3.0) & (db > loudest - TOP_DB)
+    return np.where(lengths >= 3, peaks.sum(axis=1), 0)
+
+
+def speech_rate(rms: np.ndarray, active_time: float, hop_seconds: float) -> float:
+    """
+    Estimate syllables per second from the energy envelope.
+
+    Counting loudness peaks (syllable nuclei) over the active speech time
+    gives a speaking-rate estimate.
+
+    Args:
+        rms: Fine frame RMS values
+        active_time: Seconds of speech in the clip
+        hop_seconds: Time between fine frames
+
+    Returns:
+        Estimated syllables per second of active speech
+    """
+    if active_time <= 0 or len(rms) < 3:
+        return 0.0
+    return float(_syllable_peaks(rms, [len(rms)], hop_seconds)[0] / active_time)
+
+
+def speech_metrics(words: List[Dict[str, Any]]) -> Dict[str, float]:
+    """
+    Compute pace and hesitation metrics from timed words.
+
+    Args:
+        words: Words from the transcription stage, each a dict with
+            'word', 'start' and 'end' (seconds)
+
+    Returns:
+        Dictionary with 'wpm' (over the span from first to last word),
+        'filler_ratio' (share of words that are fillers like "um") and
+        'long_pauses' (gaps between words over LONG_PAUSE_SECONDS)
+    """
+    tokens = [re.sub(r"[^\w']", "", w["word"].lower()) for w in words]
+    tokens = [t for t in tokens if t]
+    if not tokens:
+        return {"wpm": 0.0, "filler_ratio": 0.0, "long_pauses": 0}
+
+    span = words[-1]["end"] - words[0]["start"]
+    gaps = np.array([b["start"] - a["end"] for a, b in zip(words, words[1:])])
+    return {
+        "wpm": len(tokens) / span * 60 if span > 0 else 0.0,
+        "filler_ratio": sum(t in FILLER_WORDS for t in tokens) / len(tokens),
+        "long_pauses": int(np.sum(gaps > LONG_PAUSE_SECONDS)),
+    }
+
+
+def _score(
+    n: int,
+    sr: int,
+    rms: np.ndarray,
+    fine_rms: np.ndarray,
+    intervals: Optional[np.ndarray],
+    words: Optional[List[Dict[str, Any]]] = None,
+    syllables: Optional[int] = None
+) -> float:
+    """Combine fluency, loudness and pace into one confidence score (syllables: peaks counted by a batch)."""
+    # 1. Duration Check
+    # If audio is too short (< 1s), it's likely a one-word answer or noise.
+    duration = n / sr
+    if duration < 1.0:
+        return 0.2
+
+    # --- METRIC 1: FLUENCY (Silence Detection) ---
+    active = _active_mask(rms, intervals)
+    if (intervals is not None and len(intervals) == 0) or not active.any():
+        return 0.1 # Pure silence = Low confidence
+
+    # Calculate total duration of actual speech
+    if intervals is not None:
+        active_time = float(np.sum(intervals[:, 1] - intervals[:, 0])) / sr
+    else:
+        active_time = min(active.sum() * HOP_LENGTH, n) / sr
+
+    # Fluency Ratio: active_time / total_duration
+    # If you pause a lot (say "um..."), this ratio drops.
+    # Perfect continuous speech = 1.0. Frequent pausing < 0.5.
+    fluency_ratio = min(active_time / duration, 1.0)
+
+    # Normalize Fluency: < 0.4 is bad (0 score), > 0.8 is good (1.0 score)
+    fluency_score = np.clip((fluency_ratio - 0.4) / (0.8 - 0.4), 0.0, 1.0)
+
+
+    # --- METRIC 2: VOLUME (RMS Energy) ---
+    # Analyze only the speech frames to avoid silence dragging down the score
+    rms_active = float(np.mean(rms[active]))
+
+    # Normal conversational RMS is usually around 0.02 to 0.05
+    # If rms < 0.01, it's whispering/mumbling (Score -> 0).
+    # If rms > 0.05, it's loud and clear (Score -> 1).
+    volume_score = np.clip((rms_active - 0.01) / (0.05 - 0.01), 0.0, 1.0)
+
+
+    # --- METRIC 3: PACE (Speech Rate) ---
+    if words:
+        metrics = speech_metrics(words)
+
+        # Conversational speech runs ~110-170 words per minute.
+        # Penalize if too slow (< 100) or too fast (> 190)
+        if metrics["wpm"] < SLOW_WPM:
+            pace_score = 0.6  # Hesitant/Slow
+        elif metrics["wpm"] > FAST_WPM:
+            pace_score = 0.7  # Rushed/Nervous
+        else:
+            pace_score = 1.0  # Confident Pace
+
+        # Fillers ("um", "uh") and long mid-answer pauses are hesitation too
+        hesitation = 2 * metrics["filler_ratio"] + 0.1 * metrics["long_pauses"]
+        fluency_score = max(0.0, fluency_score - min(hesitation, 0.5))
+    else:
+        if syllables is None:
+            rate = speech_rate(fine_rms, active_time, FINE_HOP_MS / 1000)
+        else:
+            rate = syllables / active_time
+
+        # Conversational speech runs ~3-5 syllables per second.
+        # Penalize if too slow (< 2.5) or too fast (> 6.5)
+        if rate < SLOW_RATE:
             pace_score = 0.6  # Hesitant/Slow
-        elif tempo > 160:
+        elif rate > FAST_RATE:
             pace_score = 0.7  # Rushed/Nervous
         else:
             pace_score = 1.0  # Confident Pace
 
 
-        # --- FINAL WEIGHTED SCORE ---
-        # Fluency (hesitation) is the biggest indicator of confidence (40%)
-        # Volume (clarity) is next (40%)
-        # Pace is minor (20%)
-        confidence = (0.4 * fluency_score) + (0.4 * volume_score) + (0.2 * pace_score)
+    # --- FINAL WEIGHTED SCORE ---
+    # Fluency (hesitation) is the biggest indicator of confidence (40%)
+    # Volume (clarity) is next (40%)
+    # Pace is minor (20%)
+    confidence = (0.4 * fluency_score) + (0.4 * volume_score) + (0.2 * pace_score)
+
+    # Ensure safe float return
+    confidence = float(np.clip(confidence, 0.0, 1.0))
+    return round(confidence, 2)
+
+
+def get_confidence_score(
+    audio: Union[str, np.ndarray],
+    sr: int = SAMPLE_RATE,
+    intervals: Optional[np.ndarray] = None,
+    words: Optional[List[Dict[str, Any]]] = None
+) -> float:
+    """
+    Calculate confidence score based on audio characteristics.
+
+    Args:
+        audio: Path to audio file, or an already decoded mono waveform
+        sr: Sample rate of the waveform (ignored for file paths)
+        intervals: Non-silent intervals already computed by utils.vad;
+            derived from the frame levels when not given
+        words: Timed words from utils.speech_to_text.transcribe_detailed,
+            relative to the start of the audio; pace is estimated from
+            the energy envelope when not given
+
+    Returns:
+        Confidence score between 0.0 and 1.0
+    """
+    try:
+        # Load audio (reuse the decoded waveform when one is given)
+        if isinstance(audio, str):
+            # librosa is slow to import; only needed for file paths
+            import librosa
+            y, sr = librosa.load(audio, sr=sr)
+            intervals = None
+        else:
+            y = audio
+
+        rms, fine_rms = _frame_features(_cumulative_energy(y), len(y), sr)
+        return _score(len(y), sr, rms, fine_rms, intervals, words)
+
+    except Exception as e:
+        print(f"[Confidence Error] {e}")
+        return 0.5  # fallback
+
+
+def score_batch(waveforms: List[np.ndarray], sr: int = SAMPLE_RATE) -> List[float]:
+    """
+    Score many clips at once.
+
+    The clips are zero-padded to the longest and stacked as rows, so the
+    running-energy pass, both framings and the syllable peak-picking each
+    run once over the whole batch; only the final per-clip arithmetic
+    loops. Scores equal get_confidence_score's. Padding costs memory and
+    time in proportion to the longest clip, so batch clips of similar
+    length.
+
+    Args:
+        waveforms: Mono waveforms at the same sample rate
+        sr: Sample rate
+
+    Returns:
+        Confidence score of each clip, in input order
+    """
+    if not waveforms:
+        return []
+    try:
+        lengths = [len(y) for y in waveforms]
+        stacked = np.zeros((len(waveforms), max(lengths)), dtype=np.float64)
+        for row, y in zip(stacked, waveforms):
+            row[:len(y)] = y
 
-        # Ensure safe float return
-        confidence = float(np.clip(confidence, 0.0, 1.0))
-        return round(confidence, 2)
+        rms, fine_rms = _frame_features(_cumulative_energy(stacked), stacked.shape[1], sr)
+        fine_hop = int(sr * FINE_HOP_MS / 1000)
+        fine_lengths = [n // fine_hop + 1 for n in lengths]
+        syllables = _syllable_peaks(fine_rms, fine_lengths, FINE_HOP_MS / 1000)
 
+        return [
+            _score(n, sr, rms[i, :n // HOP_LENGTH + 1], fine_rms[i, :fine_lengths[i]], None, syllables=int(syllables[i]))
+            for i, n in enumerate(lengths)
+        ]
     except Exception as e:
         print(f"[Confidence Error] {e}")
-        return 0.5  # fallback
\ No newline at end of file
+        return [get_confidence_score(y, sr=sr) for y in waveforms]
@@ -0,0 +1,116 @@
+"""Cheap local check of whether an answer warrants a generated follow-up."""
+import os
+import re
+import threading
+from typing import Any, Dict, Tuple
+
+from utils.confusion_detector import ConfusionDetector
+from utils.off_topic_detector import OffTopicDetector
+
+# Gate configuration
+FOLLOWUP_GATE = os.getenv("FOLLOWUP_GATE", "1") == "1"
+FOLLOWUP_MIN_WORDS = int(os.getenv("FOLLOWUP_MIN_WORDS", "30"))  # shorter answers get a follow-up
+FOLLOWUP_CONFUSION_THRESHOLD = float(os.getenv("FOLLOWUP_CONFUSION_THRESHOLD", "0.4"))
+FOLLOWUP_MIN_COVERAGE = float(os.getenv("FOLLOWUP_MIN_COVERAGE", "0.2"))  # share of question keywords answered
+
+_STOP_WORDS = {
+    'the', 'a', 'an', 'is', 'are', 'was', 'were', 'be', 'do', 'does', 'did', 'what', 'when', 'where',
+    'which', 'who', 'why', 'how', 'you', 'your', 'have', 'has', 'had', 'that', 'this', 'with', 'from',
+    'about', 'would', 'could', 'should', 'can', 'tell', 'describe', 'explain', 'give', 'time', 'some',
+}
+
+
+def keyword_coverage(answer: str, question: str) -> float:
+    """
+    Share of the question's content words that the answer mentions.
+
+    Words are compared on their first five letters so simple inflections
+    ("optimize" / "optimizing") match.
+
+    Returns:
+        Coverage between 0.0 and 1.0 (1.0 when the question has no content words)
+    """
+    def stems(text: str) -> set:
+        words = re.findall(r"[a-z][a-z0-9+#]*", text.lower())
+        return {w[:5] for w in words if len(w) > 3 and w not in _STOP_WORDS}
+
+    question_stems = stems(question)
+    if not question_stems:
+        return 1.0
+    return len(question_stems & stems(answer)) / len(question_stems)
+
+
+class FollowupGate:
+    """Decides locally whether a follow-up is worth an LLM call, and counts the outcomes."""
+
+    def __init__(
+        self,
+        enabled: bool = FOLLOWUP_GATE,
+        min_words: int = FOLLOWUP_MIN_WORDS,
+        confusion_threshold: float = FOLLOWUP_CONFUSION_THRESHOLD,
+        min_coverage: float = FOLLOWUP_MIN_COVERAGE
+    ):
+        """
+        Initialize the gate.
+
+        Args:
+            enabled: When False every answer is allowed a follow-up
+            min_words: Answers shorter than this warrant a follow-up
+            confusion_threshold: ConfusionDetector score at or above which to follow up
+            min_coverage: Keyword coverage below which to follow up
+        """
+        self.enabled = enabled
+        self.min_words = min_words
+        self.confusion_threshold = confusion_threshold
+        self.min_coverage = min_coverage
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = {}
+        self._checked = 0
+        self._skipped = 0
+
+    def evaluate(self, answer: str, question: str, interview_type: str = "technical") -> Tuple[bool, str]:
+        """
+        Decide whether the answer warrants a follow-up question.
+
+        Args:
+            answer: Candidate's answer
+            question: The question it answers
+            interview_type: technical, hr or sales (selects the off-topic keywords)
+
+        Returns:
+            Tuple of (needs_followup, reason)
+        """
+        if not self.enabled:
+            return True, "gate_disabled"
+
+        if len(answer.split()) < self.min_words:
+            decision = (True, "short_answer")
+        elif ConfusionDetector.detect_confusion(answer, question)[2] >= self.confusion_threshold:
+            decision = (True, "confused")
+        elif OffTopicDetector(interview_type).detect_off_topic(answer, question)[0]:
+            decision = (True, "off_topic")
+        elif keyword_coverage(answer, question) < self.min_coverage:
+            decision = (True, "low_coverage")
+        else:
+            decision = (False, "strong_answer")
+
+        with self._lock:
+            self._checked += 1
+            self._skipped += not decision[0]
+            self._counts[decision[1]] = self._counts.get(decision[1], 0) + 1
+        return decision
+
+    def stats(self) -> Dict[str, Any]:
+        """Get how many answers were checked, how many follow-ups were skipped, and why."""
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "checked": self._checked,
+                "skipped": self._skipped,
+                "skip_rate": round(self._skipped / self._checked, 3) if self._checked else 0.0,
+                "reasons": dict(self._counts),
+            }
+
+
+# Shared gate instance
+followup_gate = FollowupGate()
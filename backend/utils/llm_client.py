@@ -0,0 +1,506 @@
+"""Resilience layer for LLM calls: deadlines, backoff, circuit breaking and a shared quota."""
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncGenerator, Awaitable, Callable, Deque, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+# Per-call limits
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "20"))  # seconds per attempt
+LLM_DEADLINE = float(os.getenv("LLM_DEADLINE", "45"))  # seconds per call, waits and retries included
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))  # seconds
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "8"))  # seconds
+# Circuit breaker
+LLM_BREAKER_THRESHOLD = int(os.getenv("LLM_BREAKER_THRESHOLD", "5"))  # consecutive failures
+LLM_BREAKER_COOLDOWN = float(os.getenv("LLM_BREAKER_COOLDOWN", "30"))  # seconds
+# Groq quota, split evenly between the server's worker processes
+GROQ_REQUESTS_PER_MINUTE = int(os.getenv("GROQ_REQUESTS_PER_MINUTE", "30"))
+GROQ_TOKENS_PER_MINUTE = int(os.getenv("GROQ_TOKENS_PER_MINUTE", "12000"))
+LLM_COMPLETION_TOKENS = int(os.getenv("LLM_COMPLETION_TOKENS", "300"))  # reply tokens reserved per call
+WEB_CONCURRENCY = max(int(os.getenv("WEB_CONCURRENCY", "1")), 1)
+# Hedged requests (opt-in; only for calls marked idempotent)
+LLM_HEDGING = os.getenv("LLM_HEDGING", "0") == "1"
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))  # latency percentile that triggers a hedge
+LLM_HEDGE_DELAY = float(os.getenv("LLM_HEDGE_DELAY", "3"))  # seconds, until enough latencies are recorded
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+_LATENCY_WINDOW = 200  # recent hedged-call latencies kept per kind of call
+
+# Statuses worth retrying: throttling and provider-side failures
+_RETRY_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+
+T = TypeVar("T")
+
+
+class LLMUnavailableError(RuntimeError):
+    """Raised when an LLM call is refused or gives up; retry_after hints when to try again."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(LLMUnavailableError):
+    """Raised without calling the provider while the circuit breaker is open."""
+
+
+class QuotaExceededError(LLMUnavailableError):
+    """Raised when the shared quota can't admit a call before its deadline."""
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether an error is transient: timeouts, connection failures, 429 and 5xx responses."""
+    if isinstance(error, (TimeoutError, asyncio.TimeoutError, ConnectionError)):
+        return True
+    status = getattr(error, "status_code", None)
+    if isinstance(status, int):
+        return status in _RETRY_STATUSES
+    # Transport errors (groq.APIConnectionError, httpx.ConnectError, ...) carry no status
+    name = type(error).__name__
+    return "Timeout" in name or "Connect" in name
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds the provider asked us to wait (Retry-After header), if any."""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    try:
+        return float(headers.get("retry-after")) if headers else None
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, base: float = LLM_BACKOFF_BASE, cap: float = LLM_BACKOFF_MAX) -> float:
+    """Full-jitter exponential backoff: uniform in [0, min(cap, base * 2**attempt)]."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def estimate_prompt_tokens(messages: Sequence[Any]) -> int:
+    """Rough prompt size (about four characters per token) for quota accounting."""
+    return sum(len(str(getattr(m, "content", m))) for m in messages) // 4 + 1
+
+
+async def open_stream(stream: AsyncGenerator[T, None]) -> Tuple[Optional[T], AsyncGenerator[T, None]]:
+    """
+    Wait for the first item of a stream, closing the stream if the wait is abandoned.
+
+    Args:
+        stream: Async generator to start
+
+    Returns:
+        Tuple of (first item, or None when the stream is empty; the stream)
+    """
+    handed_over = False
+    try:
+        try:
+            first = await stream.__anext__()
+        except StopAsyncIteration:
+            first = None
+        handed_over = True
+        return first, stream
+    finally:
+        if not handed_over:
+            # Failed or cancelled (e.g. lost a hedge race): release the connection now
+            await stream.aclose()
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at rate_per_minute; not thread-safe on its own."""
+
+    def __init__(self, rate_per_minute: float):
+        self.capacity = max(rate_per_minute, 1.0)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_for(self, cost: float, now: float) -> float:
+        """Seconds until cost tokens are available."""
+        self._refill(now)
+        return max(0.0, (min(cost, self.capacity) - self.tokens) / self.rate)
+
+    def take(self, cost: float) -> None:
+        """Reserve cost tokens; the balance may go negative for an admitted waiter."""
+        self.tokens -= min(cost, self.capacity)
+
+
+class QuotaLimiter:
+    """
+    Requests-per-minute and tokens-per-minute buckets shared by the LLM clients of one process.
+
+    This is a per-process approximation of the provider quota, not a
+    shared one: each worker process gets a fixed 1/WEB_CONCURRENCY share
+    and the processes never coordinate. Together they stay within the
+    provider's limits, but a busy worker is throttled at its share even
+    while the others are idle, and other users of the same API key are
+    not seen at all (the provider's 429s are still retried).
+
+    Each call is charged its estimated prompt plus a fixed completion
+    reservation, since the provider counts reply tokens too.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int = GROQ_REQUESTS_PER_MINUTE,
+        tokens_per_minute: int = GROQ_TOKENS_PER_MINUTE,
+        workers: int = WEB_CONCURRENCY,
+        completion_tokens: int = LLM_COMPLETION_TOKENS
+    ):
+        """
+        Initialize the limiter.
+
+        Args:
+            requests_per_minute: Provider request quota for the API key
+            tokens_per_minute: Provider token quota for the API key
+            workers: Processes sharing the key
+            completion_tokens: Reply tokens reserved per call on top of the prompt
+        """
+        self.requests = TokenBucket(requests_per_minute / workers)
+        self.tokens = TokenBucket(tokens_per_minute / workers)
+        self.completion_tokens = completion_tokens
+        self._lock = threading.Lock()
+
+    def reserve(self, prompt_tokens: int, max_wait: float) -> Optional[float]:
+        """
+        Reserve quota for one call (its prompt plus the completion reservation).
+
+        Args:
+            prompt_tokens: Estimated prompt tokens of the call
+            max_wait: Longest the caller is willing to wait
+
+        Returns:
+            Seconds to wait before calling, or None (nothing reserved) if longer than max_wait
+        """
+        with self._lock:
+            now = time.monotonic()
+            cost = prompt_tokens + self.completion_tokens
+            wait = max(self.requests.wait_for(1, now), self.tokens.wait_for(cost, now))
+            if wait > max_wait:
+                return None
+            self.requests.take(1)
+            self.tokens.take(cost)
+            return wait
+
+
+class CircuitBreaker:
+    """
+    Fails calls fast after repeated provider failures.
+
+    After `threshold` consecutive transient failures the circuit opens for
+    `cooldown` seconds; then a single trial call is let through, which
+    closes the circuit on success or reopens it on failure.
+    """
+
+    def __init__(self, threshold: int = LLM_BREAKER_THRESHOLD, cooldown: float = LLM_BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """closed, open or half_open."""
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            return "open" if time.monotonic() - self._opened_at < self.cooldown else "half_open"
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead (claims the trial slot when half-open)."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            now = time.monotonic()
+            if now - self._opened_at < self.cooldown:
+                return False
+            # One trial at a time; a trial that never reported back expires
+            if self._trial_at is not None and now - self._trial_at < self.cooldown:
+                return False
+            self._trial_at = now
+            return True
+
+    def retry_after(self) -> float:
+        """Seconds until the next trial call is allowed."""
+        with self._lock:
+            if self._opened_at is None:
+                return 0.0
+            return max(0.0, self.cooldown - (time.monotonic() - self._opened_at))
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_at = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._trial_at is not None or self._failures >= self.threshold:
+                self._opened_at = time.monotonic()
+                self._trial_at = None
+
+
+class LLMGuard:
+    """Runs LLM calls under a deadline with retries, a circuit breaker and a shared quota."""
+
+    def __init__(
+        self,
+        name: str,
+        limiter: QuotaLimiter,
+        breaker: CircuitBreaker,
+        timeout: float = LLM_TIMEOUT,
+        deadline: float = LLM_DEADLINE,
+        max_retries: int = LLM_MAX_RETRIES,
+        hedging: bool = LLM_HEDGING
+    ):
+        """
+        Initialize the guard.
+
+        Args:
+            name: Client name used in logs
+            limiter: Quota shared with the other clients on the same API key
+            breaker: Circuit breaker shared with the other clients on the same provider
+            timeout: Seconds allowed per attempt
+            deadline: Seconds allowed per call, including quota waits and retries
+            max_retries: Retries after the first attempt
+            hedging: Whether ahedged may fire a second request
+        """
+        self.name = name
+        self.limiter = limiter
+        self.breaker = breaker
+        self.timeout = timeout
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.hedging = hedging
+        self._lock = threading.Lock()
+        # Only hedged calls are sampled, so other traffic on the same client
+        # (feedback, turn planning, summaries) can't move the hedge delay
+        self._hedged_latencies: Dict[str, Deque[float]] = {}
+        self._metrics: Dict[str, float] = {
+            "calls": 0, "succeeded": 0, "failed": 0, "retries": 0,
+            "rejected_circuit_open": 0, "rejected_quota": 0,
+            "quota_waits": 0, "quota_wait_seconds": 0.0, "max_quota_wait_seconds": 0.0,
+            "latency_seconds": 0.0,
+            # Hedging spend is kept apart from the primary calls above
+            "hedges": 0, "hedge_wins": 0, "hedge_failed": 0, "hedges_skipped": 0, "hedge_prompt_tokens": 0,
+        }
+
+    def call(self, attempt: Callable[[float], T], prompt_tokens: int) -> T:
+        """
+        Run a blocking call with retries.
+
+        Args:
+            attempt: Makes one request; receives the seconds it may take
+            prompt_tokens: Estimated prompt tokens charged against the quota per attempt
+
+        Returns:
+            The attempt's result
+        """
+        started = time.monotonic()
+        deadline_at = started + self.deadline
+        self._count("calls")
+        for number in range(self.max_retries + 1):
+            time.sleep(self._admit(prompt_tokens, deadline_at))
+            try:
+                result = attempt(self._attempt_timeout(deadline_at))
+            except Exception as e:
+                time.sleep(self._after_failure(e, number, deadline_at))
+                continue
+            self._succeeded(started)
+            return result
+        raise AssertionError("unreachable")  # _after_failure raises on the last attempt
+
+    async def acall(self, attempt: Callable[[float], Awaitable[T]], prompt_tokens: int) -> T:
+        """Async version of call; each attempt is also cancelled at its timeout."""
+        started = time.monotonic()
+        deadline_at = started + self.deadline
+        self._count("calls")
+        for number in range(self.max_retries + 1):
+            await asyncio.sleep(self._admit(prompt_tokens, deadline_at))
+            timeout = self._attempt_timeout(deadline_at)
+            try:
+                result = await asyncio.wait_for(attempt(timeout), timeout)
+            except Exception as e:
+                await asyncio.sleep(self._after_failure(e, number, deadline_at))
+                continue
+            self._succeeded(started)
+            return result
+        raise AssertionError("unreachable")
+
+    async def ahedged(
+        self,
+        attempt: Callable[[float], Awaitable[T]],
+        prompt_tokens: int,
+        kind: str = "generate",
+        discard: Optional[Callable[[T], Awaitable[None]]] = None
+    ) -> T:
+        """
+        Like acall, but fire a second request if the first is slow.
+
+        Only for idempotent calls. Once the first request has run longer
+        than the LLM_HEDGE_PERCENTILE latency of recent hedged calls of the
+        same kind, one extra attempt is sent; the first success wins and the
+        other is cancelled. No hedge is sent while the breaker isn't closed
+        or when the quota can't admit it immediately.
+
+        Args:
+            attempt: Makes one request; receives the seconds it may take
+            prompt_tokens: Estimated prompt tokens charged against the quota per attempt
+            kind: Latency class of the call (e.g. generate, stream)
+            discard: Releases the result of an attempt that also succeeded
+                but lost the race (e.g. closes a stream)
+
+        Returns:
+            The first successful result
+        """
+        if not self.hedging:
+            return await self.acall(attempt, prompt_tokens)
+
+        started = time.monotonic()
+        tasks: List["asyncio.Future[T]"] = [asyncio.ensure_future(self.acall(attempt, prompt_tokens))]
+        winner: Optional["asyncio.Future[T]"] = None
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_delay(kind))
+            if not done:
+                hedge = self._fire_hedge(attempt, prompt_tokens)
+                if hedge is not None:
+                    tasks.append(hedge)
+            winner = await self._first_success(tasks)
+            # Time to the first success, whichever request delivered it
+            self._record_latency(kind, time.monotonic() - started)
+            return winner.result()
+        finally:
+            losers = [task for task in tasks if task is not winner]
+            for task in losers:
+                task.cancel()
+            if losers:
+                # Let cancelled attempts unwind (closing their streams) before returning
+                await asyncio.wait(losers)
+            for task in losers:
+                if task.cancelled() or task.exception() is not None:
+                    continue
+                if discard is not None:
+                    await discard(task.result())
+
+    def hedge_delay(self, kind: str) -> float:
+        """Seconds to wait before hedging a call of this kind."""
+        with self._lock:
+            samples = sorted(self._hedged_latencies.get(kind, ()))
+        if len(samples) < LLM_HEDGE_MIN_SAMPLES:
+            return LLM_HEDGE_DELAY
+        return samples[min(len(samples) - 1, int(len(samples) * LLM_HEDGE_PERCENTILE / 100))]
+
+    def _fire_hedge(self, attempt: Callable[[float], Awaitable[T]], prompt_tokens: int) -> Optional["asyncio.Future[T]"]:
+        if self.breaker.state != "closed" or self.limiter.reserve(prompt_tokens, max_wait=0.0) is None:
+            self._count("hedges_skipped")
+            return None
+
+        with self._lock:
+            self._metrics["hedges"] += 1
+            self._metrics["hedge_prompt_tokens"] += prompt_tokens
+        hedge = asyncio.ensure_future(self._hedge_attempt(attempt))
+        # A losing hedge's error must not surface as an unretrieved exception
+        hedge.add_done_callback(lambda task: task.cancelled() or task.exception())
+        return hedge
+
+    async def _hedge_attempt(self, attempt: Callable[[float], Awaitable[T]]) -> T:
+        """One extra attempt, without retries; quota was reserved by _fire_hedge."""
+        try:
+            result = await asyncio.wait_for(attempt(self.timeout), self.timeout)
+        except Exception as e:
+            self._count("hedge_failed")
+            if is_retryable(e):
+                self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return result
+
+    async def _first_success(self, tasks: List["asyncio.Future[T]"]) -> "asyncio.Future[T]":
+        """The first task to succeed; raises the primary's error if all fail."""
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is not tasks[0]:
+                        self._count("hedge_wins")
+                    return task
+        return tasks[0].result()
+
+    def _admit(self, prompt_tokens: int, deadline_at: float) -> float:
+        """Check the breaker and reserve quota; returns the seconds to wait first."""
+        if not self.breaker.allow():
+            self._count("rejected_circuit_open")
+            raise CircuitOpenError(f"{self.name}: LLM circuit open", self.breaker.retry_after())
+
+        wait = self.limiter.reserve(prompt_tokens, max_wait=deadline_at - time.monotonic())
+        if wait is None:
+            self._count("rejected_quota")
+            raise QuotaExceededError(f"{self.name}: LLM quota exhausted", 60.0 / self.limiter.requests.capacity)
+
+        if wait > 0:
+            with self._lock:
+                self._metrics["quota_waits"] += 1
+                self._metrics["quota_wait_seconds"] += wait
+                self._metrics["max_quota_wait_seconds"] = max(self._metrics["max_quota_wait_seconds"], wait)
+        return wait
+
+    def _attempt_timeout(self, deadline_at: float) -> float:
+        return max(0.1, min(self.timeout, deadline_at - time.monotonic()))
+
+    def _after_failure(self, error: Exception, number: int, deadline_at: float) -> float:
+        """Record a failed attempt; returns the backoff delay or raises if giving up."""
+        if not is_retryable(error):
+            # The provider answered; a bad request says nothing about its health
+            self.breaker.record_success()
+            self._count("failed")
+            raise error
+
+        self.breaker.record_failure()
+        delay = max(retry_after(error) or 0.0, backoff_delay(number))
+        if number >= self.max_retries or time.monotonic() + delay >= deadline_at:
+            self._count("failed")
+            print(f"[LLM Error] {self.name} gave up after {number + 1} attempt(s): {error!r}")
+            raise LLMUnavailableError(f"{self.name}: LLM call failed: {error}", max(delay, 1.0)) from error
+
+        self._count("retries")
+        print(f"[LLM Retry] {self.name} attempt {number + 1} failed ({error!r}); retrying in {delay:.1f}s")
+        return delay
+
+    def _succeeded(self, started: float) -> None:
+        self.breaker.record_success()
+        with self._lock:
+            self._metrics["succeeded"] += 1
+            self._metrics["latency_seconds"] += time.monotonic() - started
+
+    def _record_latency(self, kind: str, latency: float) -> None:
+        with self._lock:
+            self._hedged_latencies.setdefault(kind, deque(maxlen=_LATENCY_WINDOW)).append(latency)
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._metrics[key] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Get call outcomes, rejections, quota wait time, breaker state and hedging spend."""
+        with self._lock:
+            metrics = dict(self._metrics)
+            kinds = list(self._hedged_latencies)
+        succeeded = metrics.pop("succeeded")
+        latency = metrics.pop("latency_seconds")
+        return {
+            **metrics,
+            "succeeded": succeeded,
+            "quota_wait_seconds": round(metrics["quota_wait_seconds"], 3),
+            "max_quota_wait_seconds": round(metrics["max_quota_wait_seconds"], 3),
+            "mean_latency_seconds": round(latency / succeeded, 3) if succeeded else 0.0,
+            "breaker": self.breaker.state,
+            "hedging": self.hedging,
+            "hedge_delay_seconds": {kind: round(self.hedge_delay(kind), 3) for kind in kinds},
+        }
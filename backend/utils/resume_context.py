@@ -0,0 +1,154 @@
+"""Compact, token-budgeted resume digest for interview prompts."""
+import json
+import os
+import re
+from typing import Any, Dict, List, Tuple, Union
+
+from utils.tokens import estimate_tokens
+
+# Digest configuration
+RESUME_TOKEN_BUDGET = int(os.getenv("RESUME_TOKEN_BUDGET", "400"))
+RESUME_ITEM_CHARS = int(os.getenv("RESUME_ITEM_CHARS", "200"))  # longer entries are shortened
+
+# Sections in the order they matter for picking questions; others follow
+SECTION_PRIORITY = ["skills", "experience", "projects", "education", "certifications", "achievements"]
+# Contact details never help pick a question
+DROPPED_SECTIONS = {"name", "email", "phone", "address", "linkedin", "github", "website"}
+# Sections whose text lines are comma-separated lists
+LIST_SECTIONS = {"skills", "languages", "tools", "technologies"}
+
+_SECTION_LINE = re.compile(r"^\s*([A-Za-z][A-Za-z /&-]{0,40}):\s*(.*)$")
+
+Section = Tuple[str, List[str]]
+
+
+def _flatten(value: Any) -> str:
+    """Render a resume entry (string, list or dict) as one line."""
+    if isinstance(value, dict):
+        return " | ".join(_flatten(v) for v in value.values() if v)
+    if isinstance(value, (list, tuple)):
+        return ", ".join(_flatten(v) for v in value if v)
+    return " ".join(str(value).split())
+
+
+def _sections_from_dict(resume: Dict[str, Any]) -> List[Section]:
+    sections = []
+    for key, value in resume.items():
+        items = value if isinstance(value, (list, tuple)) else [value]
+        sections.append((str(key).lower(), [_flatten(item) for item in items if item]))
+    return sections
+
+
+def _sections_from_text(text: str) -> List[Section]:
+    sections: List[Section] = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        match = _SECTION_LINE.match(line)
+        if match:
+            name, value = match.group(1).lower(), match.group(2)
+            sections.append((name, []))
+        elif sections:
+            value = line[2:] if line.startswith("- ") else line  # one entry per bullet
+        else:
+            sections.append(("summary", []))
+            value = line
+
+        name, items = sections[-1]
+        if not value.strip():
+            continue
+        parts = value.split(",") if name in LIST_SECTIONS else [value]
+        items.extend(_flatten(part) for part in parts if part.strip())
+    return sections
+
+
+def resume_to_text(resume: Dict[str, Any]) -> str:
+    """
+    Render a stored resume as "Section: value" text.
+
+    List-like sections (skills, tools, ...) stay on one comma-separated
+    line; every other list gets one "- entry" line per entry, so the digest
+    can shorten and budget each job or project on its own.
+
+    Args:
+        resume: Resume fields as stored on the user (lists may hold dicts)
+
+    Returns:
+        The resume text
+    """
+    lines = []
+    for key, value in resume.items():
+        title = str(key).title()
+        if not isinstance(value, (list, tuple)):
+            lines.append(f"{title}: {_flatten(value) if value else ''}")
+        elif str(key).lower() in LIST_SECTIONS:
+            lines.append(f"{title}: {_flatten(value)}")
+        else:
+            lines.append(f"{title}:")
+            lines.extend(f"- {_flatten(entry)}" for entry in value if entry)
+    return "\n".join(lines)
+
+
+def _shorten(item: str, limit: int) -> str:
+    if len(item) <= limit:
+        return item
+    return item[:limit].rsplit(" ", 1)[0] + "…"
+
+
+def build_resume_digest(resume: Union[str, Dict[str, Any]], token_budget: int = RESUME_TOKEN_BUDGET) -> str:
+    """
+    Build a compact resume digest that fits a token budget.
+
+    Sections are ranked (skills, experience, projects, education, ...;
+    contact details are dropped), duplicate entries removed and long
+    entries shortened, then entries are added in rank order while they fit.
+    The result is deterministic, so it can be computed once per session
+    and reused in every prompt.
+
+    Args:
+        resume: Resume as "Section: value" text (see resume_to_text), JSON text or a parsed dict
+        token_budget: Estimated tokens the digest may use
+
+    Returns:
+        The digest, or an empty string when the resume has no usable content
+    """
+    if isinstance(resume, str) and resume.lstrip().startswith("{"):
+        try:
+            resume = json.loads(resume)
+        except json.JSONDecodeError:
+            pass
+    sections = _sections_from_dict(resume) if isinstance(resume, dict) else _sections_from_text(str(resume))
+
+    merged: Dict[str, List[str]] = {}
+    for name, items in sections:
+        if name in DROPPED_SECTIONS:
+            continue
+        seen = {item.lower() for item in merged.get(name, [])}
+        for item in items:
+            item = _shorten(item, RESUME_ITEM_CHARS)
+            if item and item.lower() not in seen:
+                seen.add(item.lower())
+                merged.setdefault(name, []).append(item)
+
+    rank = {name: i for i, name in enumerate(SECTION_PRIORITY)}
+    ordered = sorted(merged.items(), key=lambda section: rank.get(section[0], len(rank)))
+
+    lines: List[str] = []
+    used = 0
+    for name, items in ordered:
+        title = name.title()
+        kept: List[str] = []
+        for item in items:
+            cost = estimate_tokens(item) + (estimate_tokens(title) + 1 if not kept else 1)
+            if used + cost > token_budget:
+                continue
+            kept.append(item)
+            used += cost
+        if not kept:
+            continue
+        if name in LIST_SECTIONS:
+            lines.append(f"{title}: {', '.join(kept)}")
+        else:
+            lines.append(f"{title}:\n" + "\n".join(f"- {item}" for item in kept))
+    return "\n".join(lines)
@@ -2,23 +2,30 @@
 import fitz  # PyMuPDF
 import json
 import re
+import time
+from typing import Union
 from langchain_core.prompts import PromptTemplate
 from config.llm import llm
+from utils.llm_client import LLMUnavailableError, backoff_delay
 
 
-def extract_text_from_pdf(file_path: str) -> str:
+def extract_text_from_pdf(pdf_file: Union[str, bytes]) -> str:
     """
     Extract text from PDF using PyMuPDF.
     
     Args:
-        file_path: Path to PDF file
+        pdf_file: Path to PDF file, or the PDF's bytes
         
     Returns:
         Extracted text from PDF
     """
     text = ""
     try:
-        with fitz.open(file_path) as pdf:
+        if isinstance(pdf_file, bytes):
+            pdf = fitz.open(stream=pdf_file, filetype="pdf")
+        else:
+            pdf = fitz.open(pdf_file)
+        with pdf:
             for page in pdf:
                 text += page.get_text()
         return text.strip()
@@ -103,16 +110,19 @@ Resume Text:
         return None
 
 
-def parse_resume_with_llm(pdf_path: str, max_retries: int = 3) -> dict:
+def parse_resume_with_llm(pdf_path: Union[str, bytes], max_retries: int = 3) -> dict:
     """
     Parse resume with retry logic and error handling.
     
     Args:
-        pdf_path: Path to resume PDF
+        pdf_path: Path to resume PDF, or the PDF's bytes
         max_retries: Maximum number of retry attempts
         
     Returns:
         Dictionary containing parsed resume data or error information
+
+    Raises:
+        LLMUnavailableError: If the LLM is throttled or down
     """
     # Extract text from PDF
     resume_text = extract_text_from_pdf(pdf_path)
@@ -148,10 +158,17 @@ def parse_resume_with_llm(pdf_path: str, max_retries: int = 3) -> dict:
                     "raw_response": str(raw_response),
                     "cleaned_response": cleaned_response
                 }
+
+        except LLMUnavailableError:
+            # The client already retried with backoff; don't add more load
+            raise
         
         except Exception as e:
             print(f"❌ General error on attempt {attempt + 1}: {e}")
             if attempt == max_retries - 1:
                 return {"error": f"Failed to process resume: {str(e)}"}
+
+        # Back off before asking again instead of retrying in a tight loop
+        time.sleep(backoff_delay(attempt))
     
     return {"error": "Unexpected failure"}
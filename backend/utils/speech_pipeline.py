@@ -0,0 +1,268 @@
+"""Speech pipeline that runs decoding, STT and confidence scoring off the event loop."""
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils.audio import decode_audio_stream, SAMPLE_RATE
+from utils.speech_to_text import transcribe_detailed, extract_words, select_backend, stt_stats, STT_DEFAULT_BACKEND
+from utils.confidence import get_confidence_score
+from utils.whisper_pool import whisper_pool, STT_JOB_TIMEOUT
+from utils.batch_transcriber import batch_transcriber
+from utils.vad import speech_intervals, compact_speech, compaction_map, restore_times
+from utils.chunked_transcription import chunk_audio, stitch_transcripts, STT_LONG_AUDIO_SECONDS
+from utils.transcript_cache import TranscriptCache, new_audio_hash
+
+# Pipeline configuration
+SPEECH_WORKERS = int(os.getenv("SPEECH_WORKERS", "4"))
+SPEECH_QUEUE_DEPTH = int(os.getenv("SPEECH_QUEUE_DEPTH", "16"))
+SPEECH_RETRY_AFTER = int(os.getenv("SPEECH_RETRY_AFTER", "5"))  # seconds
+
+
+# Transcript text plus timed words ({'word', 'start', 'end'}); words are
+# None when the STT path used does not align them
+Transcript = Tuple[str, Optional[List[Dict[str, Any]]]]
+
+
+class PipelineBusyError(Exception):
+    """Raised when the speech pipeline has no free queue slot."""
+
+    def __init__(self, retry_after: int = SPEECH_RETRY_AFTER):
+        super().__init__("Speech pipeline is at capacity")
+        self.retry_after = retry_after
+
+
+class SpeechPipeline:
+    """Bounded executor for the per-answer speech work."""
+
+    def __init__(self, workers: int = SPEECH_WORKERS, queue_depth: int = SPEECH_QUEUE_DEPTH):
+        """
+        Initialize the pipeline.
+
+        Args:
+            workers: Number of threads available to speech stages
+            queue_depth: Maximum number of answers admitted at once
+                (running plus waiting); further requests are rejected
+        """
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="speech")
+        self._slots = threading.BoundedSemaphore(queue_depth)
+        self._in_flight = 0
+        self.cache = TranscriptCache()
+        # Analyses of identical uploads still running: (key, with_confidence) -> future
+        self._pending: Dict[Tuple[str, bool], asyncio.Task] = {}
+        self._coalesced = 0
+
+    @contextmanager
+    def _admit(self):
+        """Hold one queue slot for the duration of the block."""
+        if not self._slots.acquire(blocking=False):
+            raise PipelineBusyError()
+
+        self._in_flight += 1
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+            self._slots.release()
+
+    async def analyze_stream(
+        self,
+        chunks: AsyncIterator[bytes],
+        with_confidence: bool = True,
+        max_seconds: Optional[float] = None
+    ) -> Tuple[str, Optional[float]]:
+        """
+        Decode an answer chunk by chunk, then transcribe and score it.
+
+        Chunks are piped into ffmpeg as the iterator yields them, so the
+        raw bytes are never joined in memory. The bytes are hashed on the
+        way through, so the transcript cache can only be consulted after
+        decoding; a hit still skips STT and scoring. A retry that arrives
+        while an identical answer is still being analyzed waits for that
+        run instead of starting another.
+
+        Args:
+            chunks: Async iterator over the raw bytes of the uploaded audio
+            with_confidence: Whether to compute the confidence score
+            max_seconds: Longest decoded duration accepted
+
+        Returns:
+            Tuple of (transcript, confidence); confidence is None when skipped
+
+        Raises:
+            PipelineBusyError: If the queue is full
+            AudioTooLongError: If the audio exceeds max_seconds
+        """
+        digest = new_audio_hash()
+
+        async def hashed() -> AsyncIterator[bytes]:
+            async for chunk in chunks:
+                digest.update(chunk)
+                yield chunk
+
+        with self._admit():
+            waveform = await decode_audio_stream(hashed(), max_seconds=max_seconds)
+
+        return await self._analyze_cached(digest.hexdigest(), waveform, with_confidence)
+
+    async def _analyze_cached(self, key: str, waveform: np.ndarray, with_confidence: bool) -> Tuple[str, Optional[float]]:
+        """Serve from the cache or an identical in-flight analysis, else analyze the waveform."""
+        cached = self.cache.get(key, with_confidence)
+        if cached is not None:
+            return cached
+
+        slot = (key, with_confidence)
+        pending = self._pending.get(slot) or self._pending.get((key, True))
+        if pending is not None:
+            self._coalesced += 1
+        else:
+            pending = asyncio.ensure_future(self._analyze_shared(key, waveform, with_confidence))
+            self._pending[slot] = pending
+            pending.add_done_callback(lambda task: self._finish_shared(slot, task))
+
+        # Shielded so a cancelled caller never cancels the analysis the others share
+        text, confidence = await asyncio.shield(pending)
+        return text, confidence if with_confidence else None
+
+    async def _analyze_shared(self, key: str, waveform: np.ndarray, with_confidence: bool) -> Tuple[str, Optional[float]]:
+        """Analyze and cache a waveform; runs as its own task so no single caller owns it."""
+        with self._admit():
+            result = await self._analyze_waveform(asyncio.get_running_loop(), waveform, with_confidence)
+        self.cache.put(key, *result)
+        return result
+
+    def _finish_shared(self, slot: Tuple[str, bool], task: asyncio.Task) -> None:
+        """Evict a finished analysis from the in-flight table."""
+        del self._pending[slot]
+        if not task.cancelled():
+            # Mark the exception retrieved when every caller had gone
+            task.exception()
+
+    async def analyze_waveform(self, waveform: np.ndarray, with_confidence: bool = True) -> Tuple[str, Optional[float]]:
+        """
+        Transcribe and score an already decoded waveform.
+
+        Args:
+            waveform: 16 kHz mono float32 audio
+            with_confidence: Whether to compute the confidence score
+
+        Returns:
+            Tuple of (transcript, confidence); confidence is None when skipped
+
+        Raises:
+            PipelineBusyError: If the queue is full
+        """
+        with self._admit():
+            return await self._analyze_waveform(asyncio.get_running_loop(), waveform, with_confidence)
+
+    async def score(self, waveform: np.ndarray) -> float:
+        """
+        Compute only the confidence score of a decoded waveform.
+
+        Raises:
+            PipelineBusyError: If the queue is full
+        """
+        with self._admit():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, get_confidence_score, waveform)
+
+    async def _analyze_waveform(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        waveform: np.ndarray,
+        with_confidence: bool
+    ) -> Tuple[str, Optional[float]]:
+        # Find speech once; STT sees only the compacted speech and
+        # confidence scoring reuses the same intervals
+        intervals = await loop.run_in_executor(self._executor, speech_intervals, waveform)
+        speech = compact_speech(waveform, intervals)
+
+        if not len(speech):
+            # No detected speech: Whisper is skipped
+            text, words = "", []
+        elif len(speech) > STT_LONG_AUDIO_SECONDS * SAMPLE_RATE:
+            text, words = await self._transcribe_long(loop, waveform, intervals)
+        else:
+            text, words = await self._transcribe(loop, speech)
+            if words:
+                words = _restore_word_times(words, compaction_map(intervals))
+        if not with_confidence:
+            return text, None
+
+        # Pace comes from the word timings, so scoring runs after STT;
+        # the remaining energy pass costs a few milliseconds
+        confidence = await loop.run_in_executor(
+            self._executor,
+            functools.partial(get_confidence_score, waveform, intervals=intervals, words=words)
+        )
+        return text, confidence
+
+    async def _transcribe(self, loop: asyncio.AbstractEventLoop, waveform) -> Transcript:
+        """
+        Transcribe on the Whisper worker farm or batcher when enabled, else in-process.
+
+        Clips routed to a non-default backend (e.g. tiny for short
+        utterances) always run in-process; the farm and batcher serve the
+        default model. The batcher decodes without timestamps, so it
+        returns no word timings.
+        """
+        if select_backend(len(waveform) / SAMPLE_RATE) != STT_DEFAULT_BACKEND or not (
+            whisper_pool.running or batch_transcriber.enabled
+        ):
+            result = await loop.run_in_executor(self._executor, transcribe_detailed, waveform)
+            return result["text"], result["words"]
+        # The pool fails overdue jobs itself; the cap also guards against a
+        # stalled collector or batcher, so a request never holds its slot forever
+        if whisper_pool.running:
+            result = await asyncio.wait_for(
+                asyncio.wrap_future(whisper_pool.submit(waveform, word_timestamps=True)),
+                STT_JOB_TIMEOUT + 5
+            )
+            return result["text"], extract_words(result["segments"])
+        return await asyncio.wait_for(asyncio.wrap_future(batch_transcriber.submit(waveform)), STT_JOB_TIMEOUT), None
+
+    async def _transcribe_long(self, loop: asyncio.AbstractEventLoop, waveform: np.ndarray, intervals: np.ndarray) -> Transcript:
+        """
+        Split a long answer at silence and transcribe the chunks in parallel.
+
+        Chunks fan out across the worker farm or into one batched pass;
+        in-process they still share a single model. Word timings are
+        dropped, since overlapping chunks would count words twice.
+        """
+        chunks = chunk_audio(waveform, intervals)
+        results = await asyncio.gather(*(self._transcribe(loop, chunk) for chunk, _ in chunks))
+        text = stitch_transcripts([text for text, _ in results], [overlaps for _, overlaps in chunks])
+        return text, None
+
+    def stats(self) -> dict:
+        """Get current pipeline load."""
+        return {
+            "workers": self.workers,
+            "queue_depth": self.queue_depth,
+            "in_flight": self._in_flight,
+            "transcript_cache": dict(self.cache.stats(), coalesced=self._coalesced),
+            "stt_backends": stt_stats(),
+            "stt_pool": whisper_pool.stats() if whisper_pool.running else None,
+            "stt_batching": batch_transcriber.stats() if batch_transcriber.enabled else None,
+        }
+
+
+def _restore_word_times(words: List[Dict[str, Any]], mapping: np.ndarray) -> List[Dict[str, Any]]:
+    """Move word timings from the compacted speech back onto the original recording."""
+    starts = restore_times([w["start"] for w in words], mapping)
+    ends = restore_times([w["end"] for w in words], mapping)
+    return [
+        {**w, "start": float(start), "end": float(end)}
+        for w, start, end in zip(words, starts, ends)
+    ]
+
+
+# Shared pipeline instance
+speech_pipeline = SpeechPipeline()
@@ -1,19 +1,284 @@
 """Audio processing utilities."""
-import whisper
+import math
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Tuple, Union
 
-# Load Whisper model
-model = whisper.load_model('base')
+import numpy as np
 
+from utils.audio import SAMPLE_RATE
 
-def transcribe(audio_path: str) -> str:
+# Duration routing: "max_seconds:backend" pairs, checked in order
+# e.g. "3:tiny-int8,120:base,inf:small"
+STT_ROUTES = os.getenv("STT_ROUTES", "3:tiny-int8,inf:base")
+STT_DEFAULT_BACKEND = os.getenv("STT_DEFAULT_BACKEND", "base")
+
+
+def quantize_int8(model):
+    """
+    Apply dynamic int8 quantization to a model's Linear layers.
+
+    quantize_dynamic only swaps modules whose type is exactly nn.Linear,
+    and Whisper uses its own nn.Linear subclass, so those layers are first
+    replaced by plain nn.Linear modules sharing the same parameters.
+
+    Args:
+        model: A float32 model on the CPU
+
+    Returns:
+        The quantized model
+
+    Raises:
+        RuntimeError: If no layer ended up quantized
+    """
+    import torch
+
+    for parent in list(model.modules()):
+        for name, child in list(parent.named_children()):
+            if isinstance(child, torch.nn.Linear) and type(child) is not torch.nn.Linear:
+                plain = torch.nn.Linear(child.in_features, child.out_features, bias=child.bias is not None)
+                plain.weight = child.weight
+                plain.bias = child.bias
+                setattr(parent, name, plain)
+
+    model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    if not any(isinstance(m, torch.ao.nn.quantized.dynamic.Linear) for m in model.modules()):
+        raise RuntimeError("int8 quantization did not replace any Linear layer")
+    return model
+
+
+class WhisperBackend:
+    """A Whisper model loaded on first use."""
+
+    def __init__(self, model_name: str, quantize: bool = False):
+        """
+        Initialize the backend.
+
+        Args:
+            model_name: Whisper model size (tiny, base, small, ...)
+            quantize: Apply dynamic int8 quantization to Linear layers (CPU only)
+        """
+        self.model_name = model_name
+        self.quantize = quantize
+        self._model = None
+        self._load_lock = threading.Lock()
+        # Whisper installs per-call KV-cache hooks on the model, so concurrent
+        # decodes on the same instance must be serialized
+        self.lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the model has been loaded."""
+        return self._model is not None
+
+    @property
+    def model(self):
+        """The loaded Whisper model (loaded on first access)."""
+        if self._model is None:
+            with self._load_lock:
+                if self._model is None:
+                    # torch and whisper are slow to import; defer until a model is needed
+                    import whisper
+
+                    model = whisper.load_model(self.model_name, device="cpu" if self.quantize else None)
+                    if self.quantize:
+                        model = quantize_int8(model)
+                    self._model = model
+        return self._model
+
+    def transcribe(self, audio: Union[str, np.ndarray], **options) -> Dict[str, Any]:
+        """Transcribe audio with this backend's model, returning Whisper's result dict."""
+        model = self.model
+        if self.quantize:
+            options.setdefault("fp16", False)
+        with self.lock:
+            return model.transcribe(audio, **options)
+
+
+# Backend registry: name -> factory
+_factories: Dict[str, Callable[[], WhisperBackend]] = {
+    "tiny": lambda: WhisperBackend("tiny"),
+    "tiny-int8": lambda: WhisperBackend("tiny", quantize=True),
+    "base": lambda: WhisperBackend("base"),
+    "small": lambda: WhisperBackend("small"),
+    "medium": lambda: WhisperBackend("medium"),
+}
+_backends: Dict[str, WhisperBackend] = {}
+_registry_lock = threading.Lock()
+
+# Per-backend selection counts and latency
+_stats: Dict[str, Dict[str, float]] = {}
+_stats_lock = threading.Lock()
+
+
+def register_backend(name: str, factory: Callable[[], WhisperBackend]) -> None:
+    """
+    Register an STT backend.
+
+    Args:
+        name: Name used in STT_ROUTES
+        factory: Callable returning an object with a transcribe(audio, **options)
+            method that returns Whisper's result dict
+    """
+    with _registry_lock:
+        _factories[name] = factory
+        _backends.pop(name, None)
+
+
+def get_backend(name: str) -> WhisperBackend:
+    """Get (creating on first use) a registered backend."""
+    with _registry_lock:
+        if name not in _backends:
+            if name not in _factories:
+                raise KeyError(f"Unknown STT backend: {name}")
+            _backends[name] = _factories[name]()
+        return _backends[name]
+
+
+def _parse_routes(spec: str) -> List[Tuple[float, str]]:
+    routes = []
+    for entry in spec.split(","):
+        if entry.strip():
+            limit, name = entry.strip().split(":", 1)
+            routes.append((math.inf if limit == "inf" else float(limit), name.strip()))
+    return routes
+
+
+_routes = _parse_routes(STT_ROUTES)
+
+
+def select_backend(duration: float) -> str:
     """
-    Transcribe audio file to text.
-    
+    Pick the backend for a clip of the given length.
+
     Args:
-        audio_path: Path to audio file
-        
+        duration: Clip length in seconds
+
+    Returns:
+        Name of the registered backend
+    """
+    for limit, name in _routes:
+        if duration < limit:
+            return name
+    return STT_DEFAULT_BACKEND
+
+
+def transcribe(audio: Union[str, np.ndarray]) -> str:
+    """
+    Transcribe audio to text.
+
+    Waveforms are routed by duration (see STT_ROUTES); file paths use
+    the default backend.
+
+    Args:
+        audio: Path to audio file, or a 16 kHz float32 waveform
+            from utils.audio.decode_audio
+
     Returns:
         Transcribed text
     """
-    result = model.transcribe(audio_path)
-    return result['text']
+    return transcribe_detailed(audio, word_timestamps=False)['text']
+
+
+def transcribe_detailed(audio: Union[str, np.ndarray], word_timestamps: bool = True) -> Dict[str, Any]:
+    """
+    Transcribe audio, keeping segment and word timings.
+
+    Args:
+        audio: Path to audio file, or a 16 kHz float32 waveform
+        word_timestamps: Whether Whisper should align individual words
+
+    Returns:
+        Dictionary with 'text', 'segments' and 'words'
+        (each word: {'word', 'start', 'end'} in seconds)
+    """
+    if isinstance(audio, str):
+        name = STT_DEFAULT_BACKEND
+    else:
+        name = select_backend(len(audio) / SAMPLE_RATE)
+
+    start = time.perf_counter()
+    result = get_backend(name).transcribe(audio, word_timestamps=word_timestamps)
+    _record(name, time.perf_counter() - start)
+
+    return {
+        'text': result['text'],
+        'segments': result.get('segments', []),
+        'words': extract_words(result.get('segments', [])),
+    }
+
+
+def extract_words(segments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Flatten Whisper segments into a list of timed words."""
+    return [
+        {'word': w['word'].strip(), 'start': float(w['start']), 'end': float(w['end'])}
+        for segment in segments
+        for w in segment.get('words', [])
+    ]
+
+
+def transcribe_batch(waveforms: List[np.ndarray]) -> List[str]:
+    """
+    Transcribe several short clips with one batched encoder/decoder pass.
+
+    Each clip is padded or trimmed to Whisper's 30-second window, so
+    callers should only batch clips that fit in a single window. The
+    batch always runs on the default backend.
+
+    Args:
+        waveforms: 16 kHz float32 waveforms
+
+    Returns:
+        Transcribed text for each clip, in input order
+    """
+    import torch
+    import whisper
+
+    backend = get_backend(STT_DEFAULT_BACKEND)
+    model = backend.model
+    mels = [
+        whisper.log_mel_spectrogram(whisper.pad_or_trim(audio), n_mels=model.dims.n_mels)
+        for audio in waveforms
+    ]
+    mel_batch = torch.stack(mels).to(model.device)
+    options = whisper.DecodingOptions(fp16=False, without_timestamps=True)
+
+    start = time.perf_counter()
+    with backend.lock:
+        results = whisper.decode(model, mel_batch, options)
+    _record(STT_DEFAULT_BACKEND, time.perf_counter() - start, count=len(waveforms))
+    return [r.text for r in results]
+
+
+def _record(name: str, seconds: float, count: int = 1) -> None:
+    with _stats_lock:
+        entry = _stats.setdefault(name, {"selected": 0, "total_seconds": 0.0})
+        entry["selected"] += count
+        entry["total_seconds"] += seconds
+
+
+def stt_stats() -> Dict[str, Dict[str, float]]:
+    """Get per-backend selection counts and average latency."""
+    with _stats_lock:
+        return {
+            name: {
+                "selected": entry["selected"],
+                "avg_latency": round(entry["total_seconds"] / entry["selected"], 4) if entry["selected"] else 0.0,
+            }
+            for name, entry in _stats.items()
+        }
+
+
+def routed_backends() -> List[str]:
+    """Names of every backend the routing table can select."""
+    return list(dict.fromkeys([name for _, name in _routes] + [STT_DEFAULT_BACKEND]))
+
+
+def loaded_backends() -> Dict[str, bool]:
+    """Load state of every routed backend."""
+    with _registry_lock:
+        return {
+            name: name in _backends and getattr(_backends[name], "loaded", True)
+            for name in routed_backends()
+        }
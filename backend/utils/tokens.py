@@ -0,0 +1,15 @@
+"""Tokenizer-free token estimates for prompt budgeting."""
+import math
+from typing import Any, Sequence
+
+_MESSAGE_OVERHEAD_TOKENS = 4  # role and separators
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token) without a tokenizer."""
+    return math.ceil(len(text) / 4)
+
+
+def message_tokens(messages: Sequence[Any]) -> int:
+    """Estimated prompt tokens taken by a list of chat messages."""
+    return sum(estimate_tokens(str(m.content)) + _MESSAGE_OVERHEAD_TOKENS for m in messages)
@@ -0,0 +1,103 @@
+"""Bounded LRU/TTL cache of speech results keyed by the uploaded audio bytes."""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# Cache configuration (0 entries disables caching)
+TRANSCRIPT_CACHE_SIZE = int(os.getenv("TRANSCRIPT_CACHE_SIZE", "256"))
+TRANSCRIPT_CACHE_TTL = float(os.getenv("TRANSCRIPT_CACHE_TTL", "600"))  # seconds
+
+
+def new_audio_hash() -> "hashlib.blake2b":
+    """Incremental hasher producing the same keys as audio_key."""
+    return hashlib.blake2b(digest_size=16)
+
+
+def audio_key(data: bytes) -> str:
+    """Hash uploaded audio bytes into a cache key."""
+    digest = new_audio_hash()
+    digest.update(data)
+    return digest.hexdigest()
+
+
+class TranscriptCache:
+    """Thread-safe LRU cache of (transcript, confidence) pairs with expiry."""
+
+    def __init__(self, max_entries: int = TRANSCRIPT_CACHE_SIZE, ttl: float = TRANSCRIPT_CACHE_TTL):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Entries kept before the least recently used is evicted
+            ttl: Seconds an entry stays valid
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, str, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Whether results are being cached."""
+        return self.max_entries > 0
+
+    def get(self, key: str, with_confidence: bool = True) -> Optional[Tuple[str, Optional[float]]]:
+        """
+        Look up a cached result.
+
+        An entry stored without a confidence score does not satisfy a
+        request that needs one.
+
+        Args:
+            key: Key from audio_key
+            with_confidence: Whether the caller needs the confidence score
+
+        Returns:
+            Tuple of (transcript, confidence), or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] > self.ttl:
+                del self._entries[key]
+                entry = None
+            if entry is None or (with_confidence and entry[2] is None):
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[1], entry[2] if with_confidence else None
+
+    def put(self, key: str, text: str, confidence: Optional[float]) -> None:
+        """Store a result, evicting the least recently used entry if full."""
+        if not self.enabled:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if confidence is None and previous is not None:
+                confidence = previous[2]
+            self._entries[key] = (time.monotonic(), text, confidence)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and current size."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hit_rate": round(self._hits / lookups, 3) if lookups else 0.0,
+            }
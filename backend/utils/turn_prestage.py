@@ -0,0 +1,110 @@
+"""Local pre-stage that answers off-topic and confused turns without the LLM."""
+import os
+import threading
+from typing import Any, Dict, Optional
+
+from utils.confusion_detector import ConfusionDetector
+from utils.off_topic_detector import detect_and_respond_to_offtopic
+
+# Pre-stage configuration
+TURN_PRESTAGE = os.getenv("TURN_PRESTAGE", "1") == "1"
+PRESTAGE_MAX_WORDS = int(os.getenv("PRESTAGE_MAX_WORDS", "25"))  # only short answers are intercepted
+PRESTAGE_CONFUSION_THRESHOLD = float(os.getenv("PRESTAGE_CONFUSION_THRESHOLD", "0.6"))
+PRESTAGE_MAX_REDIRECTS = int(os.getenv("PRESTAGE_MAX_REDIRECTS", "1"))  # per question
+
+# Off-topic reasons precise enough to act on; keyword-overlap reasons
+# misfire on valid answers, so those turns go to the LLM as usual
+REDIRECT_REASONS = {"asking_counter_questions", "personal_questions", "company_logistics"}
+
+_INTERVIEW_TYPES = {"technical": "technical", "hr": "hr", "hiring_manager": "sales", "senior_leadership": "sales"}
+
+_stats_lock = threading.Lock()
+_stats: Dict[str, int] = {"checked": 0, "off_topic": 0, "confused": 0}
+
+
+def prestage_reply(session: Any, answer: str) -> Optional[str]:
+    """
+    Return canned redirect or guidance text when an answer doesn't need the LLM.
+
+    Only short answers are checked, the session's greeting is never
+    intercepted, and each question is intercepted at most
+    PRESTAGE_MAX_REDIRECTS times so a candidate can't get stuck. The
+    question stays open: the caller should not record the answer.
+
+    Args:
+        session: Interview, HR or Sales session whose last question was just answered
+        answer: The candidate's answer
+
+    Returns:
+        Text to send back, or None to continue with the normal turn
+    """
+    if not TURN_PRESTAGE or len(session.history) <= 1 or len(answer.split()) >= PRESTAGE_MAX_WORDS:
+        return None
+
+    question = session.history[-1]["question"]
+    if session.meta.get("prestage_question") != len(session.history):
+        session.meta["prestage_question"] = len(session.history)
+        session.meta["prestage_redirects"] = 0
+    if session.meta["prestage_redirects"] >= PRESTAGE_MAX_REDIRECTS:
+        return None
+
+    with _stats_lock:
+        _stats["checked"] += 1
+
+    reply = _off_topic_reply(session, answer, question) or _confusion_reply(session, answer, question)
+    if reply:
+        session.meta["prestage_redirects"] += 1
+    return reply
+
+
+def _off_topic_reply(session: Any, answer: str, question: str) -> Optional[str]:
+    if hasattr(session, "check_if_off_topic"):
+        result = session.check_if_off_topic(answer)
+    else:
+        interview_type = _INTERVIEW_TYPES.get(session.round_type.lower(), "technical")
+        result = detect_and_respond_to_offtopic(answer, question, interview_type=interview_type)
+        if result["is_off_topic"]:
+            session.meta["off_topic_responses"] = session.meta.get("off_topic_responses", 0) + 1
+
+    if not result["is_off_topic"] or result["reason"] not in REDIRECT_REASONS:
+        return None
+
+    with _stats_lock:
+        _stats["off_topic"] += 1
+    return f"{result['response']}\n\n{question}"
+
+
+def _confusion_reply(session: Any, answer: str, question: str) -> Optional[str]:
+    if hasattr(session, "check_confusion"):
+        is_confused, confusion_type, score, guidance = session.check_confusion(answer)
+    else:
+        is_confused, confusion_type, score = ConfusionDetector.detect_confusion(answer, question)
+        guidance = ConfusionDetector.generate_guidance(confusion_type, question, answer) if is_confused else ""
+        if is_confused:
+            session.meta["confusion_count"] = session.meta.get("confusion_count", 0) + 1
+
+    if not is_confused or (score < PRESTAGE_CONFUSION_THRESHOLD and confusion_type != "empty_answer"):
+        return None
+
+    if ConfusionDetector.should_provide_example(confusion_type, score):
+        if hasattr(session, "provide_example"):
+            example = session.provide_example()
+        else:
+            example = ConfusionDetector.generate_example(question, session.role)
+        guidance = f"{guidance}\n\n{example}"
+
+    with _stats_lock:
+        _stats["confused"] += 1
+    return guidance
+
+
+def prestage_stats() -> Dict[str, Any]:
+    """Get how many turns the pre-stage answered locally."""
+    with _stats_lock:
+        intercepted = _stats["off_topic"] + _stats["confused"]
+        return {
+            "enabled": TURN_PRESTAGE,
+            **_stats,
+            "intercepted": intercepted,
+            "intercept_rate": round(intercepted / _stats["checked"], 3) if _stats["checked"] else 0.0,
+        }
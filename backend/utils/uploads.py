@@ -0,0 +1,108 @@
+"""Bounded, chunked reading of uploaded files."""
+import os
+from typing import AsyncIterator, Dict, Optional
+
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+
+# Upload limits
+MAX_AUDIO_UPLOAD_BYTES = int(os.getenv("MAX_AUDIO_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+MAX_AUDIO_SECONDS = float(os.getenv("MAX_AUDIO_SECONDS", "300"))
+MAX_RESUME_UPLOAD_BYTES = int(os.getenv("MAX_RESUME_UPLOAD_BYTES", str(5 * 1024 * 1024)))
+UPLOAD_CHUNK_BYTES = int(os.getenv("UPLOAD_CHUNK_BYTES", str(64 * 1024)))
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds its byte limit."""
+
+    def __init__(self, max_bytes: int):
+        super().__init__(f"Upload is larger than {max_bytes} bytes")
+        self.max_bytes = max_bytes
+
+
+async def iter_upload(
+    file: UploadFile,
+    max_bytes: int,
+    chunk_size: int = UPLOAD_CHUNK_BYTES
+) -> AsyncIterator[bytes]:
+    """
+    Yield an upload in chunks, stopping once it passes max_bytes.
+
+    A declared size over the limit is rejected before anything is read.
+
+    Args:
+        file: The uploaded file
+        max_bytes: Largest upload accepted
+        chunk_size: Bytes read per chunk
+
+    Raises:
+        UploadTooLargeError: If the upload exceeds max_bytes
+    """
+    size: Optional[int] = getattr(file, "size", None)
+    if size is not None and size > max_bytes:
+        raise UploadTooLargeError(max_bytes)
+
+    total = 0
+    while True:
+        chunk = await file.read(chunk_size)
+        if not chunk:
+            return
+        total += len(chunk)
+        if total > max_bytes:
+            raise UploadTooLargeError(max_bytes)
+        yield chunk
+
+
+async def read_upload(file: UploadFile, max_bytes: int) -> bytes:
+    """Read a whole upload into memory, enforcing max_bytes as it is read."""
+    return b"".join([chunk async for chunk in iter_upload(file, max_bytes)])
+
+
+class UploadLimitMiddleware:
+    """
+    ASGI middleware enforcing per-path byte limits on request bodies.
+
+    A declared Content-Length over the limit is refused before the body is
+    read. Bodies without one (chunked transfer encoding) are counted as
+    they arrive and cut off with a 413 once they pass the limit, before
+    the multipart parser spools the rest to disk.
+    """
+
+    def __init__(self, app, limits: Dict[str, int], slack: int = 0):
+        """
+        Initialize the middleware.
+
+        Args:
+            app: The wrapped ASGI application
+            limits: Largest accepted upload per request path
+            slack: Extra bytes allowed for the other multipart fields
+        """
+        self.app = app
+        self.limits = limits
+        self.slack = slack
+
+    async def __call__(self, scope, receive, send):
+        limit = self.limits.get(scope["path"]) if scope["type"] == "http" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        detail = str(UploadTooLargeError(limit))
+        length = dict(scope["headers"]).get(b"content-length", b"")
+        if length.isdigit() and int(length) > limit + self.slack:
+            await JSONResponse(status_code=413, content={"detail": detail})(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit + self.slack:
+                    # Raised inside body parsing, so it becomes a normal 413 response
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -0,0 +1,237 @@
+"""Voice activity detection utilities."""
+import os
+from collections import deque
+from typing import List, Optional
+
+import numpy as np
+
+from utils.audio import SAMPLE_RATE
+
+# Streaming VAD configuration
+VAD_THRESHOLD_DB = float(os.getenv("VAD_THRESHOLD_DB", "-40"))  # dBFS
+VAD_MIN_SILENCE_MS = int(os.getenv("VAD_MIN_SILENCE_MS", "600"))
+VAD_MAX_SEGMENT_SECONDS = float(os.getenv("VAD_MAX_SEGMENT_SECONDS", "25"))
+
+# Offline trimming configuration
+VAD_TOP_DB = float(os.getenv("VAD_TOP_DB", "25"))  # same threshold confidence scoring uses
+VAD_MAX_GAP_MS = int(os.getenv("VAD_MAX_GAP_MS", "400"))
+
+
+def speech_intervals(y: np.ndarray, top_db: float = VAD_TOP_DB) -> np.ndarray:
+    """
+    Find non-silent intervals in a recording.
+
+    Args:
+        y: Mono waveform
+        top_db: Threshold below the peak level that counts as silence
+
+    Returns:
+        Array of shape (n, 2) with [start, end) sample indices
+    """
+    import librosa  # deferred: slow to import
+
+    if len(y) == 0:
+        return np.zeros((0, 2), dtype=int)
+    return librosa.effects.split(y, top_db=top_db)
+
+
+def compact_speech(
+    y: np.ndarray,
+    intervals: np.ndarray,
+    sr: int = SAMPLE_RATE,
+    max_gap_ms: int = VAD_MAX_GAP_MS
+) -> np.ndarray:
+    """
+    Drop leading/trailing silence and shorten long pauses.
+
+    Pauses between intervals are capped at max_gap_ms so Whisper still
+    sees word and sentence boundaries, but not seconds of dead air.
+
+    Args:
+        y: Mono waveform
+        intervals: Non-silent intervals from speech_intervals
+        sr: Sample rate
+        max_gap_ms: Longest pause kept between speech intervals
+
+    Returns:
+        Compacted waveform (empty if there is no speech)
+    """
+    if len(intervals) == 0:
+        return y[:0]
+
+    max_gap = int(sr * max_gap_ms / 1000)
+    pieces = []
+    prev_end = None
+    for start, end in intervals:
+        if prev_end is not None:
+            gap = start - prev_end
+            # Keep half the allowed pause from each side of the gap
+            if gap > max_gap:
+                pieces.append(y[prev_end:prev_end + max_gap // 2])
+                pieces.append(y[start - max_gap // 2:start])
+            else:
+                pieces.append(y[prev_end:start])
+        pieces.append(y[start:end])
+        prev_end = end
+
+    return np.concatenate(pieces)
+
+
+def compaction_map(intervals: np.ndarray, sr: int = SAMPLE_RATE, max_gap_ms: int = VAD_MAX_GAP_MS) -> np.ndarray:
+    """
+    Describe how compact_speech lays out the original audio.
+
+    Args:
+        intervals: The intervals passed to compact_speech
+        sr: Sample rate
+        max_gap_ms: The max_gap_ms passed to compact_speech
+
+    Returns:
+        Array of shape (n, 2): each kept piece's start time in the
+        compacted audio and in the original audio, in seconds
+    """
+    max_gap = int(sr * max_gap_ms / 1000)
+    pieces = []
+    position = 0
+    prev_end = None
+    for start, end in intervals:
+        if prev_end is not None and start - prev_end > max_gap:
+            pieces.append((position, prev_end))
+            position += max_gap // 2
+            pieces.append((position, start - max_gap // 2))
+            position += max_gap // 2
+        elif prev_end is not None:
+            pieces.append((position, prev_end))
+            position += start - prev_end
+        pieces.append((position, start))
+        position += end - start
+        prev_end = end
+    return np.array(pieces, dtype=np.float64).reshape(-1, 2) / sr
+
+
+def restore_times(times: np.ndarray, mapping: np.ndarray) -> np.ndarray:
+    """
+    Map timestamps in compacted audio back to the original recording.
+
+    Args:
+        times: Times in seconds within the compacted audio
+        mapping: Output of compaction_map
+
+    Returns:
+        Corresponding times in the original audio
+    """
+    times = np.asarray(times, dtype=np.float64)
+    if len(mapping) == 0:
+        return times
+    idx = np.clip(np.searchsorted(mapping[:, 0], times, side="right") - 1, 0, len(mapping) - 1)
+    return mapping[idx, 1] + (times - mapping[idx, 0])
+
+
+def frame_db(samples: np.ndarray, frame_length: int) -> np.ndarray:
+    """
+    Compute the RMS level of consecutive non-overlapping frames.
+
+    Args:
+        samples: Mono float32 audio whose length is a multiple of frame_length
+        frame_length: Samples per frame
+
+    Returns:
+        Level of each frame in dBFS
+    """
+    frames = samples.reshape(-1, frame_length)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    return 20 * np.log10(rms + 1e-10)
+
+
+class StreamingSegmenter:
+    """Splits a live audio stream into speech segments at pauses."""
+
+    def __init__(
+        self,
+        sr: int = SAMPLE_RATE,
+        frame_ms: int = 30,
+        threshold_db: float = VAD_THRESHOLD_DB,
+        min_silence_ms: int = VAD_MIN_SILENCE_MS,
+        max_segment_seconds: float = VAD_MAX_SEGMENT_SECONDS,
+        pad_ms: int = 200
+    ):
+        """
+        Initialize the segmenter.
+
+        Args:
+            sr: Sample rate of the incoming audio
+            frame_ms: Analysis frame length
+            threshold_db: Frames louder than this count as speech
+            min_silence_ms: Pause length that closes a segment
+            max_segment_seconds: Force a cut so segments fit one Whisper window
+            pad_ms: Silence kept before and after each segment
+        """
+        self.frame_length = int(sr * frame_ms / 1000)
+        self.threshold_db = threshold_db
+        self.min_silence_frames = max(1, min_silence_ms // frame_ms)
+        self.max_segment_frames = int(max_segment_seconds * 1000 / frame_ms)
+        self.pad_frames = pad_ms // frame_ms
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._preroll: deque = deque(maxlen=max(1, self.pad_frames))
+        self._segment: List[np.ndarray] = []
+        self._silence_run = 0
+
+    def feed(self, samples: np.ndarray) -> List[np.ndarray]:
+        """
+        Add audio to the stream.
+
+        Args:
+            samples: Mono float32 audio at the configured sample rate
+
+        Returns:
+            Speech segments completed by this chunk (possibly empty)
+        """
+        audio = np.concatenate([self._pending, samples.astype(np.float32, copy=False)])
+        usable = len(audio) - len(audio) % self.frame_length
+        self._pending = audio[usable:]
+        if not usable:
+            return []
+
+        frames = audio[:usable].reshape(-1, self.frame_length)
+        voiced = frame_db(audio[:usable], self.frame_length) > self.threshold_db
+
+        completed = []
+        for frame, is_voiced in zip(frames, voiced):
+            if not self._segment:
+                if is_voiced:
+                    self._segment = list(self._preroll) + [frame]
+                    self._preroll.clear()
+                    self._silence_run = 0
+                else:
+                    self._preroll.append(frame)
+                continue
+
+            self._segment.append(frame)
+            self._silence_run = 0 if is_voiced else self._silence_run + 1
+
+            if self._silence_run >= self.min_silence_frames or len(self._segment) >= self.max_segment_frames:
+                completed.append(self._close_segment())
+
+        return completed
+
+    def flush(self) -> Optional[np.ndarray]:
+        """
+        Close the stream and return any speech still buffered.
+
+        Returns:
+            The final segment, or None if nothing voiced remains
+        """
+        if self._segment and len(self._pending):
+            self._segment.append(self._pending)
+        self._pending = np.zeros(0, dtype=np.float32)
+        return self._close_segment() if self._segment else None
+
+    def _close_segment(self) -> np.ndarray:
+        """Emit the current segment, trimming trailing silence beyond the pad."""
+        trailing = max(0, self._silence_run - self.pad_frames)
+        frames = self._segment[:len(self._segment) - trailing] if trailing else self._segment
+        segment = np.concatenate(frames)
+        self._segment = []
+        self._silence_run = 0
+        self._preroll.clear()
+        return segment
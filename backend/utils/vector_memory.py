@@ -1,7 +1,4 @@
 """Vector memory for storing and retrieving interview Q&A pairs."""
-from langchain_community.vectorstores.faiss import FAISS
-from langchain_community.docstore.in_memory import InMemoryDocstore
-from langchain_community.embeddings import HuggingFaceEmbeddings
 
 
 class VectorMemory:
@@ -14,7 +11,8 @@ class VectorMemory:
         Args:
             model_name: HuggingFace embedding model name
         """
-        self.embeddings = HuggingFaceEmbeddings(model_name=model_name)
+        self.model_name = model_name
+        self._embeddings = None
         self.qa_pairs = []  # List of {"question": q, "answer": a}
         self.stopwords = {
             'the', 'and', 'for', 'you', 'your', 'can', 'with', 'that', 'this',
@@ -24,6 +22,14 @@ class VectorMemory:
             'were', 'while', 'where', 'into', 'onto', 'over', 'under'
         }
 
+    @property
+    def embeddings(self):
+        """Embedding model, loaded on first use rather than per session."""
+        if self._embeddings is None:
+            from langchain_community.embeddings import HuggingFaceEmbeddings
+            self._embeddings = HuggingFaceEmbeddings(model_name=self.model_name)
+        return self._embeddings
+
     def add_qa(self, question: str, answer: str) -> None:
         """Add Q&A pair to memory."""
         self.qa_pairs.append({"question": question, "answer": answer})
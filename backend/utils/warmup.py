@@ -0,0 +1,64 @@
+"""Background model warm-up and readiness reporting."""
+import os
+import sys
+import time
+from typing import Any, Dict
+
+import numpy as np
+
+from utils.audio import SAMPLE_RATE
+from utils.speech_to_text import get_backend, loaded_backends, routed_backends, STT_DEFAULT_BACKEND
+from utils.whisper_pool import whisper_pool
+
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "1") == "1"
+
+_state: Dict[str, Any] = {"started": False, "done": False, "error": None, "seconds": None}
+
+
+def warm_up() -> None:
+    """
+    Load and exercise the speech models once.
+
+    Runs in a background thread after startup, so the server accepts
+    connections immediately and the first candidate does not pay for
+    model loading.
+    """
+    _state["started"] = True
+    start = time.perf_counter()
+    try:
+        silence = np.zeros(SAMPLE_RATE, dtype=np.float32)
+        for name in routed_backends():
+            # The worker farm holds its own copies of the default model
+            if name == STT_DEFAULT_BACKEND and whisper_pool.running:
+                continue
+            get_backend(name).transcribe(silence)
+
+        from utils.confidence import get_confidence_score
+        get_confidence_score(np.zeros(2 * SAMPLE_RATE, dtype=np.float32))
+    except Exception as e:
+        _state["error"] = str(e)
+        print(f"[Warm-up Error] {e}")
+    finally:
+        _state["seconds"] = round(time.perf_counter() - start, 2)
+        _state["done"] = True
+
+
+def is_ready() -> bool:
+    """Whether warm-up has finished and every STT worker has its model loaded."""
+    if WARMUP_ON_STARTUP and not _state["done"]:
+        return False
+    if whisper_pool.running:
+        stats = whisper_pool.stats()
+        return stats["ready_workers"] >= stats["workers"]
+    return True
+
+
+def model_status() -> Dict[str, Any]:
+    """Report which models are loaded."""
+    return {
+        "ready": is_ready(),
+        "warmup": dict(_state),
+        "stt_backends": loaded_backends(),
+        "stt_pool": whisper_pool.stats() if whisper_pool.running else None,
+        "librosa": "librosa" in sys.modules,
+    }
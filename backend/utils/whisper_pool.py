@@ -0,0 +1,351 @@
+"""Process pool of Whisper workers, each holding a warm model."""
+import itertools
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from utils.speech_to_text import STT_DEFAULT_BACKEND
+
+# Pool configuration (0 workers keeps STT in-process)
+STT_WORKERS = int(os.getenv("STT_WORKERS", "0"))
+STT_JOB_TIMEOUT = float(os.getenv("STT_JOB_TIMEOUT", "120"))  # seconds from submit to result
+
+_HEALTH_CHECK_SECONDS = 1.0  # how often the collector checks workers and deadlines
+
+
+def _worker_main(worker_id: int, backend_name: str, jobs, results) -> None:
+    """
+    Worker process entry point.
+
+    Loads its own copy of a registered STT backend once, then serves jobs
+    until it receives a None sentinel. Audio arrives as a shared memory
+    block name; only small metadata travels through the queues.
+    """
+    import torch
+
+    from utils.speech_to_text import get_backend
+
+    # One process per core: keep torch from oversubscribing the CPU
+    torch.set_num_threads(1)
+    backend = get_backend(backend_name)
+    backend.model  # load now, not on the first job
+    results.put(("ready", worker_id, None))
+
+    while True:
+        job = jobs.get()
+        if job is None:
+            break
+
+        job_id, shm_name, length, submitted_at, options = job
+        started_at = time.time()
+        results.put(("start", worker_id, job_id))
+        try:
+            # Copy out of the block right away so the parent can unlink it
+            # as soon as the result is back (a memcpy, not a pickle round-trip)
+            shm = shared_memory.SharedMemory(name=shm_name)
+            try:
+                audio = np.ndarray((length,), dtype=np.float32, buffer=shm.buf).copy()
+            finally:
+                shm.close()
+            result = backend.transcribe(audio, **options)
+            payload = {
+                "text": result["text"],
+                "segments": result.get("segments", []),
+                "language": result.get("language"),
+            }
+            error = None
+        except Exception as e:
+            payload = None
+            error = str(e)
+
+        results.put(("done", worker_id, {
+            "job_id": job_id,
+            "result": payload,
+            "error": error,
+            "submitted_at": submitted_at,
+            "started_at": started_at,
+            "finished_at": time.time(),
+        }))
+
+
+class WhisperWorkerPool:
+    """
+    Farm of Whisper worker processes fed through a shared job queue.
+
+    The collector thread also watches the workers: a worker that dies is
+    respawned and the job it was running fails, and any job without a
+    result after job_timeout seconds fails (its worker, if it was still
+    running it, is restarted). Failed jobs are not retried, since the job
+    itself may be what brought the worker down.
+    """
+
+    def __init__(self, workers: int = STT_WORKERS, backend: str = STT_DEFAULT_BACKEND, job_timeout: float = STT_JOB_TIMEOUT):
+        """
+        Initialize the pool (processes are spawned by start()).
+
+        Args:
+            workers: Number of worker processes
+            backend: Registered STT backend each worker loads (see speech_to_text)
+            job_timeout: Seconds a job may take from submit to result
+        """
+        self.workers = max(1, workers)
+        self.backend = backend
+        self.job_timeout = job_timeout
+        self._ctx = mp.get_context("spawn")
+        self._jobs = None
+        self._results = None
+        self._processes: List[Any] = []
+        self._pending: Dict[int, Dict[str, Any]] = {}
+        self._running_jobs: Dict[int, int] = {}  # worker_id -> job_id it is transcribing
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self._collector: Optional[threading.Thread] = None
+        self._stopping = False
+        self._started_at: Optional[float] = None
+        self._ready: set = set()
+        self._worker_stats: Dict[int, Dict[str, float]] = {}
+        self._queue_latency_total = 0.0
+        self._completed = 0
+        self._failed = 0
+        self._timed_out = 0
+        self._restarts = 0
+
+    @property
+    def running(self) -> bool:
+        """Whether worker processes have been started."""
+        return bool(self._processes)
+
+    def start(self) -> None:
+        """Spawn worker processes and the result collector thread."""
+        if self.running:
+            return
+
+        self._jobs = self._ctx.Queue()
+        self._results = self._ctx.Queue()
+        self._stopping = False
+        self._started_at = time.time()
+        for worker_id in range(self.workers):
+            self._processes.append(self._spawn(worker_id))
+            self._worker_stats[worker_id] = {"jobs": 0, "busy_seconds": 0.0}
+
+        self._collector = threading.Thread(target=self._collect, name="whisper-collector", daemon=True)
+        self._collector.start()
+
+    def shutdown(self) -> None:
+        """Stop all workers and release outstanding shared memory."""
+        if not self.running:
+            return
+
+        self._stopping = True
+        for _ in self._processes:
+            self._jobs.put(None)
+        for proc in self._processes:
+            proc.join(timeout=10)
+            if proc.is_alive():
+                proc.terminate()
+        self._results.put(("stop", -1, None))
+        self._collector.join(timeout=5)
+        self._processes = []
+
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for entry in pending.values():
+            self._release(entry["shm"])
+            self._resolve(entry["future"], error=RuntimeError("Whisper worker pool shut down"))
+
+    def submit(self, waveform: np.ndarray, **options) -> Future:
+        """
+        Queue a waveform for transcription.
+
+        Args:
+            waveform: 16 kHz mono float32 audio
+            **options: Extra keyword arguments for model.transcribe
+
+        Returns:
+            Future resolving to a dict with the transcript ("text",
+            "segments", "language"), the serving "worker_id",
+            "queue_latency" and "inference_seconds"; it fails with
+            TimeoutError after job_timeout seconds, or RuntimeError if the
+            worker dies while transcribing it
+        """
+        if not self.running:
+            raise RuntimeError("Whisper worker pool is not started")
+
+        audio = np.ascontiguousarray(waveform, dtype=np.float32)
+        shm = shared_memory.SharedMemory(create=True, size=max(audio.nbytes, 1))
+        np.ndarray(audio.shape, dtype=np.float32, buffer=shm.buf)[:] = audio
+
+        future: Future = Future()
+        job_id = next(self._ids)
+        submitted_at = time.time()
+        with self._lock:
+            self._pending[job_id] = {"future": future, "shm": shm, "submitted_at": submitted_at}
+        self._jobs.put((job_id, shm.name, audio.shape[0], submitted_at, options))
+        return future
+
+    def transcribe(self, waveform: np.ndarray, **options) -> Dict[str, Any]:
+        """Blocking helper: submit a waveform and wait for its result."""
+        return self.submit(waveform, **options).result()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get per-worker utilisation and queue latency figures."""
+        uptime = time.time() - self._started_at if self._started_at else 0.0
+        with self._lock:
+            pending = len(self._pending)
+            workers = {
+                worker_id: {
+                    "jobs": s["jobs"],
+                    "busy_seconds": round(s["busy_seconds"], 3),
+                    "utilisation": round(s["busy_seconds"] / uptime, 3) if uptime else 0.0,
+                }
+                for worker_id, s in self._worker_stats.items()
+            }
+            completed = self._completed
+            avg_latency = self._queue_latency_total / completed if completed else 0.0
+
+        return {
+            "backend": self.backend,
+            "workers": self.workers,
+            "ready_workers": len(self._ready),
+            "pending_jobs": pending,
+            "completed_jobs": completed,
+            "failed_jobs": self._failed,
+            "timed_out_jobs": self._timed_out,
+            "worker_restarts": self._restarts,
+            "avg_queue_latency": round(avg_latency, 4),
+            "per_worker": workers,
+        }
+
+    def _spawn(self, worker_id: int):
+        """Start the process for one worker slot."""
+        proc = self._ctx.Process(
+            target=_worker_main,
+            args=(worker_id, self.backend, self._jobs, self._results),
+            name=f"whisper-worker-{worker_id}",
+            daemon=True,
+        )
+        proc.start()
+        return proc
+
+    def _collect(self) -> None:
+        """Resolve futures as results come back, and check worker health between them."""
+        next_check = time.monotonic() + _HEALTH_CHECK_SECONDS
+        while True:
+            try:
+                kind, worker_id, message = self._results.get(timeout=_HEALTH_CHECK_SECONDS)
+            except queue.Empty:
+                kind = None
+
+            if time.monotonic() >= next_check and not self._stopping:
+                self._check_workers()
+                next_check = time.monotonic() + _HEALTH_CHECK_SECONDS
+            if kind is None:
+                continue
+            if kind == "stop":
+                break
+            if kind == "ready":
+                self._ready.add(worker_id)
+                continue
+            if kind == "start":
+                with self._lock:
+                    if message in self._pending:
+                        self._running_jobs[worker_id] = message
+                continue
+
+            with self._lock:
+                if self._running_jobs.get(worker_id) == message["job_id"]:
+                    del self._running_jobs[worker_id]
+                entry = self._pending.pop(message["job_id"], None)
+                queue_latency = message["started_at"] - message["submitted_at"]
+                inference = message["finished_at"] - message["started_at"]
+                stats = self._worker_stats[worker_id]
+                stats["jobs"] += 1
+                stats["busy_seconds"] += inference
+                self._completed += 1
+                self._queue_latency_total += queue_latency
+                if message["error"] and entry is not None:
+                    self._failed += 1
+
+            if entry is None:
+                continue
+            self._release(entry["shm"])
+
+            if message["error"]:
+                self._resolve(entry["future"], error=RuntimeError(f"Whisper worker {worker_id} failed: {message['error']}"))
+            else:
+                self._resolve(entry["future"], result={
+                    **message["result"],
+                    "worker_id": worker_id,
+                    "queue_latency": queue_latency,
+                    "inference_seconds": inference,
+                })
+
+    def _check_workers(self) -> None:
+        """Fail jobs past their deadline and replace dead or stuck workers."""
+        now = time.time()
+        with self._lock:
+            expired = [job_id for job_id, entry in self._pending.items() if now - entry["submitted_at"] > self.job_timeout]
+            stuck = {worker_id for worker_id, job_id in self._running_jobs.items() if job_id in expired}
+        for job_id in expired:
+            self._fail(job_id, TimeoutError(f"Whisper job timed out after {self.job_timeout:.0f}s"), timed_out=True)
+
+        for worker_id, proc in enumerate(self._processes):
+            if proc.is_alive() and worker_id not in stuck:
+                continue
+            if proc.is_alive():
+                proc.terminate()
+                proc.join(timeout=5)
+                print(f"[Whisper Pool Error] worker {worker_id} stuck past the job timeout; restarting")
+            else:
+                print(f"[Whisper Pool Error] worker {worker_id} exited with code {proc.exitcode}; restarting")
+
+            with self._lock:
+                job_id = self._running_jobs.pop(worker_id, None)
+                self._restarts += 1
+            self._ready.discard(worker_id)
+            if job_id is not None:
+                self._fail(job_id, RuntimeError(f"Whisper worker {worker_id} died while transcribing"))
+            self._processes[worker_id] = self._spawn(worker_id)
+
+    def _fail(self, job_id: int, error: Exception, timed_out: bool = False) -> None:
+        """Fail a pending job and release its audio."""
+        with self._lock:
+            entry = self._pending.pop(job_id, None)
+            if entry is None:
+                return
+            self._failed += 1
+            self._timed_out += timed_out
+        # A worker that picks the job up later finds the block gone and skips it
+        self._release(entry["shm"])
+        self._resolve(entry["future"], error=error)
+
+    @staticmethod
+    def _resolve(future: Future, result: Any = None, error: Optional[Exception] = None) -> None:
+        """Settle a future unless the caller already cancelled it."""
+        try:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+        except InvalidStateError:
+            pass
+
+    @staticmethod
+    def _release(shm: shared_memory.SharedMemory) -> None:
+        """Close and unlink a shared memory block owned by the parent."""
+        try:
+            shm.close()
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+# Shared pool instance (started by the app when STT_WORKERS > 0)
+whisper_pool = WhisperWorkerPool()
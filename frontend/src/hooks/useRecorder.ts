@@ -1,5 +1,12 @@
 import { useState, useRef } from 'react'
 
+// Opus at speech bitrates keeps uploads small; the backend decodes any of these with ffmpeg
+const PREFERRED_TYPES = ['audio/webm;codecs=opus', 'audio/ogg;codecs=opus', 'audio/webm']
+const AUDIO_BITS_PER_SECOND = 32000
+
+const pickMimeType = () =>
+  PREFERRED_TYPES.find((type) => typeof MediaRecorder !== 'undefined' && MediaRecorder.isTypeSupported(type))
+
 export const useRecorder = () => {
   const [isRecording, setIsRecording] = useState(false)
   const mediaRecorderRef = useRef<MediaRecorder | null>(null)
@@ -7,7 +14,11 @@ export const useRecorder = () => {
 
   const startRecording = async () => {
     const stream = await navigator.mediaDevices.getUserMedia({ audio: true })
-    const mediaRecorder = new MediaRecorder(stream)
+    const mimeType = pickMimeType()
+    const mediaRecorder = new MediaRecorder(stream, {
+      ...(mimeType ? { mimeType } : {}),
+      audioBitsPerSecond: AUDIO_BITS_PER_SECOND,
+    })
     mediaRecorderRef.current = mediaRecorder
 
     audioChunksRef.current = []
@@ -31,7 +42,8 @@ export const useRecorder = () => {
       if (mediaRecorderRef.current && isRecording) {
         mediaRecorderRef.current.onstop = () => {
           setIsRecording(false)
-          const audioBlob = new Blob(audioChunksRef.current, { type: 'audio/webm' })
+          const type = mediaRecorderRef.current?.mimeType || 'audio/webm'
+          const audioBlob = new Blob(audioChunksRef.current, { type })
           resolve(audioBlob)
         }
         mediaRecorderRef.current.stop()